@@ -8,4 +8,10 @@ LILYPOND_INSTALLATION = 'lilypond'
 # *nix users who didn't modify their path after getting lilypond, the default location is below
 # LILYPOND_INSTALLATION = '/home/$USER/bin/lilypond'
 
+# Directory to cache exported pdfs and midis in, so unchanged compositions aren't rendered again.
+# None to not cache exports
+EXPORT_CACHE_DIR = None
+# EXPORT_CACHE_DIR = os.path.join(CFG_DIR, '..', 'export_cache')
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
 __version__ = 1.1
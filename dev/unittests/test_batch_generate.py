@@ -0,0 +1,55 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+import os
+from mgen import batch
+
+def setup_module(batch):
+    pass
+
+def teardown_module(batch):
+    pass
+
+def _read_batch(output_dir, processes):
+    results = list(batch.generate_batch(4, str(output_dir), seed=1234,
+                                        melody_bars=4, chords_bars=4,
+                                        processes=processes))
+    midi_data = []
+    for result in results:
+        with open(result.midi_path, 'rb') as midi_file:
+            midi_data.append(midi_file.read())
+    return results, midi_data
+
+def test_generate_batch_in_order(tmpdir):
+    results, _ = _read_batch(tmpdir, processes=2)
+
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    for result in results:
+        assert os.path.isfile(result.midi_path)
+
+def test_generate_batch_in_order_chunked(tmpdir):
+    # Enough compositions that each worker is sent a few at a time
+    results = list(batch.generate_batch(24, str(tmpdir), seed=1234,
+                                        melody_bars=4, chords_bars=4,
+                                        processes=2))
+
+    assert [result.index for result in results] == list(range(0, 24))
+
+def test_generate_batch_reproducible(tmpdir):
+    results_1, midi_data_1 = _read_batch(tmpdir.mkdir('first'), processes=2)
+    results_2, midi_data_2 = _read_batch(tmpdir.mkdir('second'), processes=1)
+
+    assert [result.seed for result in results_1] == [result.seed for result in results_2]
+    assert [result.key for result in results_1] == [result.key for result in results_2]
+    assert midi_data_1 == midi_data_2
+
+def test_generate_batch_independent_seeds(tmpdir):
+    results, _ = _read_batch(tmpdir, processes=1)
+
+    assert len(set(result.seed for result in results)) == len(results)
+
+if __name__ == "__main__":
+    pytest.main("-v")
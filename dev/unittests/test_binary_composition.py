@@ -0,0 +1,132 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import io
+import numpy
+import pytest
+import struct
+from mgen import binary
+from mgen import events
+from mgen import style
+from mgen.create import MusicGenerator
+
+def setup_module(binary):
+    pass
+
+def teardown_module(binary):
+    pass
+
+def _create_event_composition():
+    event_composition = events.EventComposition('Eb', (3, 4), 'Binary', 'Someone')
+    melody_id = event_composition.add_track(2)
+    chords_id = event_composition.add_track(3)
+    event_composition.add_events(melody_id, [0, 960, 1920], [960, 960, 960], [63, 65, 67],
+                                 [100, 90, 80])
+    event_composition.add_events(chords_id, [2880, 2880], [2880, 2880], [51, 55])
+    return event_composition
+
+def test_round_trip():
+    event_composition = _create_event_composition()
+
+    data = binary.encode_event_composition(event_composition, {'answer': 42})
+    loaded, metadata = binary.decode_event_composition(data)
+
+    assert metadata == {'answer': 42}
+    assert loaded.key == 'Eb'
+    assert loaded.time_signature == (3, 4)
+    assert loaded.title == 'Binary'
+    assert loaded.author == 'Someone'
+    assert loaded.track_bars == [2, 3]
+    for column in ('onsets', 'durations', 'pitches', 'velocities', 'track_ids'):
+        assert numpy.array_equal(getattr(loaded, column), getattr(event_composition, column))
+        assert getattr(loaded, column).dtype == getattr(event_composition, column).dtype
+    assert loaded.get_midi_bytes() == event_composition.get_midi_bytes()
+
+def test_compact():
+    event_composition = _create_event_composition()
+    data = binary.encode_event_composition(event_composition)
+
+    header_size = struct.calcsize('<4sHHII')
+    metadata_length = struct.unpack_from('<I', data, 8)[0]
+
+    assert data[:4] == binary.MAGIC
+    assert (header_size + metadata_length) % 8 == 0
+    # 17 bytes per event after the header and metadata
+    assert len(data) == header_size + metadata_length + 17 * len(event_composition)
+
+def test_empty_round_trip():
+    loaded, _ = binary.decode_event_composition(
+        binary.encode_event_composition(events.EventComposition()))
+
+    assert len(loaded) == 0
+    assert loaded.track_bars == []
+
+def test_loaded_can_change():
+    loaded, _ = binary.decode_event_composition(
+        binary.encode_event_composition(_create_event_composition()))
+
+    loaded.transpose(2, track_id=0)
+    loaded.add_events(1, [5760], [960], [60])
+
+    assert list(loaded.pitches[:3]) == [65, 67, 69]
+    assert len(loaded) == 6
+
+def test_invalid_data():
+    data = binary.encode_event_composition(_create_event_composition())
+
+    with pytest.raises(AttributeError):
+        binary.decode_event_composition(b'MThd' + data[4:])
+
+    with pytest.raises(AttributeError):
+        binary.decode_event_composition(data[:4] + struct.pack('<H', binary.FORMAT_VERSION + 1) +
+                                        data[6:])
+
+    with pytest.raises(AttributeError):
+        binary.decode_event_composition(data[:-1])
+
+    with pytest.raises(AttributeError):
+        binary.decode_event_composition(data[:5])
+
+def test_write_and_read(tmpdir):
+    event_composition = _create_event_composition()
+    binary_path = str(tmpdir.join('composition.mgen'))
+
+    bytes_written = binary.write_event_composition(binary_path, event_composition)
+    binary_file = io.BytesIO()
+    binary.write_event_composition(binary_file, event_composition)
+
+    with open(binary_path, 'rb') as open_file:
+        assert open_file.read() == binary_file.getvalue()
+    assert bytes_written == len(binary_file.getvalue())
+
+    binary_file.seek(0)
+    assert len(binary.read_event_composition(binary_file)[0]) == 5
+    assert len(binary.read_event_composition(binary_path)[0]) == 5
+
+def test_music_generator_round_trip(tmpdir):
+    music_generator = MusicGenerator(style.Style(style.JAZZ_CFG_FILE),
+                                     composition_title='Round Trip', seed=4)
+    music_generator.insert_track(music_generator.create_melody_track(num_bars=4))
+    music_generator.insert_track(music_generator.create_chords_track(num_bars=4,
+                                                                     octave_adjust=-1),
+                                 location_to_add=3)
+
+    binary_path = music_generator.export_binary(str(tmpdir.join('round_trip.mgen')))
+    from_the_grave = MusicGenerator.from_binary(binary_path)
+
+    assert from_the_grave.composition_title == 'Round Trip'
+    assert from_the_grave.style_probs.probabilities_file == style.JAZZ_CFG_FILE
+    assert from_the_grave._key == music_generator._key
+    assert tuple(from_the_grave._time_signature) == tuple(music_generator._time_signature)
+    assert [track.start_bar for track in from_the_grave.composition.tracks] == [0, 2]
+    assert [len(track.bars) for track in from_the_grave.composition.tracks] == [4, 4]
+    assert from_the_grave.get_midi_bytes() == music_generator.get_midi_bytes()
+
+def test_export_binary_invalid_path():
+    with pytest.warns(UserWarning):
+        assert MusicGenerator().export_binary(None) is None
+
+if __name__ == "__main__":
+    pytest.main("-v")
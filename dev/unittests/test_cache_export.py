@@ -0,0 +1,146 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import multiprocessing.pool
+import os
+import pytest
+from mock import patch
+from mgen import cache
+from mgen import cfg_import
+from mgen.create import MusicGenerator
+
+def setup_module(cache):
+    pass
+
+def teardown_module(cache):
+    pass
+
+def _write_file(file_path, contents):
+    with open(file_path, 'wb') as open_file:
+        open_file.write(contents)
+    return file_path
+
+def _read_file(file_path):
+    with open(file_path, 'rb') as open_file:
+        return open_file.read()
+
+def test_get_key():
+    assert cache.get_key('pdf', 'abc') == cache.get_key('pdf', b'abc')
+    assert cache.get_key('pdf', 'abc') != cache.get_key('mid', 'abc')
+    # Sources can't run into each other
+    assert cache.get_key('ab', 'c') != cache.get_key('a', 'bc')
+
+def test_put_and_fetch(tmpdir):
+    export_cache = cache.ExportCache(str(tmpdir.join('cache')))
+    key = cache.get_key('score')
+
+    assert export_cache.get(key, 'pdf') is None
+    assert not export_cache.fetch(key, 'pdf', str(tmpdir.join('out.pdf')))
+
+    export_cache.put(key, 'pdf', _write_file(str(tmpdir.join('score.pdf')), b'pdf data'))
+
+    assert export_cache.fetch(key, 'pdf', str(tmpdir.join('out.pdf')))
+    assert _read_file(str(tmpdir.join('out.pdf'))) == b'pdf data'
+    assert export_cache.get(key, 'mid') is None
+
+def test_evicts_least_recently_used(tmpdir):
+    export_cache = cache.ExportCache(str(tmpdir.join('cache')), max_bytes=20)
+    source_path = _write_file(str(tmpdir.join('source')), b'0123456789')
+
+    export_cache.put('aa1', 'mid', source_path)
+    export_cache.put('bb2', 'mid', source_path)
+    os.utime(export_cache.get('aa1', 'mid'), (1, 1))
+    os.utime(export_cache.get('bb2', 'mid'), (2, 2))
+
+    # Using the oldest file makes it the newest
+    export_cache.get('aa1', 'mid')
+    export_cache.put('cc3', 'mid', source_path)
+
+    assert export_cache.get('aa1', 'mid') is not None
+    assert export_cache.get('bb2', 'mid') is None
+    assert export_cache.get('cc3', 'mid') is not None
+
+def test_put_only_counts_cache_when_full(tmpdir):
+    export_cache = cache.ExportCache(str(tmpdir.join('cache')), max_bytes=25)
+    source_path = _write_file(str(tmpdir.join('source')), b'0123456789')
+
+    with patch.object(cache.ExportCache, '_count_bytes', autospec=True,
+                      side_effect=cache.ExportCache._count_bytes) as count_mock:
+        export_cache.put('aa1', 'mid', source_path)
+        export_cache.put('bb2', 'mid', source_path)
+        # Replacing a file doesn't grow the cache
+        export_cache.put('bb2', 'mid', source_path)
+        assert count_mock.call_count == 1
+
+        export_cache.put('cc3', 'mid', source_path)
+        assert count_mock.call_count == 2
+
+    assert export_cache._total_bytes == 20
+
+def test_put_concurrently(tmpdir):
+    export_cache = cache.ExportCache(str(tmpdir.join('cache')), max_bytes=2000)
+    source_paths = [_write_file(str(tmpdir.join('source' + str(size))), b'0' * size)
+                    for size in range(1, 41)]
+
+    def put_files(thread_index):
+        # Threads share some keys, so files are replaced as well as evicted
+        for file_index, source_path in enumerate(source_paths):
+            export_cache.put(cache.get_key(thread_index % 3, file_index), 'mid', source_path)
+
+    pool = multiprocessing.pool.ThreadPool(8)
+    try:
+        pool.map(put_files, range(0, 16))
+    finally:
+        pool.close()
+        pool.join()
+
+    assert export_cache._total_bytes == export_cache._count_bytes()[0]
+    assert export_cache._total_bytes <= 2000
+
+def test_get_export_cache(tmpdir):
+    assert cache.get_export_cache() is None
+
+    with patch.object(cfg_import.config, 'EXPORT_CACHE_DIR', str(tmpdir), create=True):
+        assert cache.get_export_cache() is cache.get_export_cache()
+        assert cache.get_export_cache().cache_dir == str(tmpdir)
+
+def test_export_midi_cached(tmpdir):
+    export_cache = cache.ExportCache(str(tmpdir.join('cache')))
+    music_generator = MusicGenerator(seed=3)
+    music_generator.insert_track(music_generator.create_chords_track(4))
+
+    first_path = music_generator.export_midi(str(tmpdir.join('first.mid')),
+                                             export_cache=export_cache)
+
+    with patch.object(MusicGenerator, '_create_midi_file', autospec=True,
+                      side_effect=MusicGenerator._create_midi_file) as create_mock:
+        second_path = music_generator.export_midi(str(tmpdir.join('second.mid')),
+                                                  export_cache=export_cache)
+        music_generator.export_midi(str(tmpdir.join('third.mid')), bpm=60,
+                                    export_cache=export_cache)
+
+    assert _read_file(first_path) == _read_file(second_path)
+    # Only the new tempo had to be written
+    assert create_mock.call_count == 1
+
+def test_export_pdf_cached(tmpdir):
+    export_cache = cache.ExportCache(str(tmpdir.join('cache')))
+    music_generator = MusicGenerator(seed=3)
+    music_generator.insert_track(music_generator.create_chords_track(4))
+
+    def fake_to_pdf(ly_string, file_path, **kwargs):
+        _write_file(file_path + '.pdf', ly_string.encode('utf-8'))
+
+    with patch('mingus.extra.lilypond.to_pdf', side_effect=fake_to_pdf) as lilypond_mock:
+        first_path = music_generator.export_pdf(str(tmpdir.join('first')),
+                                                export_cache=export_cache)
+        second_path = music_generator.export_pdf(str(tmpdir.join('second')),
+                                                 export_cache=export_cache)
+
+    assert lilypond_mock.call_count == 1
+    assert _read_file(first_path) == _read_file(second_path)
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,86 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import collections
+import pytest
+import random
+from mgen import choice
+from mgen import time
+from mgen import Style
+from mgen import DEFAULT_CFG_FILE
+from mgen import JAZZ_CFG_FILE
+
+_DEFAULT_TEST_TIMINGS = [("half", "0.50"),
+                         ("quarter", "0.50")]
+
+def setup_module(choice):
+    pass
+
+def teardown_module(choice):
+    pass
+
+@pytest.mark.parametrize("time_signature", [(4, 4), (3, 4), (6, 8), (2, 2)])
+def test_choose_bar_timing_fills_bar(time_signature):
+    for cfg_file in (DEFAULT_CFG_FILE, JAZZ_CFG_FILE):
+        timing_table = Style(cfg_file).timing_table
+
+        for _ in range(0, 20):
+            melody_bar = choice.choose_bar_timing(time_signature, timing_table)
+            bar_ticks = sum(time.get_notes_ticks(note_timing)
+                            for note_timing in melody_bar)
+
+            assert bar_ticks == time.get_bar_ticks(time_signature)
+
+def test_choose_bar_timing_weights():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+    rng = random.Random(3)
+
+    # Half first, or quarter first and then quarter again, each half the time
+    draws = [len(choice.choose_bar_timing((2, 4), timing_table, rng=rng))
+             for _ in range(0, 4000)]
+
+    assert draws.count(1) / 4000.0 == pytest.approx(0.5, abs=0.03)
+
+def test_choose_bar_timing_matches_sequential():
+    timing_table = Style(DEFAULT_CFG_FILE).timing_table
+    rng = random.Random(12)
+    num_bars = 4000
+
+    # Choosing one timing at a time from the ones that fit, as bars used to be made
+    sequential_counts = collections.Counter()
+    for _ in range(0, num_bars):
+        melody_bar = []
+        remaining = time.ticks_to_time(time.get_bar_ticks((4, 4)))
+        while remaining > 0.0:
+            melody_bar.append(choice.choose_next_timing(remaining, timing_table, rng=rng))
+            remaining = time.get_time_remaining(melody_bar, (4, 4))
+        sequential_counts[sum(len(note_timing) for note_timing in melody_bar)] += 1
+
+    drawn_counts = collections.Counter(
+        sum(len(note_timing) for note_timing in choice.choose_bar_timing((4, 4), timing_table,
+                                                                         rng=rng))
+        for _ in range(0, num_bars))
+
+    # Same share of bars with each number of notes
+    for notes_in_bar in set(sequential_counts) | set(drawn_counts):
+        assert (drawn_counts[notes_in_bar] / float(num_bars) ==
+                pytest.approx(sequential_counts[notes_in_bar] / float(num_bars), abs=0.03))
+
+def test_choose_bar_timing_index_cached():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+
+    assert (timing_table.get_bar_rhythm_index((4, 4)) is
+            timing_table.get_bar_rhythm_index([4, 4]))
+    assert (timing_table.get_bar_rhythm_index((4, 4)) is not
+            timing_table.get_bar_rhythm_index((3, 4)))
+
+def test_choose_bar_timing_cannot_fill():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+
+    with pytest.raises(AttributeError):
+        choice.choose_bar_timing((3, 8), timing_table)
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -48,6 +48,48 @@ def test_choose_chord_progression_under_bound_choice():
     with pytest.raises(AttributeError):
         choice.choose_chord_progression(_DEFAULT_TEST_CHORD_PROGRESSIONS, -5)
 
+def test_choose_fitting_chord_progression_length():
+    for num_bars in (3, 4, 6, 8, 12):
+        result = choice.choose_fitting_chord_progression(num_bars,
+                                                         _DEFAULT_TEST_CHORD_PROGRESSIONS)
+        assert num_bars % len(result) == 0
+
+def test_choose_fitting_chord_progression_keeps_probabilities():
+    prob_list = [("IM7 iim7 V7 IVM7", 0.00),
+                 ("IM7 II7 iim7 IM7", 1.00),
+                 ("iim7 V7 IM7", 0.50)
+                 ]
+
+    # Both four chord progressions fit, only one of them can be chosen
+    for _ in range(0, 20):
+        result = choice.choose_fitting_chord_progression(8, prob_list)
+        assert result == "IM7 II7 iim7 IM7".split(" ")
+
+def test_choose_fitting_chord_progression_no_match():
+    with pytest.raises(AttributeError):
+        choice.choose_fitting_chord_progression(5, _DEFAULT_TEST_CHORD_PROGRESSIONS)
+
+def test_progression_table_caches_fitting_sampler():
+    progression_table = choice.compile_progression_table(_DEFAULT_TEST_CHORD_PROGRESSIONS)
+
+    assert choice.compile_progression_table(progression_table) is progression_table
+    assert progression_table.get_fitting_sampler(8) is progression_table.get_fitting_sampler(8)
+    assert progression_table.get_fitting_sampler(7) is None
+    assert sorted(progression_table.indices_by_length) == [3, 4, 6, 8]
+
+def test_get_progression_chords():
+    chords = choice.get_progression_chords(["I", "V7"], "C")
+
+    assert chords == (("C", "E", "G"), ("G", "B", "D", "F"))
+    assert choice.get_progression_chords(("I", "V7"), "C") is chords
+    assert choice.get_progression_chords(["I", "V7"], "G") is not chords
+
+def test_warm_progression_chords():
+    choice.warm_progression_chords(_DEFAULT_TEST_CHORD_PROGRESSIONS, ["D", "Bb"])
+
+    for progression, _ in _DEFAULT_TEST_CHORD_PROGRESSIONS:
+        assert (tuple(progression.split(" ")), "Bb") in choice._PROGRESSION_CHORDS_CACHE
+
 """ TODO: Enable this test once we implement actual randomness
 def test_choose_chord_progression_randomness():
     # Populate 10 "random" choices
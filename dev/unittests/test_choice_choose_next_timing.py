@@ -0,0 +1,103 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+from mgen import choice
+from mgen import time
+
+_DEFAULT_TEST_TIMINGS = [("whole", "0.10"),
+                         ("half", "0.20"),
+                         ("quarter_dotted eighth", "0.30"),
+                         ("eighth sixteenth sixteenth", "0.40")]
+
+def setup_module(choice):
+    pass
+
+def teardown_module(choice):
+    pass
+
+def test_timing_table_parses_timings():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+
+    assert len(timing_table) == len(_DEFAULT_TEST_TIMINGS)
+    assert timing_table.timings[0] == (choice.value.whole,)
+    assert timing_table.timings[2] == (choice.value.dots(choice.value.quarter),
+                                       choice.value.eighth)
+    for note_timing, ticks in zip(timing_table.timings, timing_table.ticks):
+        assert ticks == time.get_notes_ticks(note_timing)
+
+def test_compile_timing_table_reuses_table():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+
+    assert choice.compile_timing_table(timing_table) is timing_table
+
+def test_choose_next_timing_fits_remaining_time():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+
+    for _ in range(0, 100):
+        result = choice.choose_next_timing(0.25, timing_table)
+
+        assert result == [choice.value.eighth, choice.value.sixteenth,
+                          choice.value.sixteenth]
+
+def test_choose_next_timing_from_prob_list():
+    result = choice.choose_next_timing(1.0, _DEFAULT_TEST_TIMINGS)
+
+    assert time.get_notes_length(result) <= 1.0
+
+def test_choose_next_timing_renormalizes_fitting_timings():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+    fitting_sampler = timing_table.get_fitting_sampler(time.time_to_ticks(0.5))
+
+    # Whole note doesn't fit, the rest share its probability
+    assert sorted(fitting_sampler.items) == [1, 2, 3]
+    assert fitting_sampler.total == pytest.approx(0.9)
+
+def test_choose_next_timing_choice_renormalized():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+    choices = [(step + 0.5) / 1000.0 for step in range(0, 1000)]
+
+    chosen = [choice.choose_next_timing(0.5, timing_table, choice=given_choice)
+              for given_choice in choices]
+
+    # Evenly spread choices land on each fitting timing as often as it's drawn
+    assert (chosen.count([choice.value.half]) / 1000.0 ==
+            pytest.approx(0.2 / 0.9, abs=0.002))
+    assert (chosen.count([choice.value.eighth, choice.value.sixteenth,
+                          choice.value.sixteenth]) / 1000.0 ==
+            pytest.approx(0.4 / 0.9, abs=0.002))
+
+def test_choose_next_timing_fitting_sampler_cached():
+    timing_table = choice.compile_timing_table(_DEFAULT_TEST_TIMINGS)
+
+    assert (timing_table.get_fitting_sampler(time.time_to_ticks(0.5)) is
+            timing_table.get_fitting_sampler(time.time_to_ticks(0.75)))
+
+def test_choose_next_timing_nothing_fits():
+    with pytest.warns(UserWarning):
+        result = choice.choose_next_timing(0.125, _DEFAULT_TEST_TIMINGS)
+
+    assert result is None
+
+def test_choose_next_timing_upper_bound():
+    result = choice.choose_next_timing(0.5, _DEFAULT_TEST_TIMINGS, 1.0)
+
+    assert result == [choice.value.eighth, choice.value.sixteenth,
+                      choice.value.sixteenth]
+
+def test_choose_next_timing_no_time_left():
+    with pytest.raises(AttributeError):
+        choice.choose_next_timing(0.0, _DEFAULT_TEST_TIMINGS)
+
+def test_choose_next_timing_over_bound_choice():
+    with pytest.raises(AttributeError):
+        choice.choose_next_timing(1.0, _DEFAULT_TEST_TIMINGS, 5)
+
+def test_choose_next_timing_under_bound_choice():
+    with pytest.raises(AttributeError):
+        choice.choose_next_timing(1.0, _DEFAULT_TEST_TIMINGS, -5)
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,53 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+from mgen import choice
+
+_DEFAULT_SCALE = choice.scales.Major("C")
+
+def setup_module(choice):
+    pass
+
+def teardown_module(choice):
+    pass
+
+def test_choose_track_notes_no_bars():
+    assert choice.choose_track_notes([], _DEFAULT_SCALE) == []
+
+def test_choose_track_notes_bar_lengths():
+    notes_per_bar = [4, 0, 1, 7, 3]
+
+    track_notes = choice.choose_track_notes(notes_per_bar, _DEFAULT_SCALE)
+
+    assert [len(bar_notes) for bar_notes in track_notes] == notes_per_bar
+
+def test_choose_track_notes_in_scale():
+    track_notes = choice.choose_track_notes([16] * 8, _DEFAULT_SCALE)
+
+    for bar_notes in track_notes:
+        assert isinstance(bar_notes, list)
+        for note in bar_notes:
+            # Make sure note is valid or None (representing a rest)
+            assert (note is None or
+                    note in _DEFAULT_SCALE.ascending())
+
+def test_choose_track_notes_has_rests():
+    track_notes = choice.choose_track_notes([1000], _DEFAULT_SCALE)
+
+    # Two out of every len(scale) + 3 draws are rests
+    assert None in track_notes[0]
+
+def test_choose_track_notes_randomness():
+    # Populate 10 "random" choices
+    track_notes = [choice.choose_track_notes([3, 3], _DEFAULT_SCALE) for _ in range(0, 10)]
+
+    # Make sure they"re not ALL equal. Although this is possible... it"s
+    # very unlikely. If you got here because of a failed test, I"m sorry.
+    # Everything is most likely fine. Run them again.
+    assert len(set(str(notes) for notes in track_notes)) != 1
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,46 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+from mgen import choice
+from mingus.core import scales
+
+def setup_module(choice):
+    pass
+
+def teardown_module(choice):
+    pass
+
+def test_get_scale_notes():
+    scale_entry = choice.get_scale_entry(choice.get_scale("Major", "D"))
+
+    assert isinstance(scale_entry.scale, scales.Major)
+    assert scale_entry.ascending == tuple(scales.Major("D").ascending())
+    assert scale_entry.descending == tuple(scales.Major("D").descending())
+    assert list(scale_entry.scale_degrees[3:]) == list(scale_entry.ascending)
+
+def test_get_scale_cached():
+    assert choice.get_scale("Dorian", "G") is choice.get_scale("Dorian", "G")
+    assert choice.get_scale("Dorian", "G") is not choice.get_scale("Dorian", "A")
+
+def test_get_scale_unknown_name():
+    scale = choice.get_scale("scales.Lydian", "A")
+
+    assert isinstance(scale, scales.HarmonicMajor)
+
+def test_get_scale_entry_shared_with_instances():
+    scale_entry = choice.get_scale_entry(choice.get_scale("NaturalMinor", "E"))
+
+    assert choice.get_scale_entry(scales.NaturalMinor("E")) is scale_entry
+    assert choice.get_scale_entry(scales.NaturalMinor("F")) is not scale_entry
+
+def test_choose_scale_reuses_scale():
+    scale_prob_list = [("Lydian", 1.00)]
+
+    assert (choice.choose_scale("A", scale_prob_list) is
+            choice.choose_scale("A", scale_prob_list))
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,104 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+from mgen import choice
+from mgen import convert
+from mgen import time
+from mingus.core import value
+
+_QUARTER_TICKS = time.TICKS_PER_QUARTER_NOTE
+
+def setup_module(convert):
+    pass
+
+def teardown_module(convert):
+    pass
+
+def test_convert_events_to_bar():
+    mingus_bar = convert.convert_events_to_bar('C', [0, _QUARTER_TICKS, 2 * _QUARTER_TICKS],
+                                               [_QUARTER_TICKS, _QUARTER_TICKS, 2 * _QUARTER_TICKS],
+                                               [60, convert.REST_PITCH, 67])
+
+    assert [notes[:2] for notes in mingus_bar.bar] == [[0.0, value.quarter],
+                                                       [0.25, value.quarter],
+                                                       [0.5, value.half]]
+    assert mingus_bar.bar[0][2][0] == convert.midi_to_note(60)
+    assert mingus_bar.bar[1][2] is None
+    assert mingus_bar.is_full()
+
+def test_convert_events_to_bar_chords_and_gaps():
+    mingus_bar = convert.convert_events_to_bar('C', [_QUARTER_TICKS, _QUARTER_TICKS],
+                                               [_QUARTER_TICKS, _QUARTER_TICKS],
+                                               [60, 64])
+
+    assert mingus_bar.bar[0][2] is None
+    assert len(mingus_bar.bar[1][2]) == 2
+    assert mingus_bar.is_full()
+
+def test_convert_events_to_bar_spelling():
+    note_names = choice.get_scale_entry(choice.get_scale('Major', 'F')).note_names
+    mingus_bar = convert.convert_events_to_bar('F', [0], [4 * _QUARTER_TICKS], [70],
+                                               note_names=note_names)
+
+    assert mingus_bar.bar[0][2][0].name == 'Bb'
+    assert mingus_bar.bar[0][2][0].octave == 4
+
+def test_convert_events_to_bar_too_long():
+    with pytest.raises(AttributeError):
+        convert.convert_events_to_bar('C', [3 * _QUARTER_TICKS], [2 * _QUARTER_TICKS], [60])
+
+def test_convert_events_to_bar_out_of_order():
+    with pytest.raises(AttributeError):
+        convert.convert_events_to_bar('C', [_QUARTER_TICKS, 0], [_QUARTER_TICKS] * 2, [60, 62])
+
+def test_convert_events_to_bar_invalid_key():
+    with pytest.raises(AttributeError):
+        convert.convert_events_to_bar('H', [0], [_QUARTER_TICKS], [60])
+
+def test_convert_events_to_bars():
+    # Onsets go back to 0 where the second bar starts
+    mingus_bars = list(convert.convert_events_to_bars('C', [0, 2 * _QUARTER_TICKS, 0],
+                                                      [2 * _QUARTER_TICKS, 2 * _QUARTER_TICKS,
+                                                       4 * _QUARTER_TICKS],
+                                                      [60, 62, 64], [2, 1]))
+
+    assert len(mingus_bars) == 2
+    assert [notes[2][0] for notes in mingus_bars[0].bar] == [convert.midi_to_note(60),
+                                                             convert.midi_to_note(62)]
+    assert mingus_bars[1].bar[0][2][0] == convert.midi_to_note(64)
+    assert all(mingus_bar.is_full() for mingus_bar in mingus_bars)
+
+def test_convert_events_to_bars_empty_bar():
+    mingus_bars = list(convert.convert_events_to_bars('C', [0], [4 * _QUARTER_TICKS], [60],
+                                                      [0, 1]))
+
+    assert mingus_bars[0].bar[0][2] is None
+    assert all(mingus_bar.is_full() for mingus_bar in mingus_bars)
+
+def test_convert_events_to_bars_out_of_order():
+    with pytest.raises(AttributeError):
+        list(convert.convert_events_to_bars('C', [0, 2 * _QUARTER_TICKS, 0, 0],
+                                            [_QUARTER_TICKS] * 4, [60, 62, 64, 65], [3, 1]))
+
+def test_convert_events_to_bars_wrong_count():
+    with pytest.raises(AttributeError):
+        list(convert.convert_events_to_bars('C', [0], [_QUARTER_TICKS], [60], [2]))
+
+def test_midi_to_note_crosses_octave():
+    note_names = choice.get_scale_entry(choice.get_scale('Major', 'C#')).note_names
+
+    assert convert.midi_to_note(72, note_names).name == 'B#'
+    assert convert.midi_to_note(72, note_names).octave == 4
+    assert convert.midi_to_note(72).name == 'C'
+
+def test_convert_notes_to_bar_uses_every_note():
+    melody_timing = [[value.eighth, value.eighth], [value.quarter], [value.half]]
+    mingus_bar = convert.convert_notes_to_bar('C', melody_timing, ['C', 'D', 'E', 'F'])
+
+    assert [notes[2][0].name for notes in mingus_bar.bar] == ['C', 'D', 'E', 'F']
+
+if __name__ == "__main__":
+    pytest.main("-v")
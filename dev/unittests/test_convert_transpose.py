@@ -0,0 +1,83 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import numpy
+import pytest
+from mgen import convert
+from mgen import events
+from mingus.containers import note
+
+def setup_module(convert):
+    pass
+
+def teardown_module(convert):
+    pass
+
+def test_alter_octave():
+    new_bar = convert.alter_octave([['C', 'E'], None, ['G-5']], -2)
+
+    assert [[str(note) for note in notes] for notes in new_bar] == \
+        [["'C-2'", "'E-2'"], [], ["'G-3'"]]
+
+def test_alter_octave_keeps_spelling():
+    new_bar = convert.alter_octave([['Bb']], 1)
+
+    assert new_bar[0][0].name == 'Bb'
+    assert new_bar[0][0].octave == 5
+
+def test_transpose():
+    new_bar = convert.transpose([['C', 'E'], None, ['G-5', None]], 7)
+
+    assert [convert.note_to_midi(note) for note in new_bar[0]] == [67, 71]
+    assert new_bar[1] == []
+    assert convert.note_to_midi(new_bar[2][0]) == 86
+    assert new_bar[2][1] is None
+
+def test_alter_octave_note_objects():
+    new_bar = convert.alter_octave([[note.Note('C', 4), convert.midi_to_note(70)],
+                                    convert.midi_to_note(62)], 1)
+
+    assert [convert.note_to_midi(new_note) for new_note in new_bar[0]] == [72, 82]
+    assert convert.note_to_midi(new_bar[1][0]) == 74
+
+def test_alter_octave_out_of_range():
+    with pytest.raises(AttributeError):
+        convert.alter_octave([['C']], -6)
+
+def test_transpose_note_objects():
+    loud_note = note.Note('C', 4)
+    loud_note.set_velocity(100)
+
+    new_bar = convert.transpose([convert.midi_to_note(60), [loud_note]], 2)
+
+    assert convert.note_to_midi(new_bar[0][0]) == 62
+    assert convert.note_to_midi(new_bar[1][0]) == 62
+    assert new_bar[1][0].velocity == 100
+
+def test_transpose_pitches():
+    pitches = numpy.array([[60, convert.REST_PITCH], [72, 48]], dtype=numpy.int16)
+
+    transposed = convert.transpose_pitches(pitches, -12)
+
+    assert transposed.tolist() == [[48, convert.REST_PITCH], [60, 36]]
+    assert transposed.dtype == numpy.int16
+
+def test_transpose_pitches_out_of_range():
+    with pytest.raises(AttributeError):
+        convert.transpose_pitches([120], 12)
+
+def test_transpose_events_track():
+    event_composition = events.EventComposition()
+    melody_id = event_composition.add_track(1)
+    chords_id = event_composition.add_track(1)
+    event_composition.add_events(melody_id, [0], [960], [60])
+    event_composition.add_events(chords_id, [0], [960], [48])
+
+    event_composition.transpose(2, track_id=chords_id)
+
+    assert event_composition.pitches.tolist() == [60, 50]
+
+if __name__ == "__main__":
+    pytest.main("-v")
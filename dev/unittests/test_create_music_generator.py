@@ -7,6 +7,8 @@ import pytest
 from mgen import MusicGenerator
 from mgen import Style
 from mgen import JAZZ_CFG_FILE
+from mgen import tracks
+import io
 import os
 
 try:
@@ -85,14 +87,20 @@ def test_create_melody_track_at_location():
 
     assert len(music_generator.composition.tracks) == 1
 
+    # Track starts at the insert location without any bars before it
+    assert music_generator.composition.tracks[0].start_bar == location_to_add - 1
+    assert len(music_generator.composition.tracks[0].bars) == num_bars
+
+    padded_track = tracks.get_padded_track(music_generator.composition.tracks[0])
+
     # Bars before insert location
-    for bar in music_generator.composition.tracks[0].bars[0:location_to_add - 2]:
+    for bar in padded_track.bars[0:location_to_add - 1]:
         for note in bar:
             # Location 2 in this list is the note value
             assert note[2] is None
 
     # Make sure the correct number of bars exist at the insert location
-    assert len(music_generator.composition.tracks[0].bars[location_to_add - 1:]) == num_bars
+    assert len(padded_track.bars[location_to_add - 1:]) == num_bars
 
 def test_create_melody_track_repeat():
     '''
@@ -114,6 +122,40 @@ def test_create_melody_track_repeat():
         # Current bar is the same as the second repeated bar
         assert music_generator.composition.tracks[0].bars[x + num_bars] == music_generator.composition.tracks[0].bars[x + 2 * num_bars]
 
+def test_iter_melody_bars():
+    '''
+    Test that melody bars are streamed lazily, and are the same bars that
+    create_melody_track would have created
+    '''
+    num_bars = 10
+    melody_bars = MusicGenerator(seed=1234).iter_melody_bars(num_bars)
+    melody_track = MusicGenerator(seed=1234).create_melody_track(num_bars)
+
+    first_bar = next(melody_bars)
+    remaining_bars = list(melody_bars)
+
+    assert len(remaining_bars) == num_bars - 1
+    assert ([str(bar) for bar in [first_bar] + remaining_bars] ==
+            [str(bar) for bar in melody_track.bars])
+
+def test_iter_melody_bars_batches():
+    '''
+    Test that the right number of bars come out when generating in batches
+    '''
+    num_bars = 10
+    melody_bars = MusicGenerator().iter_melody_bars(num_bars, bars_per_batch=3)
+
+    assert len(list(melody_bars)) == num_bars
+
+def test_iter_melody_bars_endless():
+    '''
+    Test that melody bars keep coming when the number of bars isn't given
+    '''
+    melody_bars = MusicGenerator().iter_melody_bars(bars_per_batch=4)
+
+    for _ in range(0, 50):
+        assert next(melody_bars) is not None
+
 def test_create_chords_track():
     '''
     Test that adding a chords track actually adds it to the composition
@@ -154,14 +196,20 @@ def test_create_chords_track_at_location():
 
     assert len(music_generator.composition.tracks) == 1
 
+    # Track starts at the insert location without any bars before it
+    assert music_generator.composition.tracks[0].start_bar == location_to_add - 1
+    assert len(music_generator.composition.tracks[0].bars) == num_bars
+
+    padded_track = tracks.get_padded_track(music_generator.composition.tracks[0])
+
     # Bars before insert location
-    for bar in music_generator.composition.tracks[0].bars[0:location_to_add - 2]:
+    for bar in padded_track.bars[0:location_to_add - 1]:
         for note in bar:
             # Location 2 in this list is the note value
             assert note[2] is None
 
     # Make sure the correct number of bars exist at the insert location
-    assert len(music_generator.composition.tracks[0].bars[location_to_add - 1:]) == num_bars
+    assert len(padded_track.bars[location_to_add - 1:]) == num_bars
 
 def test_create_chords_track_repeat():
     '''
@@ -241,6 +289,36 @@ def test_remove_track_default():
     assert len(music_generator.composition.tracks[0].bars) == melody_num_bars
     assert len(music_generator.composition.tracks[1].bars) == melody_num_bars
 
+def test_seed_reproducible():
+    '''
+    Test that generators with the same seed generate the same music
+    '''
+    music_generator_1 = MusicGenerator(seed=1234)
+    music_generator_2 = MusicGenerator(seed=1234)
+
+    assert music_generator_1._key == music_generator_2._key
+
+    for music_generator in (music_generator_1, music_generator_2):
+        music_generator.insert_track(music_generator.create_melody_track(8))
+        music_generator.insert_track(music_generator.create_chords_track(8))
+
+    assert str(music_generator_1) == str(music_generator_2)
+
+def test_spawn_rngs_per_track():
+    '''
+    Test that tracks generated from spawned random number generators are
+    reproducible
+    '''
+    tracks = []
+    for _ in range(0, 2):
+        music_generator = MusicGenerator(seed=1234)
+        track_rngs = music_generator.spawn_rngs(2)
+        tracks.append([str(music_generator.create_melody_track(8, rng=track_rng))
+                       for track_rng in track_rngs])
+
+    assert tracks[0] == tracks[1]
+    assert tracks[0][0] != tracks[0][1]
+
 def test_set_invalid_time_signature():
     '''
     Test that exception is thrown with invalid time signature
@@ -366,6 +444,35 @@ def test_export_midi_path(create_file_mock):
     resulting_path = music_generator.export_midi(filename)
     assert create_file_mock.called_with(resulting_path)
 
+def test_get_midi_bytes(tmpdir):
+    music_generator = MusicGenerator(seed=3)
+    music_generator.insert_track(music_generator.create_melody_track(num_bars=4))
+    music_generator.insert_track(music_generator.create_chords_track(num_bars=4),
+                                 location_to_add=2)
+
+    midi_data = music_generator.get_midi_bytes(bpm=90)
+    midi_path = music_generator.export_midi(str(tmpdir.join('test_export_midi.mid')), bpm=90)
+
+    assert midi_data.startswith(b'MThd')
+    with open(midi_path, 'rb') as midi_file:
+        assert midi_file.read() == midi_data
+
+def test_write_midi():
+    music_generator = MusicGenerator(seed=3)
+    music_generator.insert_track(music_generator.create_melody_track(num_bars=4))
+    midi_file = io.BytesIO()
+
+    bytes_written = music_generator.write_midi(midi_file, repeat=1)
+
+    assert bytes_written == len(midi_file.getvalue())
+    assert midi_file.getvalue() == music_generator.get_midi_bytes(repeat=1)
+
+def test_get_midi_bytes_no_tracks():
+    music_generator = MusicGenerator()
+
+    with patch('warnings.warn') as warn_mock:
+        assert music_generator.get_midi_bytes() is None
+        assert warn_mock.call_count == 1
 
 @patch('%s.open' % __name__, mock_open(read_data='aaa'), create=True)
 def test_export_pkl_invalid_path():
@@ -418,6 +525,31 @@ def test_from_pickle():
 
     os.remove(filename)
 
+def test_export_all(tmpdir):
+    music_generator = MusicGenerator(seed=2)
+    music_generator.insert_track(music_generator.create_melody_track(num_bars=4))
+
+    def fake_to_pdf(ly_string, file_path, **kwargs):
+        with open(file_path + '.pdf', 'w') as pdf_file:
+            pdf_file.write(ly_string)
+
+    with patch('mingus.extra.lilypond.to_pdf', side_effect=fake_to_pdf) as lilypond_mock:
+        export_paths = music_generator.export(pickle_path=str(tmpdir.join('all.pkl')),
+                                              pdf_path=str(tmpdir.join('all.pdf')),
+                                              midi_path=str(tmpdir.join('all.mid')),
+                                              bpm=80)
+
+    assert lilypond_mock.call_count == 1
+    assert export_paths == {'pkl': str(tmpdir.join('all.pkl')),
+                            'pdf': str(tmpdir.join('all.pdf')),
+                            'mid': str(tmpdir.join('all.mid'))}
+    with open(export_paths['mid'], 'rb') as midi_file:
+        assert midi_file.read() == music_generator.get_midi_bytes(bpm=80)
+    assert len(MusicGenerator.from_pickle(export_paths['pkl']).composition.tracks) == 1
+
+def test_export_nothing():
+    assert MusicGenerator().export() == {}
+
 def test_to_string():
     music_generator = MusicGenerator()
     music_generator.insert_track(music_generator.create_melody_track(num_bars=4))
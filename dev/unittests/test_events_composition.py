@@ -0,0 +1,135 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+from mgen import time
+from mgen import choice
+from mgen import convert
+from mgen import create
+from mgen import events
+from mgen.create import MusicGenerator
+from mingus.core import value
+
+_QUARTER_TICKS = time.TICKS_PER_QUARTER_NOTE
+
+def setup_module(events):
+    pass
+
+def teardown_module(events):
+    pass
+
+def test_add_events():
+    event_composition = events.EventComposition()
+    melody_id = event_composition.add_track(1)
+    chords_id = event_composition.add_track(1)
+
+    event_composition.add_events(melody_id, [0, _QUARTER_TICKS], [_QUARTER_TICKS] * 2,
+                                 [60, 62])
+    event_composition.add_events(chords_id, [0, 0], [4 * _QUARTER_TICKS] * 2,
+                                 [48, 52], velocities=[80, 90])
+
+    assert len(event_composition) == 4
+    assert event_composition.onsets.tolist() == [0, _QUARTER_TICKS, 0, 0]
+    assert event_composition.pitches.tolist() == [60, 62, 48, 52]
+    assert event_composition.velocities.tolist() == [events.DEFAULT_VELOCITY,
+                                                     events.DEFAULT_VELOCITY, 80, 90]
+    assert event_composition.track_ids.tolist() == [0, 0, 1, 1]
+
+def test_add_events_out_of_range():
+    event_composition = events.EventComposition()
+    track_id = event_composition.add_track(1)
+
+    with pytest.raises(AttributeError):
+        event_composition.add_events(track_id, [0], [_QUARTER_TICKS], [-12])
+
+    with pytest.raises(AttributeError):
+        event_composition.add_events(track_id, [0], [_QUARTER_TICKS], [60], velocities=300)
+
+    assert len(event_composition) == 0
+
+def test_add_events_missing_track():
+    event_composition = events.EventComposition()
+
+    with pytest.raises(AttributeError):
+        event_composition.add_events(0, [0], [_QUARTER_TICKS], [60])
+
+def test_add_events_mismatched_lengths():
+    event_composition = events.EventComposition()
+    track_id = event_composition.add_track(1)
+
+    with pytest.raises(AttributeError):
+        event_composition.add_events(track_id, [0, 1], [_QUARTER_TICKS], [60])
+
+def test_to_track_rests_and_chords():
+    event_composition = events.EventComposition('C', (4, 4))
+    track_id = event_composition.add_track(2)
+
+    # Rest for a quarter, then a two note chord for a half note
+    event_composition.add_events(track_id, [_QUARTER_TICKS] * 2,
+                                 [2 * _QUARTER_TICKS] * 2, [60, 64])
+
+    mingus_track = event_composition.to_track(track_id)
+    first_bar = mingus_track.bars[0].bar
+
+    assert len(mingus_track.bars) == 2
+    assert first_bar[0][2] is None
+    assert first_bar[1][:2] == [0.25, value.half]
+    assert [int(note) + 12 for note in first_bar[1][2]] == [60, 64]
+    assert first_bar[2][2] is None
+    assert mingus_track.bars[0].is_full()
+
+    # Second bar is only rest
+    assert mingus_track.bars[1].bar == [[0.0, value.whole, None]]
+
+def test_split_ticks():
+    assert time.split_ticks(3 * _QUARTER_TICKS) == [2 * _QUARTER_TICKS, _QUARTER_TICKS]
+    assert time.ticks_to_value(_QUARTER_TICKS) == value.quarter
+
+def test_create_melody_events():
+    music_generator = MusicGenerator(seed=11)
+    event_composition = music_generator.create_melody_events(4, location_to_add=2)
+    bar_ticks = time.get_bar_ticks(music_generator._time_signature)
+
+    assert event_composition.track_bars == [5]
+    assert event_composition.onsets.min() >= bar_ticks
+    assert (event_composition.onsets + event_composition.durations).max() <= 5 * bar_ticks
+    assert choice.REST_PITCH not in event_composition.pitches.tolist()
+
+def _get_bar_events(melody_bar):
+    # Rests in a row become one gap in the events, so only notes are compared
+    return [(notes[0], notes[1], [convert.note_to_midi(note) for note in notes[2]])
+            for notes in melody_bar.bar if notes[2] is not None]
+
+def test_create_melody_events_matches_rhythm():
+    # Same seed draws the same melody as the mingus based one, across batches
+    num_bars = create.MELODY_BARS_PER_BATCH + 6
+    mingus_track = MusicGenerator(seed=12).create_melody_track(num_bars)
+    event_track = MusicGenerator(seed=12).create_melody_events(num_bars).to_track(0)
+
+    assert ([_get_bar_events(melody_bar) for melody_bar in mingus_track.bars] ==
+            [_get_bar_events(melody_bar) for melody_bar in event_track.bars])
+
+def test_create_melody_events_octave_out_of_range():
+    with pytest.raises(AttributeError):
+        MusicGenerator(seed=12).create_melody_events(4, octave_adjust=7)
+
+def test_create_chords_events():
+    music_generator = MusicGenerator(seed=13)
+    event_composition = music_generator.create_chords_events(num_bars=4,
+                                                             octave_adjust=-1)
+    composition = event_composition.to_composition()
+
+    assert event_composition.track_bars == [4]
+    assert len(composition.tracks[0].bars) == 4
+    for chord_bar in composition.tracks[0].bars:
+        assert chord_bar.bar[0][1] == value.whole
+        assert all(note.octave == 3 for note in chord_bar.bar[0][2])
+
+def test_create_chords_events_octave_out_of_range():
+    with pytest.raises(AttributeError):
+        MusicGenerator(seed=13).create_chords_events(num_bars=4, octave_adjust=-6)
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,126 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+import struct
+from mgen import events
+from mgen import midi
+from mgen import time
+from mgen.create import MusicGenerator
+
+_QUARTER_TICKS = time.TICKS_PER_QUARTER_NOTE
+
+def setup_module(midi):
+    pass
+
+def teardown_module(midi):
+    pass
+
+def _read_chunks(midi_data):
+    chunks = []
+    while midi_data:
+        chunk_type, length = struct.unpack('>4sI', midi_data[:8])
+        chunks.append((chunk_type, midi_data[8:8 + length]))
+        midi_data = midi_data[8 + length:]
+    return chunks
+
+def _read_note_events(track_data):
+    '''
+    Returns (absolute tick, status, pitch, velocity) for every note event.
+    '''
+    note_events = []
+    tick = 0
+    position = 0
+    while position < len(track_data):
+        delta = 0
+        while True:
+            byte = bytearray(track_data[position:position + 1])[0]
+            position += 1
+            delta = (delta << 7) | (byte & 0x7F)
+            if not byte & 0x80:
+                break
+        tick += delta
+
+        status = bytearray(track_data[position:position + 1])[0]
+        if status == 0xFF:
+            length = bytearray(track_data[position + 2:position + 3])[0]
+            position += 3 + length
+        else:
+            pitch, velocity = bytearray(track_data[position + 1:position + 3])
+            note_events.append((tick, status, pitch, velocity))
+            position += 3
+    return note_events
+
+def test_encode_varlen():
+    assert midi.encode_varlen(0) == b'\x00'
+    assert midi.encode_varlen(0x7F) == b'\x7f'
+    assert midi.encode_varlen(0x80) == b'\x81\x00'
+    assert midi.encode_varlen(0x3FFF) == b'\xff\x7f'
+    assert midi.encode_varlen(midi.MAX_DELTA_TICKS) == b'\xff\xff\xff\x7f'
+
+    with pytest.raises(AttributeError):
+        midi.encode_varlen(midi.MAX_DELTA_TICKS + 1)
+
+def test_encode_note_track():
+    chunk = midi.encode_note_track([0, _QUARTER_TICKS, 200000], [_QUARTER_TICKS] * 3,
+                                   [60, 60, 64], [100, 90, 80], channels=2)
+    chunk_type, track_data = _read_chunks(chunk)[0]
+
+    assert chunk_type == b'MTrk'
+    assert track_data.endswith(b'\x00\xff\x2f\x00')
+    assert _read_note_events(track_data) == [
+        (0, 0x92, 60, 100),
+        # Note off comes before the note on at the same tick
+        (_QUARTER_TICKS, 0x82, 60, midi.NOTE_OFF_VELOCITY),
+        (_QUARTER_TICKS, 0x92, 60, 90),
+        (2 * _QUARTER_TICKS, 0x82, 60, midi.NOTE_OFF_VELOCITY),
+        (200000, 0x92, 64, 80),
+        (200000 + _QUARTER_TICKS, 0x82, 64, midi.NOTE_OFF_VELOCITY),
+    ]
+
+def test_encode_note_track_out_of_range():
+    # Would be written as 0xf4, a status byte where a data byte belongs
+    with pytest.raises(AttributeError):
+        midi.encode_note_track([0], [_QUARTER_TICKS], [-12], [100])
+
+    with pytest.raises(AttributeError):
+        midi.encode_note_track([0], [_QUARTER_TICKS], [60], [128])
+
+def test_encode_note_track_empty():
+    assert midi.encode_note_track([], [], [], []) == b'MTrk\x00\x00\x00\x04\x00\xff\x2f\x00'
+
+def test_encode_event_composition():
+    event_composition = events.EventComposition(title='Test')
+    melody_id = event_composition.add_track(1)
+    chords_id = event_composition.add_track(1)
+    event_composition.add_events(chords_id, [0, 0], [4 * _QUARTER_TICKS] * 2, [48, 52])
+    event_composition.add_events(melody_id, [_QUARTER_TICKS, 0],
+                                 [_QUARTER_TICKS, _QUARTER_TICKS], [62, 60])
+
+    chunks = _read_chunks(midi.encode_event_composition(event_composition, bpm=120))
+
+    assert chunks[0] == (b'MThd', struct.pack('>HHH', 1, 3, _QUARTER_TICKS))
+    assert b'\xff\x51\x03\x07\xa1\x20' in chunks[1][1]
+    assert [note_event[2] for note_event in _read_note_events(chunks[2][1])
+            if note_event[1] & 0xF0 == midi.NOTE_ON] == [60, 62]
+    assert len(_read_note_events(chunks[3][1])) == 4
+
+def test_get_track_channel():
+    assert [midi.get_track_channel(track_id) for track_id in range(0, 17)] == \
+        [0, 1, 2, 3, 4, 5, 6, 7, 8, 10, 11, 12, 13, 14, 15, 0, 1]
+
+def test_event_composition_write_midi(tmpdir):
+    music_generator = MusicGenerator(seed=5)
+    event_composition = music_generator.create_melody_events(4)
+    midi_path = str(tmpdir.join('melody.mid'))
+
+    bytes_written = event_composition.write_midi(midi_path, bpm=90)
+
+    with open(midi_path, 'rb') as midi_file:
+        assert midi_file.read() == event_composition.get_midi_bytes(bpm=90)
+    assert bytes_written == len(event_composition.get_midi_bytes(bpm=90))
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,91 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import io
+import numpy
+import pytest
+import struct
+from mgen import events
+from mgen import midi
+from mgen import time
+from mgen.create import MusicGenerator
+
+_QUARTER_TICKS = time.TICKS_PER_QUARTER_NOTE
+
+def setup_module(midi):
+    pass
+
+def teardown_module(midi):
+    pass
+
+def _iter_chunks(onsets, durations, pitches, chunk_size):
+    for start in range(0, len(onsets), chunk_size):
+        yield (onsets[start:start + chunk_size], durations[start:start + chunk_size],
+               pitches[start:start + chunk_size])
+
+def test_stream_matches_encoder():
+    onsets = numpy.arange(0, 50) * _QUARTER_TICKS // 2
+    # Long notes overlap the chunks after them
+    durations = numpy.where(numpy.arange(0, 50) % 7 == 0, 5 * _QUARTER_TICKS,
+                            _QUARTER_TICKS // 2)
+    pitches = 60 + numpy.arange(0, 50) % 12
+
+    event_composition = events.EventComposition(title='Stream')
+    track_id = event_composition.add_track(7)
+    event_composition.add_events(track_id, onsets, durations, pitches)
+
+    midi_file = io.BytesIO()
+    bytes_written = midi.write_event_stream(midi_file, [_iter_chunks(onsets, durations, pitches, 4)],
+                                            bpm=120, title='Stream')
+
+    assert midi_file.getvalue() == midi.encode_event_composition(event_composition, bpm=120)
+    assert bytes_written == len(midi_file.getvalue())
+
+def test_stream_patches_lengths():
+    midi_file = io.BytesIO()
+    midi_file.write(b'junk')
+
+    writer = midi.MidiStreamWriter(midi_file)
+    writer.begin_track(channel=1)
+    writer.add_notes([0], [_QUARTER_TICKS], [60])
+    writer.begin_track(channel=2)
+    writer.add_notes([], [], [])
+    writer.close()
+
+    midi_data = midi_file.getvalue()[4:]
+    assert struct.unpack('>H', midi_data[10:12])[0] == 3
+    assert midi_data.endswith(b'MTrk\x00\x00\x00\x04\x00\xff\x2f\x00')
+    assert midi.encode_note_track([0], [_QUARTER_TICKS], [60], [64], 1) in midi_data
+
+def test_stream_notes_out_of_order():
+    writer = midi.MidiStreamWriter(io.BytesIO())
+
+    with pytest.raises(AttributeError):
+        writer.add_notes([0], [_QUARTER_TICKS], [60])
+
+    writer.begin_track()
+    writer.add_notes([_QUARTER_TICKS], [_QUARTER_TICKS], [60])
+
+    with pytest.raises(AttributeError):
+        writer.add_notes([0], [_QUARTER_TICKS], [62])
+
+def test_iter_melody_events():
+    music_generator = MusicGenerator(seed=8)
+    melody_bars = list(MusicGenerator(seed=8).iter_melody_bars(6, bars_per_batch=4))
+    melody_chunks = list(music_generator.iter_melody_events(6, bars_per_batch=4,
+                                                            location_to_add=2))
+
+    assert len(melody_chunks) == 2
+
+    onsets = numpy.concatenate([chunk[0] for chunk in melody_chunks])
+    assert onsets[0] >= time.get_bar_ticks(music_generator._time_signature)
+    assert (numpy.diff(onsets) > 0).all()
+
+    notes_in_bars = sum(len(notes) for melody_bar in melody_bars
+                        for _, _, notes in melody_bar if notes)
+    assert sum(len(chunk[2]) for chunk in melody_chunks) == notes_in_bars
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,81 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import copy
+import pickle
+import pytest
+from mgen import convert
+from mgen import pitch
+from mgen import tracks
+from mingus.containers import bar
+from mingus.containers import note
+from mingus.core import value
+
+def setup_module(pitch):
+    pass
+
+def teardown_module(pitch):
+    pass
+
+def test_get_note_interned():
+    assert pitch.get_note('C#', 5) is pitch.get_note('C#', 5)
+    assert pitch.get_note('C#', 5) is not pitch.get_note('C#', 4)
+    assert pitch.get_note('C#', 5) is not pitch.get_note('C#', 5, velocity=90)
+
+def test_frozen_note_is_a_note():
+    frozen_note = pitch.get_note('Bb', 3)
+
+    assert isinstance(frozen_note, note.Note)
+    assert frozen_note == note.Note('Bb', 3)
+    assert hash(pitch.get_note('B#', 4)) == hash(pitch.get_note('C', 5))
+
+def test_frozen_note_cannot_change():
+    frozen_note = pitch.get_note('D', 4)
+
+    with pytest.raises(AttributeError):
+        frozen_note.octave_up()
+
+    with pytest.raises(AttributeError):
+        frozen_note.name = 'E'
+
+    assert frozen_note.octave == 4
+
+def test_copy_thaws():
+    frozen_note = pitch.get_note('E', 4, velocity=100)
+    copied_note = copy.deepcopy(frozen_note)
+
+    copied_note.octave_up()
+
+    assert not isinstance(copied_note, pitch.FrozenNote)
+    assert copied_note.octave == 5
+    assert copied_note.velocity == 100
+    assert frozen_note.octave == 4
+
+def test_pickle_interns():
+    frozen_note = pitch.get_note('F#', 2)
+
+    assert pickle.loads(pickle.dumps(frozen_note)) is frozen_note
+
+def test_intern_note():
+    assert pitch.intern_note('G-3') is pitch.get_note('G', 3)
+    assert pitch.intern_note(note.Note('G', 3)) is pitch.get_note('G', 3)
+
+def test_midi_to_note_interned():
+    assert convert.midi_to_note(61) is convert.midi_to_note(61)
+    assert convert.midi_to_note(61) is pitch.get_note('C#', 4)
+
+def test_writable_bar_thaws_notes():
+    shared_bar = bar.Bar()
+    shared_bar.place_notes(pitch.get_note('C', 4), value.whole)
+    new_track = tracks.CopyOnWriteTrack()
+    new_track.add_bar(shared_bar)
+
+    new_track.transpose('3')
+
+    assert new_track.bars[0].bar[0][2][0].name == 'E'
+    assert pitch.get_note('C', 4).name == 'C'
+
+if __name__ == "__main__":
+    pytest.main("-v")
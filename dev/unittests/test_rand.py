@@ -0,0 +1,70 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+import random
+from mgen import rand
+from mgen import choice
+
+def setup_module(rand):
+    pass
+
+def teardown_module(rand):
+    pass
+
+def test_make_rng_seed():
+    rng_1 = rand.make_rng(1234)
+    rng_2 = rand.make_rng(1234)
+
+    assert [rng_1.random() for _ in range(0, 10)] == [rng_2.random() for _ in range(0, 10)]
+
+def test_make_rng_reuses_rng():
+    rng = random.Random(1234)
+
+    assert rand.make_rng(rng) is rng
+
+def test_spawn_rngs_reproducible():
+    children_1 = rand.spawn_rngs(rand.make_rng(1234), 4)
+    children_2 = rand.spawn_rngs(rand.make_rng(1234), 4)
+
+    for child_1, child_2 in zip(children_1, children_2):
+        assert child_1.getstate() == child_2.getstate()
+
+def test_spawn_rngs_independent():
+    children = rand.spawn_rngs(rand.make_rng(1234), 4)
+    first_draws = [child.random() for child in children]
+
+    assert len(children) == 4
+    assert len(set(first_draws)) == 4
+
+def test_spawn_seeds_advance_parent():
+    rng = rand.make_rng(1234)
+    first_seeds = rand.spawn_seeds(rng, 3)
+    second_seeds = rand.spawn_seeds(rng, 3)
+
+    assert len(set(first_seeds + second_seeds)) == 6
+
+def test_get_numpy_rng_reproducible():
+    draws_1 = rand.get_numpy_rng(rand.make_rng(1234)).randint(0, 100, size=10)
+    draws_2 = rand.get_numpy_rng(rand.make_rng(1234)).randint(0, 100, size=10)
+
+    assert list(draws_1) == list(draws_2)
+
+def test_choices_reproducible():
+    scale = choice.scales.Major("C")
+    prob_list = [("whole", "0.25"),
+                 ("half", "0.25"),
+                 ("quarter", "0.50")]
+
+    def draw_everything(rng):
+        return (choice.choose_key([("C", "0.5"), ("G", "0.5")], rng=rng),
+                choice.choose_track_notes([8, 8], scale, rng=rng),
+                choice.choose_bar_timing((4, 4), prob_list, rng=rng),
+                choice.choose_next_timing(1.0, prob_list, rng=rng))
+
+    assert draw_everything(rand.make_rng(1234)) == draw_everything(rand.make_rng(1234))
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,149 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import os
+import pytest
+import stat
+import sys
+from mock import patch
+from mgen import cache
+from mgen import cfg_import
+from mgen import render
+from mgen.create import MusicGenerator
+
+# Stands in for lilypond: logs each call, then makes a pdf for every source
+_FAKE_LILYPOND = '''#!{python}
+import os, sys, time
+arguments = sys.argv[1:]
+with open(os.path.join(os.path.dirname(sys.argv[0]), 'calls.log'), 'a') as log_file:
+    log_file.write(' '.join(arguments) + '\\n')
+if {sleep}:
+    time.sleep({sleep})
+output_dir = arguments[arguments.index('-o') + 1]
+for ly_path in arguments[arguments.index('-o') + 2:]:
+    with open(ly_path) as ly_file:
+        ly_string = ly_file.read()
+    assert ly_string.startswith('\\\\version')
+    pdf_name = os.path.basename(ly_path)[:-3] + '.pdf'
+    with open(os.path.join(output_dir, pdf_name), 'w') as pdf_file:
+        pdf_file.write(ly_string)
+'''
+
+def setup_module(render):
+    pass
+
+def teardown_module(render):
+    pass
+
+def _make_lilypond(tmpdir, sleep=0):
+    lilypond_path = str(tmpdir.join('lilypond'))
+    with open(lilypond_path, 'w') as lilypond_file:
+        lilypond_file.write(_FAKE_LILYPOND.format(python=sys.executable, sleep=sleep))
+    os.chmod(lilypond_path, os.stat(lilypond_path).st_mode | stat.S_IEXEC)
+    return lilypond_path
+
+def _get_calls(tmpdir):
+    with open(str(tmpdir.join('calls.log'))) as log_file:
+        return log_file.read().splitlines()
+
+def test_render_pdfs_batches(tmpdir):
+    lilypond_path = _make_lilypond(tmpdir)
+    first_dir = tmpdir.mkdir('first')
+    second_dir = tmpdir.mkdir('second')
+    file_paths = ([str(first_dir.join('score_' + str(index))) for index in range(0, 5)] +
+                  [str(second_dir.join('score'))])
+
+    results = list(render.render_pdfs([('{ c }', file_path) for file_path in file_paths],
+                                      lilypond_path, files_per_call=2, processes=2))
+
+    assert [result.file_path for result in results] == file_paths
+    assert [result.pdf_path for result in results] == [file_path + '.pdf' for file_path in file_paths]
+    assert all(result.error is None for result in results)
+    # Three calls for the first directory, one for the second
+    assert len(_get_calls(tmpdir)) == 4
+    assert not first_dir.listdir('*.ly')
+
+def test_render_pdfs_interleaved_dirs(tmpdir):
+    lilypond_path = _make_lilypond(tmpdir)
+    first_dir = tmpdir.mkdir('first')
+    second_dir = tmpdir.mkdir('second')
+    file_paths = [str(first_dir.join('score_0')), str(second_dir.join('score_1')),
+                  str(first_dir.join('score_2')), str(second_dir.join('score_3'))]
+
+    results = list(render.render_pdfs([('{ c }', file_path) for file_path in file_paths],
+                                      lilypond_path, processes=2))
+
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert [result.pdf_path for result in results] == [file_path + '.pdf' for file_path in file_paths]
+
+def test_export_pdfs_interleaved_dirs(tmpdir):
+    lilypond_path = _make_lilypond(tmpdir)
+    music_generators = [MusicGenerator(seed=seed) for seed in range(0, 3)]
+    for music_generator in music_generators:
+        music_generator.insert_track(music_generator.create_melody_track(2))
+    file_paths = [str(tmpdir.join('a', 'score_0')), str(tmpdir.join('b', 'score_1')),
+                  str(tmpdir.join('a', 'score_2'))]
+
+    with patch.object(cfg_import.config, 'LILYPOND_INSTALLATION', lilypond_path):
+        pdf_paths = MusicGenerator.export_pdfs(music_generators, file_paths)
+
+    assert pdf_paths == [file_path + '.pdf' for file_path in file_paths]
+
+def test_export_pdfs_cached_by_source(tmpdir):
+    lilypond_path = _make_lilypond(tmpdir)
+    export_cache = cache.ExportCache(str(tmpdir.join('cache')))
+    music_generators = [MusicGenerator(seed=seed) for seed in range(0, 3)]
+    for music_generator in music_generators:
+        music_generator.insert_track(music_generator.create_melody_track(2))
+    file_paths = [str(tmpdir.join('a', 'score_0')), str(tmpdir.join('b', 'score_1')),
+                  str(tmpdir.join('a', 'score_2'))]
+
+    with patch.object(cfg_import.config, 'LILYPOND_INSTALLATION', lilypond_path):
+        MusicGenerator.export_pdfs(music_generators, file_paths, export_cache=export_cache)
+
+    # The fake lilypond puts the source in the pdf
+    for music_generator in music_generators:
+        ly_string = music_generator.get_lilypond_string()
+        cached_path = export_cache.get(MusicGenerator._get_pdf_cache_key(ly_string), 'pdf')
+        with open(cached_path) as pdf_file:
+            assert pdf_file.read() == render.LILYPOND_VERSION_STATEMENT + ly_string
+
+def test_render_pdfs_timeout(tmpdir):
+    lilypond_path = _make_lilypond(tmpdir, sleep=10)
+
+    results = list(render.render_pdfs([('{ c }', str(tmpdir.join('score')))],
+                                      lilypond_path, timeout=0.5))
+
+    assert results[0].pdf_path is None
+    assert 'seconds' in results[0].error
+    assert not tmpdir.listdir('*.ly')
+
+def test_render_pdfs_missing_lilypond(tmpdir):
+    results = list(render.render_pdfs([('{ c }', str(tmpdir.join('score')))],
+                                      str(tmpdir.join('not_lilypond'))))
+
+    assert results[0].pdf_path is None
+    assert results[0].error
+
+def test_export_pdfs(tmpdir):
+    lilypond_path = _make_lilypond(tmpdir)
+    music_generators = [MusicGenerator(seed=seed) for seed in range(0, 3)]
+    for music_generator in music_generators[:2]:
+        music_generator.insert_track(music_generator.create_melody_track(2))
+    file_paths = [str(tmpdir.join('score_' + str(index) + '.pdf')) for index in range(0, 3)]
+
+    with patch.object(cfg_import.config, 'LILYPOND_INSTALLATION', lilypond_path):
+        with pytest.warns(UserWarning):
+            pdf_paths = MusicGenerator.export_pdfs(music_generators, file_paths)
+
+    assert pdf_paths == file_paths[:2] + [None]
+    assert len(_get_calls(tmpdir)) == 1
+
+def test_export_pdfs_mismatched_paths():
+    with pytest.raises(AttributeError):
+        MusicGenerator.export_pdfs([MusicGenerator()], [])
+
+if __name__ == "__main__":
+    pytest.main("-v")
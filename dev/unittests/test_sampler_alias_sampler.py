@@ -0,0 +1,96 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+from mgen import sampler
+
+_DEFAULT_TEST_PROBS = [("whole", "0.10"),
+                       ("half", "0.20"),
+                       ("quarter", "0.30"),
+                       ("eighth", "0.40")]
+
+def setup_module(sampler):
+    pass
+
+def teardown_module(sampler):
+    pass
+
+def test_alias_sampler_tables_preserve_probabilities():
+    alias_sampler = sampler.AliasSampler(_DEFAULT_TEST_PROBS)
+    number_items = len(alias_sampler)
+
+    # Add up how much of each column ends up going to each item
+    recovered = [0.0] * number_items
+    for index in range(0, number_items):
+        prob = alias_sampler._probability_table[index]
+        recovered[index] += prob / number_items
+        recovered[alias_sampler._alias_table[index]] += (1.0 - prob) / number_items
+
+    for (_, prob), recovered_prob in zip(_DEFAULT_TEST_PROBS, recovered):
+        assert recovered_prob == pytest.approx(float(prob))
+
+def test_alias_sampler_draw_single_prob():
+    prob_list = [("whole", "0.0"),
+                 ("half", "1.0"),
+                 ("quarter", "0.0")]
+    alias_sampler = sampler.AliasSampler(prob_list)
+
+    for _ in range(0, 100):
+        assert alias_sampler.draw() == "half"
+
+def test_alias_sampler_draw_only_item():
+    alias_sampler = sampler.AliasSampler([("whole", 1.0)])
+
+    assert alias_sampler.draw() == "whole"
+
+def test_alias_sampler_select_lower_bound():
+    alias_sampler = sampler.AliasSampler(_DEFAULT_TEST_PROBS)
+
+    assert alias_sampler.select(0.0) == "whole"
+
+def test_alias_sampler_select_upper_bound():
+    alias_sampler = sampler.AliasSampler(_DEFAULT_TEST_PROBS)
+
+    assert alias_sampler.select(1.0) == "eighth"
+
+def test_alias_sampler_select_middle():
+    alias_sampler = sampler.AliasSampler(_DEFAULT_TEST_PROBS)
+
+    assert alias_sampler.select(0.25) == "half"
+    assert alias_sampler.select(0.5) == "quarter"
+
+def test_alias_sampler_select_subset():
+    # Weights of a subset add up to less than 1.0
+    alias_sampler = sampler.AliasSampler([("whole", "0.10"),
+                                          ("half", "0.20"),
+                                          ("quarter", "0.20")])
+
+    assert alias_sampler.select(0.1) == "whole"
+    assert alias_sampler.select(0.5) == "half"
+    assert alias_sampler.select(0.7) == "quarter"
+
+def test_alias_sampler_empty():
+    alias_sampler = sampler.AliasSampler([])
+
+    with pytest.raises(AttributeError):
+        alias_sampler.draw()
+
+def test_compile_prob_list_reuses_sampler():
+    alias_sampler = sampler.AliasSampler(_DEFAULT_TEST_PROBS)
+
+    assert sampler.compile_prob_list(alias_sampler) is alias_sampler
+
+def test_alias_sampler_randomness():
+    alias_sampler = sampler.AliasSampler(_DEFAULT_TEST_PROBS)
+    # Populate 10 "random" choices
+    draws = [alias_sampler.draw() for _ in range(0, 10)]
+
+    # Make sure they"re not ALL equal. Although this is possible... it"s
+    # very unlikely. If you got here because of a failed test, I"m sorry.
+    # Everything is most likely fine. Run them again.
+    assert len(set(draws)) != 1
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,63 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pytest
+from mgen import time
+from mgen import convert
+from mingus.core import value
+
+_DOTTED_QUARTER = value.dots(value.quarter)
+
+def setup_module(time):
+    pass
+
+def teardown_module(time):
+    pass
+
+def test_get_note_ticks():
+    assert time.get_note_ticks(value.whole) == time.TICKS_PER_WHOLE_NOTE
+    assert time.get_note_ticks(value.quarter) == time.TICKS_PER_QUARTER_NOTE
+    assert time.get_note_ticks(_DOTTED_QUARTER) == 3 * time.TICKS_PER_QUARTER_NOTE // 2
+
+def test_get_bar_ticks():
+    assert time.get_bar_ticks((4, 4)) == 4 * time.TICKS_PER_QUARTER_NOTE
+    assert time.get_bar_ticks((6, 8)) == 3 * time.TICKS_PER_QUARTER_NOTE
+
+def test_ticks_round_trip():
+    for ticks in (0, 1, 240, 1440, 3840):
+        assert time.time_to_ticks(time.ticks_to_time(ticks)) == ticks
+
+def test_get_time_remaining_no_drift():
+    # Adding these up as floats comes out just over a whole note
+    melody_bar = [[_DOTTED_QUARTER], [_DOTTED_QUARTER], [value.quarter]]
+
+    assert time.get_ticks_remaining(melody_bar) == 0
+    assert time.get_time_remaining(melody_bar) == 0.0
+
+def test_get_time_remaining_partial_bar():
+    melody_bar = [[value.quarter], None, [value.eighth, value.eighth]]
+
+    assert time.get_ticks_remaining(melody_bar, (3, 4)) == time.TICKS_PER_QUARTER_NOTE
+    assert time.get_time_remaining(melody_bar, (3, 4)) == 0.25
+
+def test_convert_notes_to_bar_no_drift():
+    melody_timing = [[_DOTTED_QUARTER, _DOTTED_QUARTER, value.quarter]]
+
+    mingus_bar = convert.convert_notes_to_bar('C', melody_timing, ['C', 'E', 'G'])
+
+    assert len(mingus_bar.bar) == 3
+    assert [entry[0] for entry in mingus_bar.bar] == [0.0, 0.375, 0.75]
+    assert mingus_bar.current_beat == 1.0
+
+def test_convert_notes_to_bar_overflow():
+    melody_timing = [[value.half, value.half, value.half]]
+
+    mingus_bar = convert.convert_notes_to_bar('C', melody_timing, ['C', 'E', None])
+
+    # Last note doesn't fit in the bar
+    assert len(mingus_bar.bar) == 2
+
+if __name__ == "__main__":
+    pytest.main("-v")
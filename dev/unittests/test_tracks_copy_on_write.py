@@ -0,0 +1,153 @@
+"""
+Created on Oct 18, 2026
+
+@author: Alexander VanTol
+"""
+import pickle
+import pytest
+from mgen import tracks
+from mgen.create import MusicGenerator
+from mingus.containers import bar
+from mingus.containers import track
+from mingus.core import value
+
+def setup_module(tracks):
+    pass
+
+def teardown_module(tracks):
+    pass
+
+def _make_track(num_bars):
+    new_track = tracks.CopyOnWriteTrack()
+    for _ in range(0, num_bars):
+        new_bar = bar.Bar()
+        new_bar.place_notes('C', value.whole)
+        new_track.add_bar(new_bar)
+    return new_track
+
+def test_copy_shares_bars():
+    original = _make_track(4)
+    repeated = original.copy(times_to_repeat=2)
+
+    assert len(repeated.bars) == 12
+    assert all(repeated.bars[index] is original.bars[index % 4]
+               for index in range(0, 12))
+
+def test_write_does_not_leak():
+    original = _make_track(2)
+    repeated = original.copy(times_to_repeat=1)
+
+    repeated.get_writable_bar(2).transpose('3')
+
+    assert repeated.bars[2] is not original.bars[0]
+    assert repeated.bars[2].bar[0][2][0].name == 'E'
+    assert repeated.bars[0].bar[0][2][0].name == 'C'
+    assert original.bars[0].bar[0][2][0].name == 'C'
+
+def test_writable_bar_only_copied_once():
+    new_track = _make_track(1)
+
+    writable_bar = new_track.get_writable_bar(0)
+
+    assert new_track.get_writable_bar(0) is writable_bar
+
+def test_original_write_does_not_leak():
+    original = _make_track(1)
+    copied = original.copy()
+
+    original.transpose('5')
+
+    assert original.bars[0].bar[0][2][0].name == 'G'
+    assert copied.bars[0].bar[0][2][0].name == 'C'
+
+def test_add_notes_copies_last_bar():
+    original = tracks.CopyOnWriteTrack()
+    original.add_notes('C', value.half)
+    copied = original.copy()
+
+    copied.add_notes('E', value.half)
+
+    assert len(original.bars[0].bar) == 1
+    assert len(copied.bars[0].bar) == 2
+
+def test_from_plain_track():
+    plain_track = track.Track()
+    plain_track.add_notes('C', value.whole)
+
+    new_track = tracks.CopyOnWriteTrack.from_track(plain_track, times_to_repeat=1)
+    plain_track.bars[0].transpose('3')
+
+    assert len(new_track.bars) == 2
+    assert new_track.bars[0].bar[0][2][0].name == 'C'
+
+def test_pickle_forgets_writable_bars():
+    new_track = _make_track(1)
+    new_track.get_writable_bar(0)
+
+    loaded_track = pickle.loads(pickle.dumps(new_track))
+
+    assert loaded_track._writable_bars == dict()
+    assert loaded_track.bars[0].bar[0][2][0].name == 'C'
+
+def test_insert_track_repeats_without_copying():
+    music_generator = MusicGenerator(seed=21)
+    melody_track = music_generator.create_melody_track(4)
+
+    music_generator.insert_track(melody_track, times_to_repeat=3)
+    inserted_track = music_generator.composition.tracks[0]
+
+    assert len(inserted_track.bars) == 16
+    assert inserted_track.bars[12] is melody_track.bars[0]
+
+def test_padded_track():
+    new_track = _make_track(2)
+    new_track.start_bar = 500
+
+    padded_track = tracks.get_padded_track(new_track)
+
+    assert len(new_track.bars) == 2
+    assert len(padded_track.bars) == 502
+    assert padded_track.bars[0] is padded_track.bars[499]
+    assert padded_track.bars[0].bar == [[0.0, value.whole, None]]
+    assert padded_track.bars[500] is new_track.bars[0]
+
+def test_padded_track_write_does_not_leak():
+    new_track = _make_track(1)
+    new_track.start_bar = 1
+
+    padded_track = tracks.get_padded_track(new_track)
+    padded_track.get_writable_bar(1).transpose('3')
+
+    assert padded_track.bars[1].bar[0][2][0].name == 'E'
+    assert new_track.bars[0].bar[0][2][0].name == 'C'
+
+def test_padded_track_leaves_track_alone():
+    new_track = _make_track(1)
+    writable_bar = new_track.get_writable_bar(0)
+    new_track.start_bar = 1
+
+    str(tracks.get_padded_track(new_track))
+
+    # Still known to be writable, so not copied again
+    assert new_track.get_writable_bar(0) is writable_bar
+
+def test_padded_track_meter():
+    new_track = tracks.CopyOnWriteTrack()
+    new_track.add_bar(bar.Bar('C', (3, 4)))
+    new_track.start_bar = 1
+
+    padded_track = tracks.get_padded_track(new_track)
+
+    assert padded_track.bars[0].is_full()
+    assert padded_track.bars[0].meter == (3, 4)
+
+def test_insert_track_at_location_is_offset():
+    music_generator = MusicGenerator(seed=22)
+    music_generator.insert_track(music_generator.create_melody_track(2),
+                                 location_to_add=500)
+
+    assert music_generator.composition.tracks[0].start_bar == 499
+    assert len(music_generator.composition.tracks[0].bars) == 2
+
+if __name__ == "__main__":
+    pytest.main("-v")
@@ -0,0 +1,134 @@
+'''
+Alone we can do so little; together we can do so much.
+    - Helen Keller
+'''
+
+# Project Modules
+from mgen import rand
+from mgen import style
+from mgen.create import MusicGenerator
+from mgen.style import Style
+
+# Other Modules
+import collections
+import multiprocessing
+import os
+
+# Everything a worker needs to generate and export a single composition
+BatchJob = collections.namedtuple('BatchJob',
+                                  ['index', 'seed', 'style_file',
+                                   'melody_bars', 'chords_bars',
+                                   'composition_title', 'midi_path', 'bpm'])
+
+# What a worker reports back for a single composition
+BatchResult = collections.namedtuple('BatchResult',
+                                     ['index', 'seed', 'key', 'midi_path'])
+
+# Styles already parsed by this process, keyed by file
+_STYLE_CACHE = dict()
+
+
+def generate_batch(number_compositions, output_dir, seed=None,
+                   style_file=style.DEFAULT_CFG_FILE, melody_bars=8,
+                   chords_bars=8, bpm=90, composition_title='Untitled',
+                   processes=None):
+    '''
+    Generates compositions across a pool of worker processes and exports each
+    one as a MIDI file. Yields a BatchResult per composition, in order, as soon
+    as it (and every composition before it) is done.
+
+    Every composition gets its own seed spawned from the batch seed, so a
+    batch is reproducible regardless of the number of processes.
+
+    :param number_compositions: How many compositions to generate
+    :param output_dir: Directory to export the MIDI files to
+    :param seed: Integer seed or random.Random instance for the whole batch
+    :param style_file: Style configuration file to generate with
+    :param melody_bars: Number of bars in the melody track, None for no melody
+    :param chords_bars: Number of bars in the chords track, None for no chords
+    :param bpm: Beats per minute for midi output
+    :param composition_title: Title for the works, used for generated files
+    :param processes: Number of worker processes, defaults to number of cores
+    '''
+    output_dir = os.path.abspath(output_dir)
+
+    # Make folder once up front, rather than racing in every worker
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    job_seeds = rand.spawn_seeds(rand.make_rng(seed), number_compositions)
+
+    jobs = [BatchJob(index, job_seed, style_file, melody_bars, chords_bars,
+                     composition_title,
+                     os.path.join(output_dir,
+                                  '{}_{:05d}.mid'.format(composition_title, index)),
+                     bpm)
+            for index, job_seed in enumerate(job_seeds)]
+
+    if processes == 1:
+        for job in jobs:
+            yield _run_job(job)
+        return
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    # A few chunks per worker, so short jobs aren't sent over one at a time
+    # but the work still evens out between workers
+    chunksize = max(1, len(jobs) // (4 * processes))
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        # imap hands results back in job order while later jobs keep running
+        for result in pool.imap(_run_job, jobs, chunksize=chunksize):
+            yield result
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def _get_style(style_file):
+    '''
+    Returns the Style for the given file, only parsing it once per process.
+
+    :param style_file: Style configuration file
+    '''
+    style_probs = _STYLE_CACHE.get(style_file)
+    if style_probs is None:
+        style_probs = Style(style_file)
+        style_probs.warm_caches()
+        _STYLE_CACHE[style_file] = style_probs
+
+    return style_probs
+
+
+def _run_job(job):
+    '''
+    Generates and exports a single composition. Runs in a worker process.
+
+    :param job: The BatchJob to run
+    '''
+    style_probs = _get_style(job.style_file)
+
+    music_generator = MusicGenerator(style_probs,
+                                     composition_title=job.composition_title,
+                                     seed=job.seed)
+
+    # Generate straight into event arrays, since they only get encoded to MIDI
+    event_composition = music_generator.create_event_composition()
+
+    if job.melody_bars:
+        music_generator.create_melody_events(num_bars=job.melody_bars,
+                                             event_composition=event_composition)
+
+    if job.chords_bars:
+        music_generator.create_chords_events(num_bars=job.chords_bars,
+                                             octave_adjust=-1,
+                                             event_composition=event_composition)
+
+    event_composition.write_midi(job.midi_path, job.bpm)
+
+    return BatchResult(job.index, job.seed, music_generator._key, job.midi_path)
@@ -0,0 +1,149 @@
+'''
+Simplicity is the ultimate sophistication.
+    - Leonardo da Vinci
+'''
+
+# Project Modules
+from mgen import events
+
+# Other Modules
+import json
+import numpy
+import struct
+
+# Start of every file, followed by the version of the format it's written in
+MAGIC = b'MGEN'
+FORMAT_VERSION = 1
+
+# Magic, format version, flags (none yet), metadata length, number of events
+_HEADER = struct.Struct('<4sHHII')
+
+# Event arrays in the order they're stored, biggest items first so every
+# array starts aligned to its item size
+_COLUMNS = (('onsets', events.ONSET_DTYPE),
+            ('durations', events.DURATION_DTYPE),
+            ('pitches', events.PITCH_DTYPE),
+            ('track_ids', events.TRACK_ID_DTYPE),
+            ('velocities', events.VELOCITY_DTYPE))
+
+# The arrays start at a multiple of this many bytes
+_ALIGNMENT = 8
+
+
+def encode_event_composition(event_composition, metadata=None):
+    '''
+    Returns an EventComposition encoded in the compact binary format: a
+    header, then the key, time signature, title, author, track lengths and
+    any other metadata as JSON, then the packed little-endian event arrays.
+
+    :param event_composition: The EventComposition to encode
+    :param metadata: Dictionary of anything else to keep with the
+                     composition, must be JSON serializable
+    '''
+    metadata_bytes = json.dumps({'key': event_composition.key,
+                                 'time_signature': list(event_composition.time_signature),
+                                 'title': event_composition.title,
+                                 'author': event_composition.author,
+                                 'track_bars': event_composition.track_bars,
+                                 'metadata': metadata or dict()},
+                                separators=(',', ':')).encode('utf-8')
+
+    # Pad with spaces, which JSON ignores, so the arrays are aligned
+    metadata_bytes += b' ' * (-(_HEADER.size + len(metadata_bytes)) % _ALIGNMENT)
+
+    data = [_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(metadata_bytes),
+                         len(event_composition)),
+            metadata_bytes]
+
+    for column, dtype in _COLUMNS:
+        data.append(numpy.ascontiguousarray(getattr(event_composition, column),
+                                            dtype=numpy.dtype(dtype).newbyteorder('<')).tobytes())
+
+    return b''.join(data)
+
+
+def decode_event_composition(data):
+    '''
+    Returns the EventComposition and the metadata dictionary encoded in
+    bytes of the compact binary format. The event arrays are read straight
+    out of the bytes without copying them.
+
+    :param data: Bytes of the compact binary format
+    '''
+    if len(data) < _HEADER.size:
+        raise AttributeError('Data is too short to be a composition.')
+
+    magic, version, _, metadata_length, number_events = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise AttributeError('Data is not a composition in the compact binary format.')
+
+    if version > FORMAT_VERSION:
+        raise AttributeError('Composition is in version ' + str(version) + ' of the ' +
+                             'format, but only versions up to ' + str(FORMAT_VERSION) +
+                             ' can be read.')
+
+    position = _HEADER.size
+    composition_data = json.loads(data[position:position + metadata_length].decode('utf-8'))
+    position += metadata_length
+
+    arrays = dict()
+    for column, dtype in _COLUMNS:
+        dtype = numpy.dtype(dtype).newbyteorder('<')
+        if position + number_events * dtype.itemsize > len(data):
+            raise AttributeError('Composition data ends before all of its events.')
+
+        arrays[column] = numpy.frombuffer(data, dtype=dtype, count=number_events,
+                                          offset=position)
+        position += number_events * dtype.itemsize
+
+    event_composition = events.EventComposition.from_arrays(arrays['onsets'],
+                                                            arrays['durations'],
+                                                            arrays['pitches'],
+                                                            arrays['velocities'],
+                                                            arrays['track_ids'],
+                                                            composition_data['track_bars'],
+                                                            composition_data['key'],
+                                                            composition_data['time_signature'],
+                                                            composition_data['title'],
+                                                            composition_data['author'])
+
+    return event_composition, composition_data['metadata']
+
+
+def write_event_composition(binary_file, event_composition, metadata=None):
+    '''
+    Writes an EventComposition in the compact binary format into an open
+    binary file object, or to the given path. Returns the number of bytes
+    written.
+
+    :param binary_file: Binary file object or path to write to
+    :param event_composition: The EventComposition to write
+    :param metadata: Dictionary of anything else to keep with the
+                     composition, must be JSON serializable
+    '''
+    data = encode_event_composition(event_composition, metadata)
+
+    if hasattr(binary_file, 'write'):
+        binary_file.write(data)
+    else:
+        with open(binary_file, 'wb') as open_file:
+            open_file.write(data)
+
+    return len(data)
+
+
+def read_event_composition(binary_file):
+    '''
+    Returns the EventComposition and the metadata dictionary read from an
+    open binary file object, or from the given path, in the compact binary
+    format.
+
+    :param binary_file: Binary file object or path to read from
+    '''
+    if hasattr(binary_file, 'read'):
+        data = binary_file.read()
+    else:
+        with open(binary_file, 'rb') as open_file:
+            data = open_file.read()
+
+    return decode_event_composition(data)
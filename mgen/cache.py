@@ -0,0 +1,231 @@
+'''
+Music is the shorthand of emotion.
+    - Leo Tolstoy
+'''
+
+# Project Modules
+from mgen import cfg_import
+
+# Other Modules
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+# Size the cache is trimmed back down to when it grows past it
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Start of the names of files still being copied into the cache
+_TEMP_PREFIX = '.partial-'
+
+# (cache_dir, max_bytes) -> ExportCache
+_EXPORT_CACHES = dict()
+
+
+class ExportCache(object):
+    '''
+    An on-disk cache of exported files (ex: pdfs and midis), keyed by a hash
+    of the source they were rendered from (see get_key), so an unchanged
+    composition is never rendered twice. Least recently used files are
+    removed once the cache grows past max_bytes.
+    '''
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        '''
+        Constructor
+
+        :param cache_dir: Directory to keep cached files in
+        :param max_bytes: Most bytes of files to keep in the cache
+        '''
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+
+        # Running estimate of the bytes in the cache, counted on the first put
+        self._total_bytes = None
+
+        # Exports run on several threads at once, all putting into the cache
+        self._lock = threading.Lock()
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def get(self, key, file_extension):
+        '''
+        Returns the path of the cached file for the key, None if it isn't
+        cached. Marks the file as just used.
+
+        :param key: Key of the file (see get_key)
+        :param file_extension: Extension of the file. Ex: pdf
+        '''
+        cached_path = self._get_cached_path(key, file_extension)
+
+        try:
+            os.utime(cached_path, None)
+        except OSError:
+            return None
+
+        return cached_path
+
+    def fetch(self, key, file_extension, file_path):
+        '''
+        Copies the cached file for the key to the given path. Returns whether
+        it was cached.
+
+        :param key: Key of the file (see get_key)
+        :param file_extension: Extension of the file. Ex: pdf
+        :param file_path: Path to copy the file to
+        '''
+        cached_path = self.get(key, file_extension)
+        if cached_path is None:
+            return False
+
+        try:
+            shutil.copyfile(cached_path, file_path)
+        except (IOError, OSError):
+            # Evicted by someone else between get and copy
+            return False
+
+        return True
+
+    def put(self, key, file_extension, file_path):
+        '''
+        Copies a file into the cache under the key, then removes least
+        recently used files until the cache fits in max_bytes again.
+
+        :param key: Key of the file (see get_key)
+        :param file_extension: Extension of the file. Ex: pdf
+        :param file_path: Path of the file to cache
+        '''
+        cached_path = self._get_cached_path(key, file_extension)
+
+        cached_dir = os.path.dirname(cached_path)
+        if not os.path.isdir(cached_dir):
+            try:
+                os.makedirs(cached_dir)
+            except OSError:
+                # Another put may have just made it
+                if not os.path.isdir(cached_dir):
+                    raise
+
+        # Copy then rename, so nobody ever sees half a file
+        temp_handle, temp_path = tempfile.mkstemp(dir=cached_dir, prefix=_TEMP_PREFIX)
+        os.close(temp_handle)
+        try:
+            shutil.copyfile(file_path, temp_path)
+            file_size = os.path.getsize(temp_path)
+
+            # Replacing the file and counting it happen together, so
+            # concurrent puts can't throw the count off
+            with self._lock:
+                if self._total_bytes is None:
+                    self._total_bytes = self._count_bytes()[0]
+
+                # A file already cached under the key is replaced
+                try:
+                    self._total_bytes -= os.path.getsize(cached_path)
+                except OSError:
+                    pass
+
+                if os.path.exists(cached_path):
+                    # Windows won't rename over an existing file
+                    os.remove(cached_path)
+                os.rename(temp_path, cached_path)
+
+                self._total_bytes += file_size
+
+                # Only look through the whole cache once it might be too big
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _get_cached_path(self, key, file_extension):
+        # Spread files over subdirectories so none of them get too big
+        return os.path.join(self.cache_dir, key[:2], key + '.' + file_extension)
+
+    def _count_bytes(self):
+        '''
+        Returns the total bytes of the files in the cache, along with a list
+        of (last used time, size, path) for each of them. Files still being
+        copied in are left out.
+        '''
+        cached_files = []
+        total_bytes = 0
+        for dir_path, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                if file_name.startswith(_TEMP_PREFIX):
+                    # Not in the cache yet, and someone is still writing it
+                    continue
+
+                cached_path = os.path.join(dir_path, file_name)
+                try:
+                    file_stat = os.stat(cached_path)
+                except OSError:
+                    continue
+                cached_files.append((file_stat.st_mtime, file_stat.st_size, cached_path))
+                total_bytes += file_stat.st_size
+
+        return total_bytes, cached_files
+
+    def _evict(self):
+        '''
+        Removes least recently used files until the cache fits in max_bytes.
+        Only called with the lock held.
+        '''
+        # Other processes may share the cache, so count it for real
+        total_bytes, cached_files = self._count_bytes()
+
+        cached_files.sort()
+        for _, file_size, cached_path in cached_files:
+            if total_bytes <= self.max_bytes:
+                break
+
+            try:
+                os.remove(cached_path)
+            except OSError:
+                pass
+            total_bytes -= file_size
+
+        self._total_bytes = total_bytes
+
+
+def get_key(*sources):
+    '''
+    Returns the cache key for a file rendered from the given sources (ex: the
+    file type and its LilyPond string), a hash of all of them.
+
+    :param sources: Strings or bytes the file is rendered from
+    '''
+    key_hash = hashlib.sha256()
+
+    for source in sources:
+        if not isinstance(source, bytes):
+            source = str(source).encode('utf-8')
+
+        # Length first, so sources can't run into each other
+        key_hash.update(str(len(source)).encode('utf-8') + b':')
+        key_hash.update(source)
+
+    return key_hash.hexdigest()
+
+
+def get_export_cache():
+    '''
+    Returns the ExportCache set up in the configuration (EXPORT_CACHE_DIR and
+    EXPORT_CACHE_MAX_BYTES), None if exports aren't cached.
+    '''
+    cache_dir = getattr(cfg_import.config, 'EXPORT_CACHE_DIR', None)
+    if not cache_dir:
+        return None
+
+    max_bytes = getattr(cfg_import.config, 'EXPORT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+    export_cache = _EXPORT_CACHES.get((cache_dir, max_bytes))
+    if export_cache is None:
+        export_cache = ExportCache(cache_dir, max_bytes)
+        _EXPORT_CACHES[(cache_dir, max_bytes)] = export_cache
+
+    return export_cache
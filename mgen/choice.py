@@ -5,18 +5,30 @@ It is our choices... that show what we truly are, far more than our abilities.
 
 # Project Modules
 from mgen import time
+from mgen import convert
+from mgen import sampler
+from mgen import rand
 
 # Mingus modules
 import mingus.core.meter as meter
 import mingus.core.keys as keys
+import mingus.core.progressions as progressions
 
 import mingus.core.value as value
 import mingus.core.scales as scales
 
 # Other Modules
+import bisect
+import collections
+import numpy
 import random
 import warnings
 
+try:
+    from math import gcd
+except ImportError:
+    from fractions import gcd
+
 MINGUS_TIMING_LOOKUP = {
     "whole": value.whole,
     "half": value.half,
@@ -45,58 +57,119 @@ MINGUS_SCALES_LOOKUP = {
     "MinorNeapolitan": (lambda key: scales.MinorNeapolitan(key)),
 }
 
+# A mingus scale along with its notes, computed once
+ScaleEntry = collections.namedtuple('ScaleEntry',
+                                    ['scale', 'ascending', 'descending',
+                                     'scale_degrees', 'midi_degrees',
+                                     'note_names'])
+
+# MIDI note number used for rests in arrays of pitches
+REST_PITCH = convert.REST_PITCH
+
+# (scale name, key) -> mingus scale
+_SCALE_CACHE = dict()
+
+# (scale type, tonic, octaves) -> ScaleEntry
+_SCALE_ENTRY_CACHE = dict()
+
+# (chord progression, key) -> tuple of chords, each a tuple of note names
+_PROGRESSION_CHORDS_CACHE = dict()
 
-def choose_scale(key, scale_prob_list, choice=None):
+
+def choose_scale(key, scale_prob_list, choice=None, rng=None):
     '''
     Return a randomly chosen scale by using the provided probability dictionary.
 
     :param key: The musical key to use for the scale
     :param scale_prob_list: List of tuples with scales and associated probabilities
+                            or a compiled AliasSampler
+    :param rng: Random number generator, defaults to the random module
     '''
-    if choice is None:
-        choice = random.uniform(0, 1)
-
-    if choice > 1.0 or choice < 0.0:
+    if choice is not None and (choice > 1.0 or choice < 0.0):
         raise AttributeError('Choice ' + str(choice) +
                              ' should be between 0.0 and 1.0')
 
-    for scale, prob in scale_prob_list:
-        # Subtract the probability from the choice
-        choice = choice - float(prob)
-        scale_instance = MINGUS_SCALES_LOOKUP.get(scale,
-                                                  (lambda key: scales.HarmonicMajor(key)))(key)
+    scale = sampler.compile_prob_list(scale_prob_list).pick(choice, rng)
+
+    return get_scale(scale, key)
 
-        # When it reaches zero, we've hit our choice
-        if choice <= 0:
-            break
+
+def get_scale(scale_name, key):
+    '''
+    Returns the (cached) mingus scale for the given scale name and key. Scales
+    are shared by every generator in the process.
+
+    :param scale_name: Name of the scale (ex: 'Major')
+    :param key: The musical key to use for the scale
+    '''
+    cache_key = (scale_name, key)
+
+    scale_instance = _SCALE_CACHE.get(cache_key)
+    if scale_instance is None:
+        scale_instance = MINGUS_SCALES_LOOKUP.get(scale_name,
+                                                  (lambda key: scales.HarmonicMajor(key)))(key)
+        _SCALE_CACHE[cache_key] = scale_instance
 
     return scale_instance
 
 
-def choose_key(key_prob_list, choice=None):
+def get_scale_entry(scale):
+    '''
+    Returns the (cached) ScaleEntry holding the notes of the given mingus
+    scale. Entries are shared by every generator in the process.
+
+    :param scale: A mingus scale
+    '''
+    cache_key = (type(scale).__name__, scale.tonic, getattr(scale, 'octaves', 1))
+
+    scale_entry = _SCALE_ENTRY_CACHE.get(cache_key)
+    if scale_entry is None:
+        ascending = tuple(scale.ascending())
+        descending = tuple(scale.descending())
+
+        # Scale degree lookup for every possible note draw. The first two draws
+        # result in a rest and the top of the scale gets an extra draw, same as
+        # walking the scale with randint(-3, len(scale) - 1).
+        scale_degrees = numpy.array((None, None, ascending[-1]) + ascending,
+                                    dtype=object)
+
+        # The same lookup, in MIDI note numbers
+        midi_degrees = numpy.array([REST_PITCH if degree is None
+                                    else convert.note_to_midi(degree)
+                                    for degree in scale_degrees],
+                                   dtype=numpy.int16)
+
+        # How the scale spells each pitch class, for turning MIDI numbers
+        # back into notes
+        note_names = dict()
+        for degree, midi_number in zip(scale_degrees.tolist(), midi_degrees.tolist()):
+            if degree is not None:
+                note_names.setdefault(midi_number % 12, degree)
+
+        scale_entry = ScaleEntry(scale, ascending, descending, scale_degrees,
+                                 midi_degrees, note_names)
+        _SCALE_ENTRY_CACHE[cache_key] = scale_entry
+
+    return scale_entry
+
+
+def choose_key(key_prob_list, choice=None, rng=None):
     '''
     Return a randomly chosen key by using the provided probability dictionary.
 
     :param key_prob_list: List of tuples with keys and associated probabilities
+                          or a compiled AliasSampler
     :param choice: Leave as default for random choice.
                    float between 0.0 and 1.0 to determine which item in list to
                    choose. Closer to 1 will choose a higher probability item
+    :param rng: Random number generator, defaults to the random module
     '''
-    if choice is None:
-        choice = random.uniform(0, 1)
-
-    if choice > 1.0 or choice < 0.0:
+    if choice is not None and (choice > 1.0 or choice < 0.0):
         raise AttributeError('Choice ' + str(choice) +
                              ' should be between 0.0 and 1.0')
 
-    for key, prob in key_prob_list:
-        # Subtract the probability from the choice
-        choice = choice - float(prob)
-        key = key.replace(' ', '')
-
-        # When it reaches zero, we've hit our choice
-        if choice <= 0:
-            break
+    key = sampler.compile_prob_list(key_prob_list).pick(choice, rng)
+    key = key.replace(' ', '')
 
     if keys.is_valid_key(key):
         return str(key)
@@ -128,39 +201,94 @@ def choose_time_signature(time_signature_prob_list, choice=None):
     return meter.common_time
 
 
-def choose_chord_progression(chord_progression_prob_list, choice=None):
+def choose_chord_progression(chord_progression_prob_list, choice=None, rng=None):
     '''
     Return a list of chords randomly by using the provided probability
     dictionary.
 
     :param chord_progression_prob_list: List of tuples with chord progressions
-                                        and associated probabilities
+                                        and associated probabilities or a
+                                        compiled AliasSampler
     :param choice: Leave as default for random choice.
                    float between 0.0 and 1.0 to determine which item in list to
                    choose. Closer to 1 will choose a higher probability item
+    :param rng: Random number generator, defaults to the random module
     '''
-    if choice is None:
-        choice = random.uniform(0, 1)
-
-    if choice > 1.0 or choice < 0.0:
+    if choice is not None and (choice > 1.0 or choice < 0.0):
         raise AttributeError('Choice ' + str(choice) +
                              ' should be between 0.0 and 1.0')
 
-    for chords, prob in chord_progression_prob_list:
-        # Subtract the probability from the choice
-        choice = choice - float(prob)
-
-        # Create a list of the chords
-        chords_list = chords.split(' ')
+    chords = sampler.compile_prob_list(chord_progression_prob_list).pick(choice, rng)
 
-        # When it reaches zero, we've hit our choice
-        if choice <= 0:
-            break
+    # Create a list of the chords
+    chords_list = chords.split(' ')
 
     return chords_list
 
 
-def choose_notes(number_notes, scale, choice=None):
+def get_progression_chords(chord_progression, key):
+    '''
+    Returns the (cached) notes of every chord in a chord progression for the
+    given key, as a tuple of tuples of note names. Chords are shared by every
+    generator in the process.
+
+    :param chord_progression: List of chords (ex: ['IM7', 'iim7', 'V7'])
+    :param key: The musical key to resolve the chords in
+    '''
+    cache_key = (tuple(chord_progression), key)
+
+    progression_chords = _PROGRESSION_CHORDS_CACHE.get(cache_key)
+    if progression_chords is None:
+        progression_chords = tuple(tuple(chord) for chord in
+                                   progressions.to_chords(list(chord_progression), key))
+        _PROGRESSION_CHORDS_CACHE[cache_key] = progression_chords
+
+    return progression_chords
+
+
+def warm_progression_chords(chord_progression_prob_list, musical_keys):
+    '''
+    Resolves every chord progression in every given key ahead of time, so
+    later lookups with get_progression_chords never build chords.
+
+    :param chord_progression_prob_list: List of tuples with chord progressions
+                                        and associated probabilities, a
+                                        compiled AliasSampler or a compiled
+                                        ProgressionTable
+    :param musical_keys: The musical keys to resolve the chords in
+    '''
+    progression_table = compile_progression_table(chord_progression_prob_list)
+
+    for key in musical_keys:
+        for chord_progression in progression_table.progressions:
+            get_progression_chords(chord_progression, key)
+
+
+def choose_fitting_chord_progression(num_bars, chord_progression_prob_list, rng=None):
+    '''
+    Return a list of chords randomly chosen from the progressions whose length
+    evenly divides the given number of bars, keeping their relative
+    probabilities.
+
+    :param num_bars: The number of bars the progression should fit in
+    :param chord_progression_prob_list: List of tuples with chord progressions
+                                        and associated probabilities, a
+                                        compiled AliasSampler or a compiled
+                                        ProgressionTable
+    :param rng: Random number generator, defaults to the random module
+    '''
+    progression_table = compile_progression_table(chord_progression_prob_list)
+    fitting_sampler = progression_table.get_fitting_sampler(num_bars)
+
+    if fitting_sampler is None:
+        raise AttributeError('Cannot find a chord progression to' +
+                             ' meet the requirement' + ' for ' +
+                             str(num_bars) + ' bars.')
+
+    return list(progression_table.progressions[fitting_sampler.draw(rng)])
+
+
+def choose_notes(number_notes, scale, choice=None, rng=None):
     '''
     Returns a list of notes chosen randomly from a given scale.
 
@@ -169,6 +297,7 @@ def choose_notes(number_notes, scale, choice=None):
     :param choice: Leave as default for random choice.
                    float between 0.0 and 1.0 to determine which item in list to
                    choose. Closer to 1 will choose a higher probability item
+    :param rng: Random number generator, defaults to the random module
 
     TODO: Don't just use the ascending scale...
     '''
@@ -179,81 +308,134 @@ def choose_notes(number_notes, scale, choice=None):
         raise AttributeError('Choice ' + str(choice) +
                              ' should be between 0.0 and 1.0')
 
-    notes_in_scale = len(scale.ascending())
-    notes = []
+    return choose_track_notes([number_notes], scale, rng=rng)[0]
 
-    while (len(notes) < number_notes):
-        # values less than 0 will result in a rest
-        choice = random.randint(-3, notes_in_scale - 1)
-        if choice >= -1:
-            notes.append(scale.ascending()[choice])
-        else:
-            # Place a rest
-            notes.append(None)
 
-    return notes
+def choose_track_notes(notes_per_bar, scale, rng=None):
+    '''
+    Returns a list of notes for every bar in a track, chosen randomly from a
+    given scale with a single vectorized draw.
+
+    :param notes_per_bar: List with the number of notes to choose for each bar
+    :param scale: Scale to choose notes from
+    :param rng: Random number generator, defaults to the random module
+
+    TODO: Don't just use the ascending scale...
+    '''
+    if not notes_per_bar:
+        return []
+
+    scale_degrees = get_scale_entry(scale).scale_degrees
+    notes = scale_degrees[_draw_scale_degrees(sum(notes_per_bar), scale_degrees, rng)]
 
+    # Cut the notes back up into bars
+    bar_boundaries = numpy.cumsum(notes_per_bar)[:-1]
+    return [bar_notes.tolist() for bar_notes in numpy.split(notes, bar_boundaries)]
 
-def choose_next_timing(remaining_time_in_bar, note_timing_prob_list, choice=None):
+
+def choose_track_pitches(number_notes, scale, rng=None):
+    '''
+    Returns an array of MIDI note numbers chosen randomly from a given scale
+    with a single vectorized draw, using REST_PITCH for rests. Same choices
+    as choose_track_notes, without making a string per note.
+
+    :param number_notes: The number of notes to choose
+    :param scale: Scale to choose notes from
+    :param rng: Random number generator, defaults to the random module
+    '''
+    midi_degrees = get_scale_entry(scale).midi_degrees
+    return midi_degrees[_draw_scale_degrees(number_notes, midi_degrees, rng)]
+
+
+def _draw_scale_degrees(number_notes, scale_degrees, rng=None):
+    numpy_rng = rand.get_numpy_rng(rng)
+    return numpy_rng.randint(0, len(scale_degrees), size=number_notes)
+
+
+def choose_bar_timing(time_signature, note_timing_prob_list, rng=None):
+    '''
+    Returns a list of note timings that exactly fills a bar of the given time
+    signature, drawn in one go from the weighted distribution over every such
+    list.
+
+    :param time_signature: Time signature for the bar
+    :param note_timing_prob_list: List of tuples with note timings and associated
+                                  probabilities, a compiled AliasSampler or a
+                                  compiled TimingTable
+    :param rng: Random number generator, defaults to the random module
+    '''
+    return _get_bar_rhythm_index(time_signature, note_timing_prob_list).draw(rng)
+
+
+def choose_bar_ticks(time_signature, note_timing_prob_list, rng=None):
+    '''
+    Returns the length in ticks of every note in a randomly drawn bar. Same
+    choices as choose_bar_timing, flattened into tick lengths.
+
+    :param time_signature: Time signature for the bar
+    :param note_timing_prob_list: List of tuples with note timings and associated
+                                  probabilities, a compiled AliasSampler or a
+                                  compiled TimingTable
+    :param rng: Random number generator, defaults to the random module
+    '''
+    bar_rhythm_index = _get_bar_rhythm_index(time_signature, note_timing_prob_list)
+    note_ticks = bar_rhythm_index.timing_table.note_ticks
+
+    bar_ticks = []
+    for index in bar_rhythm_index.draw_indices(rng):
+        bar_ticks.extend(note_ticks[index])
+
+    return bar_ticks
+
+
+def _get_bar_rhythm_index(time_signature, note_timing_prob_list):
+    timing_table = compile_timing_table(note_timing_prob_list)
+    bar_rhythm_index = timing_table.get_bar_rhythm_index(time_signature)
+
+    if not bar_rhythm_index.can_fill_bar():
+        raise AttributeError('Unable to exactly fill a bar in time signature ' +
+                             str(time_signature) + ' with the configured ' +
+                             'note timings.')
+
+    return bar_rhythm_index
+
+
+def choose_next_timing(remaining_time_in_bar, note_timing_prob_list, choice=None,
+                       rng=None):
     '''
     Returns a note timing representing a series of notes that will fit in the
     remaining portion of the bar.
 
     :param remaining_time_in_bar: The remaining time in the musical bar
     :param note_timing_prob_list: List of tuples with note timings and associated
-                                  probabilities
+                                  probabilities, a compiled AliasSampler or a
+                                  compiled TimingTable
     :param choice: Leave as default for random choice.
                    float between 0.0 and 1.0 to determine which item in list to
                    choose. Closer to 1 will choose a higher probability item
+    :param rng: Random number generator, defaults to the random module
     '''
-    if choice is None:
-        choice = random.uniform(0, 1)
-
-    if choice > 1.0 or choice < 0.0:
+    if choice is not None and (choice > 1.0 or choice < 0.0):
         raise AttributeError('Choice ' + str(choice) +
                              ' should be between 0.0 and 1.0')
 
-    if remaining_time_in_bar > 0.0:
+    # Compare in whole ticks so float error can't make a timing (not) fit
+    remaining_ticks_in_bar = time.time_to_ticks(remaining_time_in_bar)
+
+    if remaining_ticks_in_bar > 0:
+        timing_table = compile_timing_table(note_timing_prob_list)
+
         # The chosen time progression
         the_chosen_one = None
 
-        # Whether or not we've found The Chosen One
-        the_chosen_one_found = False
-
-        # Random choice
-        choice = random.uniform(0, 1)
+        # Only draw from the timings that fit in what's left of the bar
+        fitting_sampler = timing_table.get_fitting_sampler(remaining_ticks_in_bar)
 
-        # As long as we haven't found The Chosen One, keep trying.
-        # Centuries may pass... but The Chosen One will be found, lest we all
-        # parish in an infinite search.
-        while (not the_chosen_one_found and choice >= 0.0):
-            choice = random.uniform(0, 1)
-
-            for timing, val in note_timing_prob_list:
-                # Subtract the probability from the choice
-                choice = choice - float(val)
-
-                # When it reaches zero, we've hit a Prospective Chosen One
-                if choice <= 0.0:
-                    note_timing = []
-                    parsed_note_timings = timing.split(' ')
-                    for item in parsed_note_timings:
-                        item = item.replace('\'', '')
-                        note_timing.append(_get_mingus_timing(item))
-
-                    # Length of time The Prospective Chosen One takes up in the bar
-                    time_for_choice = time.get_notes_length(note_timing)
-
-                    if (remaining_time_in_bar >= time_for_choice):
-                        # We have found The Chosen One
-                        the_chosen_one = note_timing
-                        the_chosen_one_found = True
-                        break
-
-                    # We must restart our search
+        if fitting_sampler is not None:
+            the_chosen_one = list(timing_table.timings[fitting_sampler.pick(choice, rng)])
     else:
         raise AttributeError('Remaining time in bar specified as ' +
-                             remaining_time_in_bar +
+                             str(remaining_time_in_bar) +
                              '. You can\'t have negative time left.')
 
     if the_chosen_one is None:
@@ -264,6 +446,280 @@ def choose_next_timing(remaining_time_in_bar, note_timing_prob_list, choice=None
     return the_chosen_one
 
 
+class TimingTable(object):
+    '''
+    The note timings of a Style, parsed into mingus values once along with the
+    total length of each timing and a sampler over them.
+    '''
+
+    def __init__(self, note_timing_prob_list):
+        '''
+        Constructor
+
+        :param note_timing_prob_list: List of tuples with note timings and
+                                      associated probabilities or a compiled
+                                      AliasSampler
+        '''
+        if isinstance(note_timing_prob_list, sampler.AliasSampler):
+            note_timing_prob_list = list(zip(note_timing_prob_list.items,
+                                             note_timing_prob_list.weights))
+
+        self.raw_timings = []
+        self.timings = []
+        self.note_ticks = []
+        self.ticks = []
+
+        for timing, _ in note_timing_prob_list:
+            note_timing = tuple(_get_mingus_timing(item.replace('\'', ''))
+                                for item in timing.split(' '))
+
+            self.raw_timings.append(timing)
+            self.timings.append(note_timing)
+            self.note_ticks.append(tuple(time.get_note_ticks(note_value)
+                                         for note_value in note_timing))
+            self.ticks.append(sum(self.note_ticks[-1]))
+
+        # Sample indices so the parsed timing and its length come for free
+        self.sampler = sampler.AliasSampler(
+            [(index, prob) for index, (_, prob) in enumerate(note_timing_prob_list)]
+        )
+
+        # Timings that fit in a given amount of time are always a prefix of the
+        # timings ordered by length, so one sampler per prefix covers every
+        # remaining time in every time signature
+        self._length_order = sorted(range(0, len(self.timings)),
+                                    key=lambda index: self.ticks[index])
+        self._sorted_ticks = [self.ticks[index] for index in self._length_order]
+        self._fitting_samplers = dict()
+        self._bar_rhythm_indexes = dict()
+
+    def __len__(self):
+        return len(self.timings)
+
+    def get_fitting_sampler(self, remaining_ticks_in_bar):
+        '''
+        Returns a sampler over the indices of the timings that fit in the
+        remaining ticks, with their probabilities renormalized. Returns None if
+        no timing fits.
+
+        :param remaining_ticks_in_bar: The remaining ticks in the musical bar
+        '''
+        number_fitting = bisect.bisect_right(self._sorted_ticks,
+                                             remaining_ticks_in_bar)
+        if number_fitting == 0:
+            return None
+
+        fitting_sampler = self._fitting_samplers.get(number_fitting)
+        if fitting_sampler is None:
+            fitting_sampler = sampler.AliasSampler(
+                [(index, self.sampler.weights[index])
+                 for index in sorted(self._length_order[:number_fitting])]
+            )
+            self._fitting_samplers[number_fitting] = fitting_sampler
+
+        return fitting_sampler
+
+    def get_bar_rhythm_index(self, time_signature):
+        '''
+        Returns the (cached) BarRhythmIndex for the given time signature.
+
+        :param time_signature: Time signature for the bar
+        '''
+        time_signature = tuple(time_signature)
+
+        bar_rhythm_index = self._bar_rhythm_indexes.get(time_signature)
+        if bar_rhythm_index is None:
+            bar_rhythm_index = BarRhythmIndex(self, time_signature)
+            self._bar_rhythm_indexes[time_signature] = bar_rhythm_index
+
+        return bar_rhythm_index
+
+
+class BarRhythmIndex(object):
+    '''
+    Draws bars from the timings of a TimingTable the same way as choosing one
+    timing at a time from those that fit in what's left of the bar (see
+    choose_next_timing), with each timing's probability renormalized among
+    the ones that fit. Timings after which the bar can't be filled exactly
+    are left out, found with dynamic programming over the bar length.
+    '''
+
+    def __init__(self, timing_table, time_signature):
+        '''
+        Constructor
+
+        :param timing_table: TimingTable to fill bars with
+        :param time_signature: Time signature for the bar
+        '''
+        self.timing_table = timing_table
+        self.time_signature = time_signature
+
+        timing_ticks = timing_table.ticks
+        bar_ticks = time.get_bar_ticks(time_signature)
+
+        # Work in the coarsest unit every timing is a multiple of
+        unit = bar_ticks
+        for ticks in timing_ticks:
+            unit = gcd(unit, ticks)
+        unit = max(unit, 1)
+
+        self.lengths = [ticks // unit for ticks in timing_ticks]
+        self.bar_length = bar_ticks // unit
+
+        candidates = [(index, length, weight) for index, (length, weight)
+                      in enumerate(zip(self.lengths, timing_table.sampler.weights))
+                      if length > 0 and weight > 0.0]
+
+        # can_fill[remaining] is whether some sequence of timings exactly
+        # fills the remaining length
+        self.can_fill = [False] * (self.bar_length + 1)
+        self.can_fill[0] = True
+
+        # Sampler over the next timing for each remaining length. Weighting
+        # by the style's probabilities alone (rather than by how many ways the
+        # rest of the bar can be filled) keeps the style's rhythms.
+        self._samplers = dict()
+
+        for remaining in range(1, self.bar_length + 1):
+            next_timing_probs = [(index, weight) for index, length, weight in candidates
+                                 if length <= remaining and
+                                 self.can_fill[remaining - length]]
+
+            if next_timing_probs:
+                self.can_fill[remaining] = True
+                self._samplers[remaining] = sampler.AliasSampler(next_timing_probs)
+
+    def can_fill_bar(self):
+        '''
+        Returns whether any sequence of timings exactly fills the bar.
+        '''
+        return self.can_fill[self.bar_length]
+
+    def draw(self, rng=None):
+        '''
+        Returns a randomly drawn list of note timings that exactly fills the
+        bar.
+
+        :param rng: Random number generator, defaults to the random module
+        '''
+        return [list(self.timing_table.timings[index])
+                for index in self.draw_indices(rng)]
+
+    def draw_indices(self, rng=None):
+        '''
+        Returns the TimingTable indices of a randomly drawn list of note
+        timings that exactly fills the bar.
+
+        :param rng: Random number generator, defaults to the random module
+        '''
+        indices = []
+        remaining = self.bar_length
+
+        while remaining > 0:
+            index = self._samplers[remaining].draw(rng)
+            indices.append(index)
+            remaining -= self.lengths[index]
+
+        return indices
+
+
+class ProgressionTable(object):
+    '''
+    The chord progressions of a Style, split into chords once and indexed by
+    length, with a sampler over the progressions fitting each number of bars.
+    '''
+
+    def __init__(self, chord_progression_prob_list):
+        '''
+        Constructor
+
+        :param chord_progression_prob_list: List of tuples with chord
+                                            progressions and associated
+                                            probabilities or a compiled
+                                            AliasSampler
+        '''
+        if isinstance(chord_progression_prob_list, sampler.AliasSampler):
+            chord_progression_prob_list = list(zip(chord_progression_prob_list.items,
+                                                   chord_progression_prob_list.weights))
+
+        self.raw_progressions = []
+        self.progressions = []
+        self.weights = []
+
+        # Progression length -> indices of the progressions that long
+        self.indices_by_length = dict()
+
+        for progression, prob in chord_progression_prob_list:
+            chords = tuple(progression.split(' '))
+
+            self.indices_by_length.setdefault(len(chords), []).append(len(self.progressions))
+            self.raw_progressions.append(progression)
+            self.progressions.append(chords)
+            self.weights.append(float(prob))
+
+        self._fitting_samplers = dict()
+
+    def __len__(self):
+        return len(self.progressions)
+
+    def get_fitting_sampler(self, num_bars):
+        '''
+        Returns the (cached) sampler over the indices of the progressions whose
+        length evenly divides the number of bars, with their probabilities
+        renormalized. Returns None if no progression fits.
+
+        :param num_bars: The number of bars the progression should fit in
+        '''
+        if num_bars in self._fitting_samplers:
+            return self._fitting_samplers[num_bars]
+
+        fitting_indices = []
+        for length, indices in self.indices_by_length.items():
+            if num_bars % length == 0:
+                fitting_indices.extend(indices)
+
+        fitting_sampler = None
+        if fitting_indices:
+            fitting_sampler = sampler.AliasSampler(
+                [(index, self.weights[index]) for index in sorted(fitting_indices)]
+            )
+
+        self._fitting_samplers[num_bars] = fitting_sampler
+
+        return fitting_sampler
+
+
+def compile_progression_table(chord_progression_prob_list):
+    '''
+    Returns a ProgressionTable for the given chord progressions. Already
+    compiled tables are returned as is.
+
+    :param chord_progression_prob_list: List of tuples with chord progressions
+                                        and associated probabilities, a
+                                        compiled AliasSampler or a compiled
+                                        ProgressionTable
+    '''
+    if isinstance(chord_progression_prob_list, ProgressionTable):
+        return chord_progression_prob_list
+
+    return ProgressionTable(chord_progression_prob_list)
+
+
+def compile_timing_table(note_timing_prob_list):
+    '''
+    Returns a TimingTable for the given note timings. Already compiled tables
+    are returned as is.
+
+    :param note_timing_prob_list: List of tuples with note timings and
+                                  associated probabilities, a compiled
+                                  AliasSampler or a compiled TimingTable
+    '''
+    if isinstance(note_timing_prob_list, TimingTable):
+        return note_timing_prob_list
+
+    return TimingTable(note_timing_prob_list)
+
+
 def _get_mingus_timing(raw_timing):
     dotted_indicator = "_dotted"
     dotted = False
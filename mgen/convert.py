@@ -3,15 +3,39 @@ To convert somebody go and take them by the hand and guide them.
     - Thomas Aquinas
 '''
 
+# Project Modules
+from mgen import pitch
+from mgen import time
+from mgen import tracks
+
 # Mingus Modules
 import mingus.containers.note as note
+import mingus.containers.note_container as note_container
 import mingus.core.notes as mingus_notes
 import mingus.core.meter as meter
 import mingus.core.scales as scales
 import mingus.core.value as value
 import mingus.core.keys as keys
 import mingus.containers.bar as bar
-import mingus.containers.track as track
+
+# Other Modules
+import numpy
+
+# mingus numbers C4 as 48, MIDI numbers it as 60
+MIDI_NOTE_OFFSET = 12
+
+# MIDI note number used for rests in arrays of pitches
+REST_PITCH = -1
+
+# Range of valid MIDI note numbers
+LOWEST_MIDI_NOTE = 0
+HIGHEST_MIDI_NOTE = 127
+
+# (MIDI note number, spelling, velocity) -> FrozenNote
+_MIDI_NOTE_CACHE = dict()
+
+# Note name -> (MIDI note number, name without octave, velocity)
+_NOTE_NAME_CACHE = dict()
 
 def convert_notes_to_bar(musical_key, melody_timing, chosen_notes,
                          time_signature=meter.common_time):
@@ -30,12 +54,16 @@ def convert_notes_to_bar(musical_key, melody_timing, chosen_notes,
         mingus_bar.key = keys.Key(musical_key)
         mingus_bar.set_meter(time_signature)
 
-        # Go through timing, assign chosen note to each timing and add to bar
-        for notes_timing in melody_timing:
+        # Keep a running count of the ticks used in the bar, rather than
+        # letting mingus add up floats (which can reject notes that fit)
+        bar_ticks = time.get_bar_ticks(time_signature)
+        elapsed_ticks_in_bar = 0
 
-            # Index in list of notes to choose
-            chosen_note_index = 0
+        # Index in list of notes to choose
+        chosen_note_index = 0
 
+        # Go through timing, assign chosen note to each timing and add to bar
+        for notes_timing in melody_timing:
             if notes_timing:
                 for note_timing in notes_timing:
                     note = chosen_notes[chosen_note_index]
@@ -43,13 +71,259 @@ def convert_notes_to_bar(musical_key, melody_timing, chosen_notes,
                     # Move to next note
                     chosen_note_index += 1
 
-                    mingus_bar.place_notes(note, note_timing)
+                    note_ticks = time.get_note_ticks(note_timing)
+
+                    # Notes that don't fit are left out, same as place_notes
+                    if elapsed_ticks_in_bar + note_ticks <= bar_ticks:
+                        _place_notes_at_tick(mingus_bar, note, note_timing,
+                                             elapsed_ticks_in_bar)
+                        elapsed_ticks_in_bar += note_ticks
     else:
         raise AttributeError('Key: ' + musical_key + ' cannot be converted' +
                              ' to a mingus key.')
 
     return mingus_bar
 
+def convert_events_to_bar(musical_key, onsets, durations, pitches,
+                          time_signature=meter.common_time, velocities=None,
+                          note_names=None):
+    '''
+    Returns a bar of music built in one pass from arrays of note events.
+    Notes starting on the same tick sound together and gaps are filled with
+    rests. The events are validated once up front, rather than note by note.
+
+    :param musical_key: The musical key to put the bar in
+    :param onsets: Tick in the bar each note starts at, in order
+    :param durations: Duration of each note in ticks
+    :param pitches: MIDI note number of each note, REST_PITCH for a rest
+    :param time_signature: The musical time signature for the bar
+    :param velocities: Velocity of each note, None to leave them as default
+    :param note_names: Dictionary from pitch class (0 to 11) to note name, to
+                       spell notes in a scale (ex: 'Bb' rather than 'A#')
+    '''
+    return next(convert_events_to_bars(musical_key, onsets, durations, pitches,
+                                       [len(onsets)], time_signature, velocities,
+                                       note_names))
+
+def convert_events_to_bars(musical_key, onsets, durations, pitches, notes_per_bar,
+                           time_signature=meter.common_time, velocities=None,
+                           note_names=None):
+    '''
+    Yields bars of music built from arrays of note events for many bars at
+    once, the same way as convert_events_to_bar. The events of every bar are
+    validated together up front, so each bar is only built from plain lists.
+
+    :param musical_key: The musical key to put the bars in
+    :param onsets: Tick in its bar each note starts at, in order within each bar
+    :param durations: Duration of each note in ticks
+    :param pitches: MIDI note number of each note, REST_PITCH for a rest
+    :param notes_per_bar: Number of events in each bar, in order
+    :param time_signature: The musical time signature for the bars
+    :param velocities: Velocity of each note, None to leave them as default
+    :param note_names: Dictionary from pitch class (0 to 11) to note name, to
+                       spell notes in a scale (ex: 'Bb' rather than 'A#')
+    '''
+    if not keys.is_valid_key(musical_key):
+        raise AttributeError('Key: ' + musical_key + ' cannot be converted' +
+                             ' to a mingus key.')
+
+    onsets = numpy.asarray(onsets)
+    durations = numpy.asarray(durations)
+    notes_per_bar = list(notes_per_bar)
+    bar_ticks = time.get_bar_ticks(time_signature)
+
+    if not (len(onsets) == len(durations) == len(pitches)):
+        raise AttributeError('Onsets, durations and pitches must all be ' +
+                             'the same length.')
+
+    if sum(notes_per_bar) != len(onsets):
+        raise AttributeError('Notes per bar must add up to the number of notes.')
+
+    if len(onsets):
+        # Onsets only go back down where a new bar starts
+        starts_bar = numpy.zeros(len(onsets), dtype=bool)
+        bar_starts = numpy.cumsum([0] + notes_per_bar[:-1])
+        starts_bar[bar_starts[bar_starts < len(onsets)]] = True
+
+        if (numpy.any(onsets < 0) or
+                numpy.any((numpy.diff(onsets) < 0) & ~starts_bar[1:]) or
+                numpy.any(durations <= 0) or
+                numpy.any(onsets + durations > bar_ticks)):
+            raise AttributeError('Notes must be in order and fit in a bar of ' +
+                                 str(time_signature) + '.')
+
+    # Every bar shares the key, same as tracks padded with empty bars
+    mingus_key = keys.Key(musical_key)
+
+    onsets = onsets.tolist()
+    durations = durations.tolist()
+    pitches = numpy.asarray(pitches).tolist()
+    if velocities is not None:
+        velocities = numpy.asarray(velocities).tolist()
+
+    first_event = 0
+    for bar_events in notes_per_bar:
+        last_event = first_event + bar_events
+        yield _build_bar(mingus_key, time_signature, bar_ticks,
+                         onsets[first_event:last_event],
+                         durations[first_event:last_event],
+                         pitches[first_event:last_event],
+                         None if velocities is None else velocities[first_event:last_event],
+                         note_names)
+        first_event = last_event
+
+def _build_bar(mingus_key, time_signature, bar_ticks, onsets, durations, pitches,
+               velocities, note_names):
+    '''
+    Returns a bar of music built from lists of note events that are already
+    known to be in order and fit in the bar.
+
+    :param mingus_key: The mingus Key to put the bar in
+    :param time_signature: The musical time signature for the bar
+    :param bar_ticks: Length of the bar in ticks
+    :param onsets: List of the tick in the bar each note starts at
+    :param durations: List of the duration of each note in ticks
+    :param pitches: List of the MIDI note number of each note
+    :param velocities: List of the velocity of each note, or None
+    :param note_names: Dictionary from pitch class (0 to 11) to note name
+    '''
+    mingus_bar = bar.Bar(mingus_key, time_signature)
+
+    bar_contents = mingus_bar.bar
+    tick = 0
+    event_index = 0
+    num_events = len(onsets)
+
+    while event_index < num_events:
+        onset = onsets[event_index]
+        duration = durations[event_index]
+
+        if onset > tick:
+            tick = _fill_with_rests(bar_contents, tick, onset)
+
+        # Everything starting on this tick sounds together
+        notes = None
+        while event_index < num_events and onsets[event_index] == onset:
+            if pitches[event_index] != REST_PITCH:
+                new_note = midi_to_note(pitches[event_index], note_names,
+                                        None if velocities is None else velocities[event_index])
+
+                if notes is None:
+                    # Same as NoteContainer([new_note]) without sorting a single note
+                    notes = note_container.NoteContainer()
+                    notes.notes.append(new_note)
+                else:
+                    notes.add_note(new_note)
+
+            event_index += 1
+
+        bar_contents.append([time.ticks_to_time(onset),
+                             time.ticks_to_value(duration), notes])
+        tick = max(tick, onset + duration)
+
+    if tick < bar_ticks:
+        tick = _fill_with_rests(bar_contents, tick, bar_ticks)
+
+    mingus_bar.current_beat = time.ticks_to_time(tick)
+
+    return mingus_bar
+
+def _fill_with_rests(bar_contents, tick, end_tick):
+    '''
+    Appends rests of standard note values to the contents of a bar from one
+    tick up to another, and returns the tick the rests end at.
+
+    :param bar_contents: List of [beat, duration, notes] of a mingus Bar
+    :param tick: Tick the rests start at
+    :param end_tick: Tick the rests end at
+    '''
+    for rest_ticks in time.split_ticks(end_tick - tick):
+        bar_contents.append([time.ticks_to_time(tick),
+                             time.ticks_to_value(rest_ticks), None])
+        tick += rest_ticks
+
+    return tick
+
+def _place_notes_at_tick(mingus_bar, notes, duration, tick):
+    '''
+    Places notes in a mingus Bar at an exact tick, the same way
+    Bar.place_notes would at the bar's current beat.
+
+    :param mingus_bar: The mingus Bar to place the notes in
+    :param notes: None for a rest, or anything a NoteContainer accepts
+    :param duration: Note timing (ex: value.quarter)
+    :param tick: Tick in the bar to place the notes at
+    '''
+    if notes is not None and not hasattr(notes, 'notes'):
+        if isinstance(notes, list) and all(hasattr(given_note, 'name') for given_note in notes):
+            notes = _make_note_container(notes)
+        else:
+            notes = note_container.NoteContainer(notes)
+
+    mingus_bar.bar.append([time.ticks_to_time(tick), duration, notes])
+    mingus_bar.current_beat = time.ticks_to_time(tick + time.get_note_ticks(duration))
+
+def _make_note_container(given_notes):
+    '''
+    Returns a NoteContainer of mingus Notes, the same as NoteContainer would
+    make, but sorting the notes once rather than after adding each of them.
+
+    :param given_notes: List of mingus Notes
+    '''
+    new_container = note_container.NoteContainer()
+
+    # Sorted is stable, so the first of equal notes is kept, like add_note
+    note_numbers = [int(given_note) for given_note in given_notes]
+    added_numbers = set()
+    for index in sorted(range(0, len(given_notes)), key=note_numbers.__getitem__):
+        if note_numbers[index] not in added_numbers:
+            added_numbers.add(note_numbers[index])
+            new_container.notes.append(given_notes[index])
+
+    return new_container
+
+def note_to_midi(given_note):
+    '''
+    Returns the MIDI note number of a note.
+
+    :param given_note: Note name (ex: 'C#' for C#4, or 'C#-5') or mingus Note
+    '''
+    if not hasattr(given_note, 'name'):
+        given_note = note.Note(given_note)
+
+    return int(given_note) + MIDI_NOTE_OFFSET
+
+def midi_to_note(midi_number, note_names=None, velocity=None):
+    '''
+    Returns the (interned) FrozenNote for a MIDI note number.
+
+    :param midi_number: The MIDI note number (60 is C4)
+    :param note_names: Dictionary from pitch class (0 to 11) to note name, to
+                       spell the note in a scale. Sharps are used otherwise
+    :param velocity: Velocity of the note, None to leave as default
+    '''
+    midi_number = int(midi_number)
+
+    name = None
+    if note_names:
+        name = note_names.get(midi_number % 12)
+
+    cache_key = (midi_number, name, velocity)
+
+    frozen_note = _MIDI_NOTE_CACHE.get(cache_key)
+    if frozen_note is None:
+        if name is not None:
+            # Names like B# and Cb cross into the next or previous octave
+            octave = (midi_number - MIDI_NOTE_OFFSET - int(note.Note(name, 0))) // 12
+        else:
+            sharp_note = note.Note().from_int(midi_number - MIDI_NOTE_OFFSET)
+            name, octave = sharp_note.name, sharp_note.octave
+
+        frozen_note = pitch.get_note(name, octave, velocity)
+        _MIDI_NOTE_CACHE[cache_key] = frozen_note
+
+    return frozen_note
+
 def convert_to_scale(key, scale):
     '''
     Returns a scale of notes given a key.
@@ -94,7 +368,7 @@ def convert_chord_progression_to_track(key, chord_progression,
     if chord_timing is None:
         chord_timing = [[value.whole]] * len(chord_progression)
 
-    new_track = track.Track()
+    new_track = tracks.CopyOnWriteTrack()
 
     chord_index = 0
 
@@ -110,53 +384,132 @@ def convert_chord_progression_to_track(key, chord_progression,
 def alter_octave(bar, octave_change):
     '''
     Returns note timing with octave change based on value for octave_change
-    (ex: alter_octave(bar, -1))
+    (ex: alter_octave(bar, -1)). Notes keep their spelling (ex: Bb stays Bb).
 
     :param bar: List of bar/chords to change octave of
     :param octave_change: Integer to shift octave by. Positive is up, negative is down
     '''
-    new_bar = []
+    bar_notes, pitches, names, velocities = _get_bar_pitches(bar)
+    pitches = transpose_pitches(pitches, 12 * octave_change)
+
+    return _get_bar_notes(bar_notes, pitches, names, velocities)
+
+def transpose(bar, semitones):
+    '''
+    Returns note timing with every note transposed by a number of semitones
+    (ex: transpose(bar, 7)). All the notes are transposed at once as MIDI
+    numbers, so notes are respelled with sharps.
 
-    # Go through all the different note timings/chords
+    :param bar: List of bar/chords to transpose
+    :param semitones: Integer to shift notes by. Positive is up, negative is down
+    '''
+    bar_notes, pitches, _, velocities = _get_bar_pitches(bar)
+    pitches = transpose_pitches(pitches, semitones)
+
+    return _get_bar_notes(bar_notes, pitches, None, velocities)
+
+def _get_bar_pitches(bar):
+    '''
+    Returns the notes of each entry in note timing as lists, along with an
+    array of the MIDI note number of every note (REST_PITCH for None) and
+    lists of their names and velocities.
+
+    :param bar: List of bar/chords, each a note, a list of notes or None
+    '''
+    bar_notes = []
     for notes in bar:
-        note_octave_change = []
+        if not notes:
+            bar_notes.append([])
+        elif hasattr(notes, 'name') or isinstance(notes, str):
+            # A single note name or mingus Note
+            bar_notes.append([notes])
+        else:
+            bar_notes.append(list(notes))
+
+    pitches = []
+    names = []
+    velocities = []
+    for notes in bar_notes:
+        for given_note in notes:
+            if given_note:
+                midi_number, name, velocity = _get_note_details(given_note)
+            else:
+                midi_number, name, velocity = REST_PITCH, None, None
+
+            pitches.append(midi_number)
+            names.append(name)
+            velocities.append(velocity)
+
+    return bar_notes, numpy.array(pitches, dtype=numpy.int16), names, velocities
 
-        # If it's not a rest (None) and NOT a single note,
-        # then continue into the list of notes
-        if notes:
-            if mingus_notes.is_valid_note(notes):
-                new_note = _adjust_note_octave(notes, octave_change)
+def _get_note_details(given_note):
+    '''
+    Returns the MIDI note number, name and velocity (None if not set) of a
+    note. Note names are only parsed once.
+
+    :param given_note: Note name (ex: 'C#' for C#4, or 'C#-5') or mingus Note
+    '''
+    if hasattr(given_note, 'name'):
+        return (int(given_note) + MIDI_NOTE_OFFSET, given_note.name,
+                given_note.__dict__.get('velocity'))
 
-                # Append the altered note
-                note_octave_change.append(new_note)
+    note_details = _NOTE_NAME_CACHE.get(given_note)
+    if note_details is None:
+        parsed_note = note.Note(given_note)
+        note_details = (int(parsed_note) + MIDI_NOTE_OFFSET, parsed_note.name, None)
+        _NOTE_NAME_CACHE[given_note] = note_details
+
+    return note_details
+
+def _get_bar_notes(bar_notes, pitches, names, velocities):
+    '''
+    Returns note timing shaped like the given notes, with the notes replaced
+    by (interned) FrozenNotes for the given MIDI note numbers.
+
+    :param bar_notes: Notes of each entry in note timing, as lists
+    :param pitches: Array of the MIDI note number of every note
+    :param names: Name to spell each note with, None to use sharps
+    :param velocities: Velocity of each note, None to leave as default
+    '''
+    new_bar = []
+    pitches = pitches.tolist()
+    pitch_index = 0
+    for notes in bar_notes:
+        new_notes = []
+        for midi_number in pitches[pitch_index:pitch_index + len(notes)]:
+            if midi_number == REST_PITCH:
+                new_notes.append(None)
             else:
-                for given_note in notes:
-                    if given_note:
-                        new_note = _adjust_note_octave(given_note, octave_change)
-                    else:
-                        new_note = None
+                note_names = None
+                if names is not None:
+                    note_names = {midi_number % 12: names[pitch_index]}
 
-                    # Append the altered note
-                    note_octave_change.append(new_note)
+                new_notes.append(midi_to_note(midi_number, note_names,
+                                              velocities[pitch_index]))
+            pitch_index += 1
 
-        new_bar.append(note_octave_change)
+        new_bar.append(new_notes)
 
     return new_bar
 
-def _adjust_note_octave(given_note, octave_change):
-    new_note = note.Note(given_note)
-    octave_change_temp = octave_change
-
-    if octave_change > 0:
-        while (octave_change_temp > 0):
-            new_note.octave_up()
-            octave_change_temp -= 1
-    elif octave_change < 0:
-        while (octave_change_temp < 0):
-            new_note.octave_down()
-            octave_change_temp += 1
-    else:
-        # Do nothing
-        pass
+def transpose_pitches(pitches, semitones):
+    '''
+    Returns an array of MIDI note numbers transposed by a number of semitones,
+    leaving rests (REST_PITCH) alone. Works on any shape of array, so a whole
+    track or corpus can be transposed in one call.
+
+    :param pitches: Array of MIDI note numbers
+    :param semitones: Integer to shift notes by. Positive is up, negative is down
+    '''
+    pitches = numpy.asarray(pitches)
+    is_note = pitches != REST_PITCH
+
+    transposed = numpy.where(is_note, pitches + semitones, REST_PITCH).astype(pitches.dtype)
+
+    if is_note.any():
+        notes = transposed[is_note]
+        if notes.min() < LOWEST_MIDI_NOTE or notes.max() > HIGHEST_MIDI_NOTE:
+            raise AttributeError('Transposing by ' + str(semitones) + ' semitones' +
+                                 ' puts notes outside the MIDI note range.')
 
-    return new_note
\ No newline at end of file
+    return transposed
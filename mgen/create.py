@@ -5,29 +5,40 @@ Created on Apr 25, 2016
 '''
 
 # Project Modules
+from mgen import binary
+from mgen import cache
 from mgen import convert
 from mgen import time
 from mgen import choice
 from mgen import style
 from mgen import cfg_import
+from mgen import rand
+from mgen import events
+from mgen import tracks
+from mgen import render
 from mgen.style import Style
 
 # Mingus modules
 import mingus.core.keys as keys
-import mingus.core.progressions as progressions
 import mingus.core.meter as meter
 import mingus.containers.composition as mingus_composition
-import mingus.containers.track as track
 import mingus.extra.lilypond as LilyPond
 from mingus.midi import midi_file_out
 
 # Other Modules
 from datetime import datetime
+import multiprocessing.pool
+import numpy
 import os
 import warnings
 import traceback
 import pickle
-import copy
+
+# Number of melody bars generated at a time by MusicGenerator.iter_melody_bars
+MELODY_BARS_PER_BATCH = 64
+
+# Extension of files in the compact binary format (see MusicGenerator.export_binary)
+BINARY_FILE_EXTENSION = 'mgen'
 
 
 class MusicGenerator(object):
@@ -36,7 +47,7 @@ class MusicGenerator(object):
     '''
 
     def __init__(self, style_probs=None, composition_title='Untitled',
-                 author_name='By: Al Gogh Rhythm'):
+                 author_name='By: Al Gogh Rhythm', seed=None):
         '''
         Constructor
 
@@ -44,7 +55,12 @@ class MusicGenerator(object):
                             the probabilities for scales, keys, note timings, modes, etc.
         :param composition_title: Title for the work, used for generated files
         :param author_name: Name of the author, used for generated files
+        :param seed: Integer seed or random.Random instance used for every
+                     random choice, for reproducible generation. Randomly
+                     seeded if not provided
         '''
+        self.rng = rand.make_rng(seed)
+
         self.composition = mingus_composition.Composition()
 
         # If Style not provided, use default
@@ -57,9 +73,10 @@ class MusicGenerator(object):
         self.author_name = author_name
 
         self._time_signature = choice.choose_time_signature(self.style_probs)
-        self._key = choice.choose_key(self.style_probs.probabilities['keys'])
+        self._key = choice.choose_key(self.style_probs.samplers['keys'],
+                                      rng=self.rng)
 
-    def create_melody_track(self, num_bars, style=None, octave_adjust=0):
+    def create_melody_track(self, num_bars, style=None, octave_adjust=0, rng=None):
         '''
         Creates a mingus Track containing bars of randomly generated melodies to
         the composition.
@@ -67,52 +84,250 @@ class MusicGenerator(object):
         :param num_bars: The number of bars to add to the track
         :param style: The musical Style for the track, overrides the generator's
         :param octave_adjust: Adjustment of the octave of notes in the generated bars (+/- int)
+        :param rng: Random number generator for the track, overrides the generator's
         '''
 
         if style is None:
             style = self.style_probs
 
-        # Check if it's a major key
-        major_key_bool = self._key.istitle()
-
         # Add a track with the given style
-        melody_track = track.Track(style=style)
+        melody_track = tracks.CopyOnWriteTrack(style=style)
 
-        # Determine scale based on key
-        if major_key_bool:
-            scale = choice.choose_scale(self._key, style.probabilities['major_scales'])
-        else:
-            # Only accepts all uppercase when determining scale from key
-            key = self._key.upper()
-            scale = choice.choose_scale(key, style.probabilities['minor_scales'])
+        for bar_to_add in self.iter_melody_bars(num_bars, style, octave_adjust, rng):
+            # Add bar to track
+            melody_track.add_bar(bar_to_add)
+
+        return melody_track
+
+    def iter_melody_bars(self, num_bars=None, style=None, octave_adjust=0, rng=None,
+                         bars_per_batch=MELODY_BARS_PER_BATCH):
+        '''
+        Yields randomly generated melody bars one at a time, so they can be
+        consumed (exported, played, analyzed) while the rest are generated.
+        Bars are generated bars_per_batch at a time, so memory use doesn't
+        depend on the total number of bars.
+
+        :param num_bars: The number of bars to generate, None to never stop
+        :param style: The musical Style for the bars, overrides the generator's
+        :param octave_adjust: Adjustment of the octave of notes in the generated bars (+/- int)
+        :param rng: Random number generator for the bars, overrides the generator's
+        :param bars_per_batch: How many bars to generate at a time
+        '''
+
+        if style is None:
+            style = self.style_probs
+
+        if rng is None:
+            rng = self.rng
+
+        scale = self._choose_melody_scale(style, rng)
+        note_names = choice.get_scale_entry(scale).note_names
+
+        for melody_ticks, batch_pitches in self._iter_melody_batches(num_bars, style, octave_adjust,
+                                                                     rng, bars_per_batch, scale):
+            notes_per_bar = [len(bar_ticks) for bar_ticks in melody_ticks]
+            durations = numpy.array([note_ticks for bar_ticks in melody_ticks
+                                     for note_ticks in bar_ticks],
+                                    dtype=events.DURATION_DTYPE)
+
+            # Every note starts where the one before it in its bar ends
+            onsets = numpy.zeros(len(durations), dtype=events.ONSET_DTYPE)
+            numpy.cumsum(durations[:-1], out=onsets[1:])
+            onsets -= numpy.repeat(onsets[numpy.cumsum([0] + notes_per_bar[:-1])],
+                                   notes_per_bar)
+
+            # Combine melody time and notes into mingus Bar objects, the
+            # whole batch validated at once
+            for melody_bar in convert.convert_events_to_bars(self._key, onsets, durations,
+                                                             batch_pitches, notes_per_bar,
+                                                             self._time_signature,
+                                                             note_names=note_names):
+                yield melody_bar
+
+    def iter_melody_events(self, num_bars=None, style=None, octave_adjust=0, rng=None,
+                           bars_per_batch=MELODY_BARS_PER_BATCH, location_to_add=1):
+        '''
+        Yields randomly generated melody notes as (onsets, durations, pitches)
+        arrays, one batch of bars at a time, with onsets in ticks from the
+        start of the piece. Notes are drawn the same way as iter_melody_bars,
+        but no mingus objects are built, so it can feed midi.MidiStreamWriter
+        for pieces too long to hold in memory.
+
+        :param num_bars: The number of bars to generate, None to never stop
+        :param style: The musical Style for the bars, overrides the generator's
+        :param octave_adjust: Adjustment of the octave of notes in the generated bars (+/- int)
+        :param rng: Random number generator for the bars, overrides the generator's
+        :param bars_per_batch: How many bars to generate at a time
+        :param location_to_add: Bar the melody starts at. Note: Start at Bar #1
+        '''
+
+        if style is None:
+            style = self.style_probs
 
-        for _ in range(0, num_bars):
-            # Create time for melody
-            melody_timing = self._create_melody_timing(style.probabilities['timings'])
+        if rng is None:
+            rng = self.rng
 
-            # Determine number notes in melody
-            number_notes = time.get_notes_in_timing(melody_timing)
+        scale = self._choose_melody_scale(style, rng)
 
-            # Choose notes for melody based on scale for given key
-            chosen_notes = choice.choose_notes(number_notes, scale)
+        bar_ticks = time.get_bar_ticks(self._time_signature)
+        bar_onset = (location_to_add - 1) * bar_ticks
+
+        for melody_ticks, batch_pitches in self._iter_melody_batches(num_bars, style, octave_adjust,
+                                                                     rng, bars_per_batch, scale):
+            durations = numpy.array([note_ticks for melody_bar_ticks in melody_ticks
+                                     for note_ticks in melody_bar_ticks],
+                                    dtype=events.DURATION_DTYPE)
+
+            # Every note starts where the one before it ends
+            onsets = numpy.zeros(len(durations), dtype=events.ONSET_DTYPE)
+            numpy.cumsum(durations[:-1], out=onsets[1:])
+            onsets += bar_onset
+            bar_onset += len(melody_ticks) * bar_ticks
+
+            # Rests are only gaps between the events
+            is_note = batch_pitches != choice.REST_PITCH
+
+            yield onsets[is_note], durations[is_note], batch_pitches[is_note]
+
+    def _iter_melody_batches(self, num_bars, style, octave_adjust, rng, bars_per_batch, scale):
+        '''
+        Yields the note lengths in ticks of each bar in a batch of melody
+        bars, along with the MIDI pitches of every note in the batch.
+
+        :param num_bars: The number of bars to generate, None to never stop
+        :param style: The musical Style for the bars
+        :param octave_adjust: Adjustment of the octave of notes in the generated bars (+/- int)
+        :param rng: Random number generator for the bars
+        :param bars_per_batch: How many bars to generate at a time
+        :param scale: The scale to choose notes from
+        '''
+        bars_generated = 0
+
+        while num_bars is None or bars_generated < num_bars:
+            if num_bars is None:
+                bars_in_batch = bars_per_batch
+            else:
+                bars_in_batch = min(bars_per_batch, num_bars - bars_generated)
+
+            # Create time for melody, as the length of each note in ticks
+            melody_ticks = [self._create_melody_ticks(style.timing_table, rng)
+                            for _ in range(0, bars_in_batch)]
+
+            # Choose notes for the whole batch based on scale for given key
+            batch_pitches = choice.choose_track_pitches(sum(len(bar_ticks) for bar_ticks in melody_ticks),
+                                                        scale, rng=rng)
 
             if octave_adjust != 0:
                 # Adjust octave
-                chosen_notes = convert.alter_octave(chosen_notes,
-                                                    octave_adjust)
+                batch_pitches = convert.transpose_pitches(batch_pitches,
+                                                          12 * octave_adjust)
 
-            # Combine melody time and notes into a mingus Bar object
-            bar_to_add = convert.convert_notes_to_bar(self._key, melody_timing,
-                                                      chosen_notes,
-                                                      self._time_signature)
+            yield melody_ticks, batch_pitches
 
-            # Add bar to track
-            melody_track.add_bar(bar_to_add)
+            bars_generated += bars_in_batch
 
-        return melody_track
+    def create_event_composition(self):
+        '''
+        Returns an empty EventComposition with this generator's key, time
+        signature, title and author, to generate tracks into.
+        '''
+        return events.EventComposition(self._key, self._time_signature,
+                                       self.composition_title, self.author_name)
+
+    def create_melody_events(self, num_bars, style=None, octave_adjust=0, rng=None,
+                             event_composition=None, location_to_add=1):
+        '''
+        Generates a melody track straight into the arrays of an
+        EventComposition, without building any mingus objects. Rhythms and
+        pitches are drawn the same way as create_melody_track, so it's the
+        cheaper option when the notes only need to be exported or analyzed.
+
+        :param num_bars: The number of bars to add to the track
+        :param style: The musical Style for the track, overrides the generator's
+        :param octave_adjust: Adjustment of the octave of notes in the generated bars (+/- int)
+        :param rng: Random number generator for the track, overrides the generator's
+        :param event_composition: EventComposition to add the track to, a new
+                                  one is created if not provided
+        :param location_to_add: Bar the track starts at. Note: Start at Bar #1
+        '''
+
+        if style is None:
+            style = self.style_probs
+
+        if rng is None:
+            rng = self.rng
+
+        if event_composition is None:
+            event_composition = self.create_event_composition()
+
+        # Same batches as iter_melody_bars, so a seed gives the same melody
+        melody_batches = list(self.iter_melody_events(num_bars, style, octave_adjust, rng,
+                                                      location_to_add=location_to_add))
+
+        if melody_batches:
+            onsets, durations, pitches = [numpy.concatenate(batch_arrays)
+                                          for batch_arrays in zip(*melody_batches)]
+        else:
+            onsets = numpy.zeros(0, dtype=events.ONSET_DTYPE)
+            durations = numpy.zeros(0, dtype=events.DURATION_DTYPE)
+            pitches = numpy.zeros(0, dtype=events.PITCH_DTYPE)
+
+        track_id = event_composition.add_track(location_to_add - 1 + num_bars)
+        event_composition.add_events(track_id, onsets, durations, pitches)
+
+        return event_composition
+
+    def create_chords_events(self, num_bars=None, style=None, octave_adjust=0,
+                             rng=None, event_composition=None, location_to_add=1):
+        '''
+        Generates a chords track straight into the arrays of an
+        EventComposition, without building any mingus objects. Progressions
+        are chosen the same way as create_chords_track.
+
+        :param num_bars: The number of bars to add to the track
+        :param style: The musical Style for the track
+        :param octave_adjust: Adjustment of the octave of notes in the generated bars
+        :param rng: Random number generator for the track, overrides the generator's
+        :param event_composition: EventComposition to add the track to, a new
+                                  one is created if not provided
+        :param location_to_add: Bar the track starts at. Note: Start at Bar #1
+        '''
+
+        if style is None:
+            style = self.style_probs
+
+        if rng is None:
+            rng = self.rng
+
+        if event_composition is None:
+            event_composition = self.create_event_composition()
+
+        chord_progression_notes = self._choose_chord_progression_notes(num_bars, style, rng)
+
+        # Each chord is a whole bar
+        bar_ticks = time.get_bar_ticks(self._time_signature)
+        start_tick = (location_to_add - 1) * bar_ticks
+
+        onsets = []
+        pitches = []
+        for bar_index, chord in enumerate(chord_progression_notes):
+            for chord_note in chord:
+                onsets.append(start_tick + bar_index * bar_ticks)
+                pitches.append(convert.note_to_midi(chord_note))
+
+        # Rejects octaves that put notes outside the MIDI note range
+        pitches = convert.transpose_pitches(numpy.array(pitches, dtype=events.PITCH_DTYPE),
+                                            12 * octave_adjust)
+
+        track_id = event_composition.add_track(location_to_add - 1 +
+                                               len(chord_progression_notes))
+        event_composition.add_events(track_id, onsets, [bar_ticks] * len(onsets),
+                                     pitches)
+
+        return event_composition
 
     def create_chords_track(self, num_bars=None, style=None, melody_track=None,
-                            octave_adjust=0, force_mode_scale=False):
+                            octave_adjust=0, force_mode_scale=False, rng=None):
         '''
         Create a track to the composition filled with chords
 
@@ -121,14 +336,15 @@ class MusicGenerator(object):
         :param melody_track: Melody track to base the chords track off of TODO: Unused
         :param octave_adjust: Adjustment of the octave of notes in the generated bars
         :param force_mode_scale: Force a certain mode for a scale TODO: Unused
+        :param rng: Random number generator for the track, overrides the generator's
         TODO: Create chord length other than all whole notes
         '''
 
         if style is None:
             style = self.style_probs
 
-        # Create chord progression
-        progression_probs = style.probabilities['progressions']
+        if rng is None:
+            rng = self.rng
 
         if force_mode_scale:
             # TODO: Do something with mode?
@@ -136,45 +352,7 @@ class MusicGenerator(object):
         else:
             pass
 
-        if num_bars is not None:
-            # Make sure there is a possible chord progression of the length they specify
-            found_possible_match = False
-            matches = []
-            repeat_times_to_fill = 0
-
-            # Find all the possible progressions to match given length
-            for key, prob in progression_probs:
-                chords = key.split(' ')
-                if num_bars % len(chords) == 0:
-                    found_possible_match = True
-                    matches.append((key, prob))
-
-            # TODO: Retain relative probabilities
-            # For now, just make probabilities of possible matches all equal
-            temp_matches = matches
-            matches = []
-            for key, prob in temp_matches:
-                matches.append((key, 1.0 / (len(temp_matches))))
-
-            if found_possible_match:
-                raw_chord_progression = choice.choose_chord_progression(matches)
-                repeat_times_to_fill = int(num_bars / len(raw_chord_progression))
-
-                # Repeat chords as necessary to fill up bars to number specified
-                raw_chord_progression = self._repeat_chords_track(raw_chord_progression,
-                                                                  repeat_times_to_fill)
-
-            else:
-                raise AttributeError('Cannot find a chord progression to' +
-                                     ' meet the requirement' + ' for ' +
-                                     str(num_bars) + ' bars.')
-
-        # Number of bars was not specified, just pick a single chord progression
-        else:
-            raw_chord_progression = choice.choose_chord_progression(progression_probs)
-
-        chord_progression_notes = progressions.to_chords(raw_chord_progression,
-                                                         self._key)
+        chord_progression_notes = self._choose_chord_progression_notes(num_bars, style, rng)
 
         # Adjust octave
         chord_progression = convert.alter_octave(chord_progression_notes,
@@ -187,21 +365,84 @@ class MusicGenerator(object):
 
         return chord_track
 
+    def _choose_melody_scale(self, style, rng):
+        '''
+        Returns a scale for a melody, chosen based on whether the key is
+        major or minor.
+
+        :param style: The musical Style for the melody
+        :param rng: Random number generator
+        '''
+        # Check if it's a major key
+        major_key_bool = self._key.istitle()
+
+        # Determine scale based on key
+        if major_key_bool:
+            return choice.choose_scale(self._key, style.samplers['major_scales'],
+                                       rng=rng)
+
+        # Only accepts all uppercase when determining scale from key
+        key = self._key.upper()
+        return choice.choose_scale(key, style.samplers['minor_scales'], rng=rng)
+
+    def _choose_chord_progression_notes(self, num_bars, style, rng):
+        '''
+        Returns the notes of the chords of a progression filling the given
+        number of bars, or of a single progression if the number of bars is
+        not given.
+
+        :param num_bars: The number of bars the progression should fill
+        :param style: The musical Style for the progression
+        :param rng: Random number generator
+        '''
+        if num_bars is not None:
+            # Only progressions of a length that divides the number of bars
+            raw_chord_progression = choice.choose_fitting_chord_progression(num_bars,
+                                                                            style.progression_table,
+                                                                            rng=rng)
+            repeat_times_to_fill = int(num_bars / len(raw_chord_progression))
+
+        # Number of bars was not specified, just pick a single chord progression
+        else:
+            raw_chord_progression = choice.choose_chord_progression(style.samplers['progressions'],
+                                                                    rng=rng)
+            repeat_times_to_fill = 1
+
+        chord_progression_notes = choice.get_progression_chords(raw_chord_progression,
+                                                                self._key)
+
+        # Repeat chords as necessary to fill up bars to number specified
+        return self._repeat_chords_track(chord_progression_notes, repeat_times_to_fill)
+
     def insert_track(self, track, location_to_add=1, times_to_repeat=0):
-        new_track = copy.deepcopy(track)
+        '''
+        Adds a copy of a track to the composition. Bars are shared with the
+        given track (and between repeats) until one of them changes a bar.
 
+        :param track: The mingus Track to add
+        :param location_to_add: Bar to start the track at. Note: Start at Bar #1
+        :param times_to_repeat: How many times to repeat the track after the first
+        '''
         # Repeat chords per argument
-        new_track.bars += new_track.bars * times_to_repeat
+        new_track = tracks.CopyOnWriteTrack.from_track(track, times_to_repeat)
 
-        # Add empty bars to the front of the new_track to place melody at the
-        # location specified. Note: Start at Bar #1
+        # Start the track at the location specified, rather than filling the
+        # bars before it with rests. Note: Start at Bar #1
         if location_to_add > 1:
-            empty_bars_to_add = location_to_add - 1
-            new_track = time.prepend_empty_bars_to_track(new_track,
-                                                     empty_bars_to_add)
+            new_track.start_bar += location_to_add - 1
 
         self.composition.add_track(new_track)
 
+    def spawn_rngs(self, number_streams):
+        '''
+        Returns independent random number generators derived from this
+        generator's, for generating tracks (or whole compositions in separate
+        workers) that are reproducible from the generator's seed.
+
+        :param number_streams: Number of random number generators to create
+        '''
+        return rand.spawn_rngs(self.rng, number_streams)
+
     def remove_track(self, index=None):
         '''
         Removes a track from the composition
@@ -242,13 +483,25 @@ class MusicGenerator(object):
         else:
             raise AttributeError(str(key) + ' is not a valid key.', UserWarning)
 
-    def export_pdf(self, file_path):
+    def export_pdf(self, file_path, export_cache=None):
         '''
         Outputs a pdf to a specified path
 
         :param file_path: Path to the file to generate. Put / at end to use
                           default naming in directory specified. Otherwise
                           provide full path. DO NOT use relative pathing.
+        :param export_cache: ExportCache to reuse pdfs of identical scores from,
+                             defaults to the one in the configuration (if any)
+        '''
+        return self._export_pdf(file_path, export_cache)
+
+    def _export_pdf(self, file_path, export_cache=None, composition=None):
+        '''
+        Outputs a pdf to a specified path (see export_pdf)
+
+        :param file_path: Path to the file to generate
+        :param export_cache: ExportCache to reuse pdfs of identical scores from
+        :param composition: Padded composition to use, made if not provided
         '''
         if file_path is None:
             warnings.warn('PDF not generated. Please specify valid path.',
@@ -262,11 +515,19 @@ class MusicGenerator(object):
 
         file_path = MusicGenerator._create_file_path(file_path, '')
 
+        if export_cache is None:
+            export_cache = cache.get_export_cache()
+
         # Output the pdf score
-        ly_string = LilyPond.from_Composition(self.composition)
-        if ly_string and self.composition.tracks:
-            LilyPond.to_pdf(ly_string, file_path,
-                            lilypond_installation=cfg_import.config.LILYPOND_INSTALLATION)
+        ly_string = self.get_lilypond_string(composition)
+        if ly_string:
+            cache_key = MusicGenerator._get_pdf_cache_key(ly_string)
+            if export_cache is None or not export_cache.fetch(cache_key, 'pdf', file_path + '.pdf'):
+                LilyPond.to_pdf(ly_string, file_path,
+                                lilypond_installation=cfg_import.config.LILYPOND_INSTALLATION)
+
+                if export_cache is not None and os.path.isfile(file_path + '.pdf'):
+                    export_cache.put(cache_key, 'pdf', file_path + '.pdf')
         else:
             warnings.warn('PDF not generated because the composition didn\'t ' +
                           'have any tracks. :(', UserWarning)
@@ -274,13 +535,121 @@ class MusicGenerator(object):
 
         return file_path + '.pdf'
 
-    def export_midi(self, file_path, bpm=100, repeat=0, verbose=False):
+    def get_lilypond_string(self, composition=None):
+        '''
+        Returns the LilyPond source of the score, None if the composition
+        doesn't have any tracks.
+
+        :param composition: Padded composition to use, made if not provided
+        '''
+        if not self.composition.tracks:
+            return None
+
+        if composition is None:
+            composition = tracks.get_padded_composition(self.composition)
+
+        return LilyPond.from_Composition(composition) or None
+
+    @staticmethod
+    def export_pdfs(music_generators, file_paths, processes=None,
+                    files_per_call=render.FILES_PER_CALL, timeout=render.LILYPOND_TIMEOUT,
+                    export_cache=None):
+        '''
+        Outputs a pdf per MusicGenerator, rendering many of them with each
+        lilypond process and running a few processes at once. Much faster
+        than calling export_pdf on each one. Returns the path of each pdf, or
+        None where a pdf wasn't generated.
+
+        :param music_generators: MusicGenerators to output the scores of
+        :param file_paths: Path to the file to generate for each MusicGenerator
+                           (see export_pdf)
+        :param processes: Most lilypond processes at once, defaults to number of cores
+        :param files_per_call: Most scores rendered by a single lilypond process
+        :param timeout: Seconds a single lilypond process may run before it's killed
+        :param export_cache: ExportCache to reuse pdfs of identical scores from,
+                             defaults to the one in the configuration (if any)
+        '''
+        if len(music_generators) != len(file_paths):
+            raise AttributeError('Provide a file path for each MusicGenerator.')
+
+        if export_cache is None:
+            export_cache = cache.get_export_cache()
+
+        pdf_paths = [None] * len(music_generators)
+
+        ly_sources = []
+        source_indices = []
+        for index, (music_generator, file_path) in enumerate(zip(music_generators, file_paths)):
+            ly_string = music_generator.get_lilypond_string()
+            if file_path is None or not ly_string:
+                warnings.warn('PDF not generated for composition ' + str(index) +
+                              ' because it didn\'t have a valid path or any ' +
+                              'tracks.', UserWarning)
+                traceback.print_stack()
+                continue
+
+            # Lilypond doesn't like it if the file path already ends in .pdf
+            if file_path.lower()[-4:] == '.pdf':
+                file_path = file_path[:-4]
+
+            file_path = MusicGenerator._create_file_path(file_path, '')
+
+            cache_key = MusicGenerator._get_pdf_cache_key(ly_string)
+            if export_cache is not None and export_cache.fetch(cache_key, 'pdf', file_path + '.pdf'):
+                pdf_paths[index] = file_path + '.pdf'
+                continue
+
+            ly_sources.append((ly_string, file_path))
+            source_indices.append(index)
+
+        results = render.render_pdfs(ly_sources, cfg_import.config.LILYPOND_INSTALLATION,
+                                     files_per_call, processes, timeout)
+        for result in results:
+            if result.error:
+                warnings.warn('PDF not generated for ' + result.file_path + ': ' +
+                              result.error, UserWarning)
+            elif export_cache is not None:
+                # Keyed by the source this pdf was rendered from, never by position
+                ly_string = ly_sources[result.index][0]
+                export_cache.put(MusicGenerator._get_pdf_cache_key(ly_string), 'pdf',
+                                 result.pdf_path)
+
+            pdf_paths[source_indices[result.index]] = result.pdf_path
+
+        return pdf_paths
+
+    @staticmethod
+    def _get_pdf_cache_key(ly_string):
+        '''
+        Returns the ExportCache key for the pdf of a LilyPond string.
+
+        :param ly_string: LilyPond source of the score
+        '''
+        return cache.get_key('pdf', render.LILYPOND_VERSION_STATEMENT, ly_string)
+
+    def export_midi(self, file_path, bpm=100, repeat=0, verbose=False, export_cache=None):
         '''
         Outputs a midi to a specified path
 
         :param file_path: Path to the file to generate. Put / at end to use
                           default naming in directory specified. Otherwise
                           provide full path. DO NOT use relative pathing.
+        :param export_cache: ExportCache to reuse midis of identical compositions
+                             from, defaults to the one in the configuration (if any)
+        '''
+        return self._export_midi(file_path, bpm, repeat, verbose, export_cache)
+
+    def _export_midi(self, file_path, bpm=100, repeat=0, verbose=False,
+                     export_cache=None, composition=None):
+        '''
+        Outputs a midi to a specified path (see export_midi)
+
+        :param file_path: Path to the file to generate
+        :param bpm: Beats per minute for the midi
+        :param repeat: How many times to repeat the composition after the first
+        :param verbose: Whether mingus prints what it writes
+        :param export_cache: ExportCache to reuse midis of identical compositions from
+        :param composition: Padded composition to use, made if not provided
         '''
         if file_path is None:
             warnings.warn('MIDI not generated. Please specify valid path.',
@@ -290,10 +659,20 @@ class MusicGenerator(object):
 
         file_path = MusicGenerator._create_file_path(file_path, 'mid')
 
+        if export_cache is None:
+            export_cache = cache.get_export_cache()
+
         # Output a midi file
         if self.composition is not None and self.composition.tracks:
-            midi_file_out.write_Composition(file_path, self.composition,
-                                            bpm, repeat, verbose)
+            cache_key = None
+            if export_cache is not None:
+                cache_key = self._get_midi_cache_key(bpm, repeat, composition)
+
+            if cache_key is None or not export_cache.fetch(cache_key, 'mid', file_path):
+                self._create_midi_file(bpm, repeat, composition).write_file(file_path, verbose)
+
+                if cache_key is not None:
+                    export_cache.put(cache_key, 'mid', file_path)
         else:
             warnings.warn('MIDI not generated because the composition didn\'t' +
                           ' have any tracks. :(', UserWarning)
@@ -301,6 +680,177 @@ class MusicGenerator(object):
 
         return file_path
 
+    def get_midi_bytes(self, bpm=100, repeat=0):
+        '''
+        Returns the composition as the bytes of a midi file, without touching
+        the file system.
+
+        :param bpm: Beats per minute for the midi
+        :param repeat: How many times to repeat the composition after the first
+        '''
+        if self.composition is None or not self.composition.tracks:
+            warnings.warn('MIDI not generated because the composition didn\'t' +
+                          ' have any tracks. :(', UserWarning)
+            traceback.print_stack()
+            return None
+
+        return self._create_midi_file(bpm, repeat).get_midi_data()
+
+    def write_midi(self, midi_file, bpm=100, repeat=0):
+        '''
+        Writes the composition as a midi file into an open binary file object
+        (ex: io.BytesIO or a socket's file), without touching the file system.
+        Returns the number of bytes written.
+
+        :param midi_file: Binary file object to write to
+        :param bpm: Beats per minute for the midi
+        :param repeat: How many times to repeat the composition after the first
+        '''
+        midi_data = self.get_midi_bytes(bpm, repeat)
+        if midi_data is None:
+            return 0
+
+        midi_file.write(midi_data)
+
+        return len(midi_data)
+
+    def _create_midi_file(self, bpm=100, repeat=0, composition=None):
+        '''
+        Returns a mingus MidiFile with every track of the composition played
+        into it.
+
+        :param bpm: Beats per minute for the midi
+        :param repeat: How many times to repeat the composition after the first
+        :param composition: Padded composition to use, made if not provided
+        '''
+        if composition is None:
+            composition = tracks.get_padded_composition(self.composition)
+
+        midi_file = midi_file_out.MidiFile([midi_file_out.MidiTrack(bpm)
+                                            for _ in composition.tracks])
+
+        # Same as midi_file_out.write_Composition, minus writing to a path
+        for _ in range(0, repeat + 1):
+            for midi_track, composition_track in zip(midi_file.tracks, composition.tracks):
+                midi_track.play_Track(composition_track)
+
+        return midi_file
+
+    def _get_midi_cache_key(self, bpm=100, repeat=0, composition=None):
+        '''
+        Returns the ExportCache key for the midi of the composition, a hash of
+        everything mingus writes to the midi. Much cheaper than writing it.
+
+        :param bpm: Beats per minute for the midi
+        :param repeat: How many times to repeat the composition after the first
+        :param composition: Padded composition to use, made if not provided
+        '''
+        if composition is None:
+            composition = tracks.get_padded_composition(self.composition)
+
+        midi_source = ['mid', bpm, repeat]
+
+        for track in composition.tracks:
+            midi_source.append(('track', getattr(track, 'name', None),
+                                getattr(track.instrument, 'instrument_nr', None)))
+
+            for track_bar in track:
+                midi_source.append((tuple(track_bar.meter),
+                                    getattr(track_bar.key, 'key', track_bar.key)))
+                midi_source.extend((entry[1], tuple((int(entry_note), entry_note.velocity,
+                                                     entry_note.channel)
+                                                    for entry_note in entry[2] or ()))
+                                   for entry in track_bar)
+
+        return cache.get_key(repr(midi_source))
+
+    def export(self, pickle_path=None, pdf_path=None, midi_path=None, bpm=100,
+               repeat=0, export_cache=None, binary_path=None):
+        '''
+        Outputs any of a pickle, binary file, pdf and midi at once. The padded
+        composition is made once and shared, and the files are written
+        concurrently, so it takes about as long as the slowest of them
+        (usually the pdf, which waits on lilypond). Returns the path of each file generated, by file
+        extension (ex: {'pdf': '/path/to/file.pdf'}).
+
+        :param pickle_path: Path of the pickle (see export_pickle), None to skip
+        :param pdf_path: Path of the pdf (see export_pdf), None to skip
+        :param midi_path: Path of the midi (see export_midi), None to skip
+        :param bpm: Beats per minute for the midi
+        :param repeat: How many times to repeat the composition in the midi
+        :param export_cache: ExportCache to reuse files of identical compositions
+                             from, defaults to the one in the configuration (if any)
+        :param binary_path: Path of the compact binary file (see export_binary), None to skip
+        '''
+        composition = tracks.get_padded_composition(self.composition)
+
+        exports = []
+        if pickle_path:
+            exports.append(('pkl', self.export_pickle, (pickle_path,)))
+        if binary_path:
+            exports.append((BINARY_FILE_EXTENSION, self.export_binary, (binary_path,)))
+        if pdf_path:
+            exports.append(('pdf', self._export_pdf, (pdf_path, export_cache, composition)))
+        if midi_path:
+            exports.append(('mid', self._export_midi, (midi_path, bpm, repeat, False,
+                                                       export_cache, composition)))
+
+        if not exports:
+            return dict()
+
+        # The writers are either waiting on lilypond or on the disk
+        pool = multiprocessing.pool.ThreadPool(len(exports))
+        try:
+            pending = [(file_extension, pool.apply_async(writer, writer_args))
+                       for file_extension, writer, writer_args in exports]
+            file_paths = dict((file_extension, result.get())
+                              for file_extension, result in pending)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+        return file_paths
+
+    def to_event_composition(self):
+        '''
+        Returns the composition as an EventComposition.
+        '''
+        event_composition = events.EventComposition.from_composition(self.composition, self._key,
+                                                                     self._time_signature)
+        event_composition.title = self.composition_title
+        event_composition.author = self.author_name
+
+        return event_composition
+
+    def export_binary(self, file_path):
+        '''
+        Outputs the composition in the compact binary format (see
+        mgen/binary.py), which is much smaller and faster to load than a
+        pickle. Load it with from_binary.
+
+        :param file_path: Path to the file to generate. Put / at end to use
+                          default naming in directory specified. Otherwise
+                          provide full path. DO NOT use relative pathing.
+        '''
+        if file_path is None or file_path == '':
+            warnings.warn('Binary file not generated. Please specify valid path.',
+                          UserWarning)
+            traceback.print_stack()
+            return
+
+        file_path = MusicGenerator._create_file_path(file_path, BINARY_FILE_EXTENSION)
+
+        metadata = {'style_file': getattr(self.style_probs, 'probabilities_file', None),
+                    'start_bars': [getattr(track, 'start_bar', 0)
+                                   for track in self.composition.tracks]}
+
+        binary.write_event_composition(file_path, self.to_event_composition(), metadata)
+
+        return file_path
+
     def export_pickle(self, file_path, protocol_to_use=pickle.HIGHEST_PROTOCOL):
         '''
         Outputs a python pickled object to a specified path
@@ -342,8 +892,7 @@ class MusicGenerator(object):
                 raise AttributeError('Provide file_extension if only providing path: ' + file_path)
 
             # Make folder if necessary
-            if not os.path.exists(file_path):
-                os.makedirs(file_path)
+            MusicGenerator._make_dirs(file_path)
 
             # Create filename based on key and time
             file_path = (file_path + '/' +
@@ -353,43 +902,46 @@ class MusicGenerator(object):
             file_path = os.path.abspath(file_path)
 
             # Make folder if necessary
-            dir_path = os.path.dirname(file_path)
-            if not os.path.isdir(dir_path):
-                os.makedirs(dir_path)
+            MusicGenerator._make_dirs(os.path.dirname(file_path))
 
         return file_path
 
-    def _create_melody_timing(self, note_timing_prob_list):
+    @staticmethod
+    def _make_dirs(dir_path):
+        '''
+        Makes a folder (and the folders it's in) if it doesn't exist. Fine to
+        call from several exports at once.
+
+        :param dir_path: Path of the folder
         '''
-        Returns a list of note lengths representing the time of a melody for a
-        single bar.
+        try:
+            os.makedirs(dir_path)
+        except OSError:
+            # Another export may have just made it
+            if not os.path.isdir(dir_path):
+                raise
+
+    def _create_melody_ticks(self, note_timing_prob_list, rng=None):
+        '''
+        Returns a list of note lengths in ticks representing the time of a
+        melody for a single bar, the whole bar drawn at once from every way
+        the timings fill it.
 
         :param note_timing_prob_list: List of tuples with note timings and
-                                      associated probabilities
+                                      associated probabilities or a compiled
+                                      TimingTable
+        :param rng: Random number generator, defaults to the generator's
         '''
-        melody_bar = []
+        if rng is None:
+            rng = self.rng
 
-        # If valid time signature is supplied, use it to craft melody, otherwise
-        # use common time
         if not meter.is_valid(self._time_signature):
-            raise AttributeError('Time signature: ' + self._time_signature +
+            raise AttributeError('Time signature: ' + str(self._time_signature) +
                                  ' cannot be converted to a mingus meter. ' +
                                  'Use tuple (#, #) format. Ex: (4, 4)')
-        else:
-            remaining_time_in_bar = time.get_time_remaining(melody_bar,
-                                                            self._time_signature)
-
-            # Continue getting note progressions as long as there's room in bar
-            while (remaining_time_in_bar > 0.0):
-                next_timing = choice.choose_next_timing(remaining_time_in_bar,
-                                                        note_timing_prob_list)
-
-                melody_bar.append(next_timing)
-
-                remaining_time_in_bar = time.get_time_remaining(melody_bar,
-                                                                self._time_signature)
 
-        return melody_bar
+        return choice.choose_bar_ticks(self._time_signature, note_timing_prob_list,
+                                       rng=rng)
 
     def __str__(self):
         '''
@@ -410,7 +962,7 @@ class MusicGenerator(object):
                 output += '=' * (38 - len(str(index)))
                 output += '\n'
 
-                for index, bar in enumerate(track):
+                for index, bar in enumerate(tracks.get_padded_track(track)):
                     # I guess I should start at 1... again... ugh.
                     index += 1
 
@@ -428,8 +980,45 @@ class MusicGenerator(object):
 
     @staticmethod
     def from_pickle(pickle_file_name):
-        pkl_file = open(pickle_file_name, 'rb')
-        music_generator = pickle.load(pkl_file)
+        with open(pickle_file_name, 'rb') as pkl_file:
+            music_generator = pickle.load(pkl_file)
+        return music_generator
+
+    @staticmethod
+    def from_binary(binary_file_name, style_probs=None):
+        '''
+        Returns a MusicGenerator with the composition saved by export_binary.
+        Notes are stored as MIDI numbers, so they come back spelled with
+        sharps, and the random number generator starts fresh.
+
+        :param binary_file_name: Path of the file (or a binary file object) to load
+        :param style_probs: A Style object to use, defaults to the one the
+                            composition was generated with (if it can be found)
+        '''
+        event_composition, metadata = binary.read_event_composition(binary_file_name)
+
+        if style_probs is None:
+            style_file = metadata.get('style_file')
+            if style_file and os.path.isfile(style_file):
+                style_probs = Style(style_file)
+
+        music_generator = MusicGenerator(style_probs,
+                                         composition_title=event_composition.title,
+                                         author_name=event_composition.author)
+        music_generator._key = event_composition.key
+        music_generator._time_signature = event_composition.time_signature
+
+        start_bars = metadata.get('start_bars', [0] * len(event_composition.track_bars))
+        for track_id, start_bar in enumerate(start_bars):
+            padded_track = event_composition.to_track(track_id)
+
+            # Bars before the track starts are left out rather than kept as rests
+            new_track = tracks.CopyOnWriteTrack()
+            new_track.bars = padded_track.bars[start_bar:]
+            new_track.start_bar = start_bar
+
+            music_generator.composition.add_track(new_track)
+
         return music_generator
 
     @staticmethod
@@ -0,0 +1,319 @@
+'''
+Music is the space between the notes.
+    - Claude Debussy
+'''
+
+# Project Modules
+from mgen import convert
+from mgen import midi
+from mgen import time
+from mgen import tracks
+
+# Mingus modules
+import mingus.core.meter as meter
+import mingus.containers.composition as mingus_composition
+
+# Other Modules
+import numpy
+
+# Velocity mingus gives notes by default
+DEFAULT_VELOCITY = 64
+
+ONSET_DTYPE = numpy.int64
+DURATION_DTYPE = numpy.int32
+PITCH_DTYPE = numpy.int16
+VELOCITY_DTYPE = numpy.uint8
+TRACK_ID_DTYPE = numpy.uint16
+
+
+class EventComposition(object):
+    '''
+    A composition stored as parallel arrays of note events (onset tick,
+    duration in ticks, MIDI pitch, velocity, track id) rather than mingus
+    objects. Uses a few bytes per note, and can be converted to a mingus
+    Composition for exporters that need one.
+    '''
+
+    def __init__(self, key='C', time_signature=meter.common_time,
+                 title='Untitled', author=''):
+        '''
+        Constructor
+
+        :param key: Musical key of the composition
+        :param time_signature: Time signature of the composition
+        :param title: Title for the work
+        :param author: Name of the author
+        '''
+        self.key = key
+        self.time_signature = tuple(time_signature)
+        self.title = title
+        self.author = author
+
+        # Length of each track in bars
+        self.track_bars = []
+
+        # Events are added in chunks and only joined when read
+        self._chunks = []
+        self._arrays = None
+
+    def add_track(self, num_bars=0):
+        '''
+        Returns the id of a new, empty track.
+
+        :param num_bars: Length of the track in bars
+        '''
+        self.track_bars.append(num_bars)
+        return len(self.track_bars) - 1
+
+    def add_events(self, track_id, onsets, durations, pitches, velocities=DEFAULT_VELOCITY):
+        '''
+        Adds note events to a track.
+
+        :param track_id: Id of the track to add the events to
+        :param onsets: Onset of each note in ticks from the start of the piece
+        :param durations: Duration of each note in ticks
+        :param pitches: MIDI note number of each note
+        :param velocities: Velocity of each note, or one velocity for them all
+        '''
+        if track_id < 0 or track_id >= len(self.track_bars):
+            raise AttributeError('Cannot add events to track ' + str(track_id) +
+                                 ' because that track does not exist.')
+
+        # Checked before casting, so out of range values can't wrap around
+        onsets = numpy.asarray(onsets, dtype=ONSET_DTYPE)
+        durations = numpy.asarray(durations, dtype=DURATION_DTYPE)
+        pitches = midi.check_data_bytes(pitches, 'Pitches').astype(PITCH_DTYPE)
+        velocities = midi.check_data_bytes(velocities, 'Velocities').astype(VELOCITY_DTYPE)
+        velocities = numpy.broadcast_to(velocities, onsets.shape)
+        track_ids = numpy.full(onsets.shape, track_id, dtype=TRACK_ID_DTYPE)
+
+        if not (len(onsets) == len(durations) == len(pitches)):
+            raise AttributeError('Onsets, durations and pitches must all be ' +
+                                 'the same length.')
+
+        self._chunks.append((onsets, durations, pitches, velocities, track_ids))
+        self._arrays = None
+
+    def _get_arrays(self):
+        if self._arrays is None:
+            if self._chunks:
+                self._arrays = tuple(numpy.concatenate(column)
+                                     for column in zip(*self._chunks))
+            else:
+                self._arrays = (numpy.zeros(0, dtype=ONSET_DTYPE),
+                                numpy.zeros(0, dtype=DURATION_DTYPE),
+                                numpy.zeros(0, dtype=PITCH_DTYPE),
+                                numpy.zeros(0, dtype=VELOCITY_DTYPE),
+                                numpy.zeros(0, dtype=TRACK_ID_DTYPE))
+
+            # Keep a single chunk around so later additions don't rejoin everything
+            self._chunks = [self._arrays]
+
+        return self._arrays
+
+    @property
+    def onsets(self):
+        return self._get_arrays()[0]
+
+    @property
+    def durations(self):
+        return self._get_arrays()[1]
+
+    @property
+    def pitches(self):
+        return self._get_arrays()[2]
+
+    @property
+    def velocities(self):
+        return self._get_arrays()[3]
+
+    @property
+    def track_ids(self):
+        return self._get_arrays()[4]
+
+    def __len__(self):
+        return len(self.onsets)
+
+    def transpose(self, semitones, track_id=None):
+        '''
+        Transposes every note of the composition, or of a single track, by a
+        number of semitones in place.
+
+        :param semitones: Integer to shift notes by. Positive is up, negative is down
+        :param track_id: Id of the track to transpose, None for every track
+        '''
+        onsets, durations, pitches, velocities, track_ids = self._get_arrays()
+
+        if track_id is None:
+            pitches = convert.transpose_pitches(pitches, semitones)
+        else:
+            in_track = track_ids == track_id
+            pitches = pitches.copy()
+            pitches[in_track] = convert.transpose_pitches(pitches[in_track], semitones)
+
+        self._arrays = (onsets, durations, pitches, velocities, track_ids)
+        self._chunks = [self._arrays]
+
+        return self
+
+    def get_bar_ticks(self):
+        '''
+        Returns the length of a bar of the composition in ticks.
+        '''
+        return time.get_bar_ticks(self.time_signature)
+
+    def get_midi_bytes(self, bpm=100):
+        '''
+        Returns the composition as the bytes of a midi file, encoded straight
+        from the event arrays.
+
+        :param bpm: Beats per minute for the midi
+        '''
+        return midi.encode_event_composition(self, bpm)
+
+    def write_midi(self, midi_file, bpm=100):
+        '''
+        Writes the composition as a midi file into an open binary file object,
+        or to the given path. Returns the number of bytes written.
+
+        :param midi_file: Binary file object or path to write to
+        :param bpm: Beats per minute for the midi
+        '''
+        midi_data = self.get_midi_bytes(bpm)
+
+        if hasattr(midi_file, 'write'):
+            midi_file.write(midi_data)
+        else:
+            with open(midi_file, 'wb') as open_file:
+                open_file.write(midi_data)
+
+        return len(midi_data)
+
+    @classmethod
+    def from_arrays(cls, onsets, durations, pitches, velocities, track_ids, track_bars,
+                    key='C', time_signature=meter.common_time, title='Untitled', author=''):
+        '''
+        Returns an EventComposition holding the given event arrays as they
+        are, without copying them.
+
+        :param onsets: Onset of each note in ticks from the start of the piece
+        :param durations: Duration of each note in ticks
+        :param pitches: MIDI note number of each note
+        :param velocities: Velocity of each note
+        :param track_ids: Id of the track of each note
+        :param track_bars: Length of each track in bars
+        :param key: Musical key of the composition
+        :param time_signature: Time signature of the composition
+        :param title: Title for the work
+        :param author: Name of the author
+        '''
+        arrays = (numpy.asarray(onsets, dtype=ONSET_DTYPE),
+                  numpy.asarray(durations, dtype=DURATION_DTYPE),
+                  numpy.asarray(pitches, dtype=PITCH_DTYPE),
+                  numpy.asarray(velocities, dtype=VELOCITY_DTYPE),
+                  numpy.asarray(track_ids, dtype=TRACK_ID_DTYPE))
+
+        if len(set(len(array) for array in arrays)) > 1:
+            raise AttributeError('Every event array must be the same length.')
+
+        if len(arrays[4]) and arrays[4].max() >= len(track_bars):
+            raise AttributeError('Cannot add events to track ' + str(arrays[4].max()) +
+                                 ' because that track does not exist.')
+
+        event_composition = cls(key, time_signature, title, author)
+        event_composition.track_bars = list(track_bars)
+        event_composition._arrays = arrays
+        event_composition._chunks = [arrays]
+
+        return event_composition
+
+    @classmethod
+    def from_composition(cls, composition, key='C', time_signature=meter.common_time):
+        '''
+        Returns an EventComposition with the notes of a mingus Composition.
+        Tracks starting later (see tracks.CopyOnWriteTrack.start_bar) keep
+        their place.
+
+        :param composition: The mingus Composition to convert
+        :param key: Musical key of the composition
+        :param time_signature: Time signature of the composition
+        '''
+        event_composition = cls(key, time_signature, composition.title,
+                                composition.author)
+        bar_ticks = event_composition.get_bar_ticks()
+
+        for composition_track in composition.tracks:
+            start_bar = getattr(composition_track, 'start_bar', 0)
+            track_id = event_composition.add_track(start_bar + len(composition_track.bars))
+
+            onsets = []
+            durations = []
+            pitches = []
+            velocities = []
+            for bar_index, track_bar in enumerate(composition_track.bars):
+                bar_onset = (start_bar + bar_index) * bar_ticks
+
+                for beat, duration, notes in track_bar:
+                    # Rests are only gaps between the events
+                    for bar_note in notes or ():
+                        onsets.append(bar_onset + time.time_to_ticks(beat))
+                        durations.append(time.get_note_ticks(duration))
+                        pitches.append(convert.note_to_midi(bar_note))
+                        velocities.append(bar_note.velocity)
+
+            event_composition.add_events(track_id, onsets, durations, pitches, velocities)
+
+        return event_composition
+
+    def to_composition(self):
+        '''
+        Returns the composition as a mingus Composition. Notes starting at the
+        same tick in a track become one NoteContainer, and gaps become rests.
+        '''
+        composition = mingus_composition.Composition()
+        composition.set_title(self.title)
+        composition.set_author(self.author)
+
+        for track_id in range(0, len(self.track_bars)):
+            composition.add_track(self.to_track(track_id))
+
+        return composition
+
+    def to_track(self, track_id):
+        '''
+        Returns a single track of the composition as a mingus Track.
+
+        :param track_id: Id of the track to convert
+        '''
+        bar_ticks = self.get_bar_ticks()
+
+        in_track = numpy.flatnonzero(self.track_ids == track_id)
+        in_track = in_track[numpy.argsort(self.onsets[in_track], kind='stable')]
+
+        onsets = self.onsets[in_track]
+        durations = self.durations[in_track]
+        pitches = self.pitches[in_track]
+        velocities = self.velocities[in_track]
+
+        # Enough bars for the track's length and any events past it
+        num_bars = self.track_bars[track_id]
+        if len(onsets):
+            num_bars = max(num_bars, int(onsets[-1]) // bar_ticks + 1)
+
+        new_track = tracks.CopyOnWriteTrack()
+
+        # Where each bar's events start and end
+        bar_bounds = numpy.searchsorted(onsets, numpy.arange(0, num_bars + 1) * bar_ticks)
+        notes_per_bar = numpy.diff(bar_bounds)
+
+        # Onsets from the start of each event's own bar
+        bar_onsets = onsets - numpy.repeat(numpy.arange(0, num_bars) * bar_ticks,
+                                           notes_per_bar)
+
+        for track_bar in convert.convert_events_to_bars(self.key, bar_onsets, durations,
+                                                        pitches, notes_per_bar.tolist(),
+                                                        self.time_signature, velocities):
+            new_track.add_bar(track_bar)
+
+        return new_track
+
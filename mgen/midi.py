@@ -0,0 +1,409 @@
+'''
+Where words fail, music speaks.
+    - Hans Christian Andersen
+'''
+
+# Project Modules
+from mgen import time
+
+# Other Modules
+import numpy
+import struct
+
+# Standard MIDI file type with a tempo track followed by parallel tracks
+MIDI_FORMAT = 1
+
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+NOTE_OFF_VELOCITY = 0x40
+
+# Channel 10 (9 counting from 0) is for percussion
+PERCUSSION_CHANNEL = 9
+
+# Largest delta time a variable length quantity can hold
+MAX_DELTA_TICKS = 0x0FFFFFFF
+
+# Largest value of a data byte (ex: note number or velocity)
+MAX_DATA_BYTE = 0x7F
+
+_END_OF_TRACK = b'\x00\xff\x2f\x00'
+
+
+def encode_varlen(value):
+    '''
+    Returns a number encoded as a MIDI variable length quantity.
+
+    :param value: Non-negative integer up to MAX_DELTA_TICKS
+    '''
+    if value < 0 or value > MAX_DELTA_TICKS:
+        raise AttributeError(str(value) + ' cannot be encoded as a MIDI ' +
+                             'variable length quantity.')
+
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+
+    return bytes(bytearray(reversed(encoded)))
+
+
+def check_data_bytes(values, description):
+    '''
+    Returns the values as an array, after checking they all fit in a MIDI
+    data byte (0 to 127). Anything bigger would be read as a status byte.
+
+    :param values: Values of a data byte (ex: pitches or velocities)
+    :param description: What the values are, for the error. Ex: Pitches
+    '''
+    values = numpy.asarray(values)
+
+    if values.size and (values.min() < 0 or values.max() > MAX_DATA_BYTE):
+        raise AttributeError(description + ' must be from 0 to ' + str(MAX_DATA_BYTE) +
+                             ' to be written to MIDI.')
+
+    return values
+
+
+def encode_header(number_tracks, ticks_per_quarter_note=time.TICKS_PER_QUARTER_NOTE):
+    '''
+    Returns the header chunk of a standard MIDI file.
+
+    :param number_tracks: Number of track chunks that follow the header
+    :param ticks_per_quarter_note: Time resolution of the delta times
+    '''
+    return b'MThd' + struct.pack('>IHHH', 6, MIDI_FORMAT, number_tracks,
+                                 ticks_per_quarter_note)
+
+
+def encode_chunk(chunk_type, data):
+    '''
+    Returns a chunk of a MIDI file (ex: b'MTrk') holding the given data.
+
+    :param chunk_type: Four byte chunk type
+    :param data: Bytes of the chunk
+    '''
+    return chunk_type + struct.pack('>I', len(data)) + data
+
+
+def encode_tempo_track(bpm=100, time_signature=(4, 4), title=None):
+    '''
+    Returns the track chunk holding the tempo, time signature and title.
+
+    :param bpm: Beats (quarter notes) per minute
+    :param time_signature: Time signature of the music
+    :param title: Title of the music, None to leave out
+    '''
+    microseconds_per_beat = int(round(60000000.0 / bpm))
+    denominator_power = int(time_signature[1]).bit_length() - 1
+
+    track_data = [b'\x00\xff\x51\x03', struct.pack('>I', microseconds_per_beat)[1:],
+                  b'\x00\xff\x58\x04', bytes(bytearray([int(time_signature[0]),
+                                                        denominator_power, 24, 8]))]
+
+    if title:
+        title = title.encode('utf-8')
+        track_data += [b'\x00\xff\x03', encode_varlen(len(title)), title]
+
+    track_data.append(_END_OF_TRACK)
+
+    return encode_chunk(b'MTrk', b''.join(track_data))
+
+
+def encode_note_track(onsets, durations, pitches, velocities, channels=0):
+    '''
+    Returns a track chunk playing the given notes. Every note becomes a note
+    on and note off event, and the whole chunk is built with array
+    operations, without looping over the notes.
+
+    :param onsets: Onset of each note in ticks
+    :param durations: Duration of each note in ticks
+    :param pitches: MIDI note number of each note
+    :param velocities: Velocity of each note
+    :param channels: MIDI channel (0 to 15) of each note, or one for them all
+    '''
+    track_data = _encode_events(*_get_note_events(onsets, durations, pitches,
+                                                  velocities, channels))
+
+    return encode_chunk(b'MTrk', track_data + _END_OF_TRACK)
+
+
+def encode_event_composition(event_composition, bpm=100):
+    '''
+    Returns the bytes of a standard MIDI file playing an EventComposition,
+    with a tempo track followed by a track per composition track.
+
+    :param event_composition: The EventComposition to encode
+    :param bpm: Beats (quarter notes) per minute
+    '''
+    chunks = [encode_header(len(event_composition.track_bars) + 1),
+              encode_tempo_track(bpm, event_composition.time_signature,
+                                 event_composition.title)]
+
+    onsets = event_composition.onsets
+    track_ids = event_composition.track_ids
+
+    for track_id in range(0, len(event_composition.track_bars)):
+        in_track = numpy.flatnonzero(track_ids == track_id)
+        in_track = in_track[numpy.argsort(onsets[in_track], kind='stable')]
+
+        chunks.append(encode_note_track(onsets[in_track],
+                                        event_composition.durations[in_track],
+                                        event_composition.pitches[in_track],
+                                        event_composition.velocities[in_track],
+                                        get_track_channel(track_id)))
+
+    return b''.join(chunks)
+
+
+def write_event_stream(midi_file, track_streams, bpm=100, time_signature=(4, 4), title=None):
+    '''
+    Writes a standard MIDI file to a seekable file object while its notes
+    are generated, with a tempo track followed by a track per stream. Only
+    one chunk of notes is held in memory at a time. Returns the number of
+    bytes written.
+
+    :param midi_file: Seekable file object opened for binary writing
+    :param track_streams: Iterables (ex: generators) per track, each yielding
+                          (onsets, durations, pitches) or (onsets, durations,
+                          pitches, velocities) chunks of notes in onset order
+    :param bpm: Beats (quarter notes) per minute
+    :param time_signature: Time signature of the music
+    :param title: Title of the music, None to leave out
+    '''
+    writer = MidiStreamWriter(midi_file, bpm, time_signature, title)
+
+    for track_id, track_stream in enumerate(track_streams):
+        writer.begin_track(get_track_channel(track_id))
+        for note_chunk in track_stream:
+            writer.add_notes(*note_chunk)
+        writer.end_track()
+
+    return writer.close()
+
+
+class MidiStreamWriter(object):
+    '''
+    Writes a standard MIDI file to a seekable file object a chunk of notes at
+    a time, so pieces of any length can be written without holding them in
+    memory. Track chunk lengths (and the number of tracks in the header)
+    aren't known until the end, so placeholders are written and patched when
+    each track ends.
+    '''
+
+    def __init__(self, midi_file, bpm=100, time_signature=(4, 4), title=None,
+                 ticks_per_quarter_note=time.TICKS_PER_QUARTER_NOTE):
+        '''
+        Constructor. Writes the header and the tempo track.
+
+        :param midi_file: Seekable file object opened for binary writing
+        :param bpm: Beats (quarter notes) per minute
+        :param time_signature: Time signature of the music
+        :param title: Title of the music, None to leave out
+        :param ticks_per_quarter_note: Time resolution of the delta times
+        '''
+        self.midi_file = midi_file
+        self.number_tracks = 0
+
+        self._start_position = midi_file.tell()
+        self._track_length_position = None
+
+        midi_file.write(encode_header(0, ticks_per_quarter_note))
+        midi_file.write(encode_tempo_track(bpm, time_signature, title))
+        self.number_tracks += 1
+
+    def begin_track(self, channel=0):
+        '''
+        Starts a new track chunk. Notes added until end_track are in it.
+
+        :param channel: MIDI channel (0 to 15) the track plays on
+        '''
+        if self._track_length_position is not None:
+            self.end_track()
+
+        self.midi_file.write(b'MTrk')
+        self._track_length_position = self.midi_file.tell()
+        self.midi_file.write(struct.pack('>I', 0))
+
+        self._channel = channel
+        self._previous_tick = 0
+        self._last_onset = 0
+
+        # Note offs that land after the notes written so far
+        self._pending_events = _get_note_events([], [], [], [], channel)
+
+    def add_notes(self, onsets, durations, pitches, velocities=64):
+        '''
+        Writes a chunk of notes to the current track. Onsets must not come
+        before the onsets of chunks already added.
+
+        :param onsets: Onset of each note in ticks from the start of the piece
+        :param durations: Duration of each note in ticks
+        :param pitches: MIDI note number of each note
+        :param velocities: Velocity of each note, or one velocity for them all
+        '''
+        if self._track_length_position is None:
+            raise AttributeError('Cannot add notes before a track is begun.')
+
+        onsets = numpy.asarray(onsets, dtype=numpy.int64)
+        if not len(onsets):
+            return
+
+        if onsets.min() < self._last_onset:
+            raise AttributeError('Cannot add notes starting before notes ' +
+                                 'already added to the track.')
+        self._last_onset = onsets.max()
+
+        new_events = _get_note_events(onsets, durations, pitches, velocities,
+                                      self._channel)
+        ticks, statuses, event_pitches, event_velocities = \
+            [numpy.concatenate(arrays) for arrays in zip(self._pending_events, new_events)]
+
+        order = _get_event_order(ticks, statuses)
+
+        # Later notes may still start before the rest of the note offs
+        ready = numpy.count_nonzero(ticks <= self._last_onset)
+        self._write_events(ticks[order[:ready]], statuses[order[:ready]],
+                           event_pitches[order[:ready]], event_velocities[order[:ready]])
+
+        later = order[ready:]
+        self._pending_events = (ticks[later], statuses[later],
+                                event_pitches[later], event_velocities[later])
+
+    def end_track(self):
+        '''
+        Ends the current track, writing any notes still to be turned off and
+        filling in the length of the track chunk.
+        '''
+        if self._track_length_position is None:
+            return
+
+        self._write_events(*self._pending_events)
+        self._pending_events = None
+        self.midi_file.write(_END_OF_TRACK)
+
+        end_position = self.midi_file.tell()
+        self.midi_file.seek(self._track_length_position)
+        self.midi_file.write(struct.pack('>I', end_position - self._track_length_position - 4))
+        self.midi_file.seek(end_position)
+
+        self._track_length_position = None
+        self.number_tracks += 1
+
+    def close(self):
+        '''
+        Ends the current track and fills in the number of tracks in the
+        header. Returns the number of bytes written. The file object is left
+        open.
+        '''
+        self.end_track()
+
+        end_position = self.midi_file.tell()
+        self.midi_file.seek(self._start_position + 10)
+        self.midi_file.write(struct.pack('>H', self.number_tracks))
+        self.midi_file.seek(end_position)
+
+        return end_position - self._start_position
+
+    def _write_events(self, ticks, statuses, pitches, velocities):
+        if len(ticks):
+            self.midi_file.write(_encode_events(ticks, statuses, pitches, velocities,
+                                                self._previous_tick))
+            self._previous_tick = ticks[-1]
+
+
+def get_track_channel(track_id):
+    '''
+    Returns the MIDI channel for a track, skipping the percussion channel.
+
+    :param track_id: Index of the track
+    '''
+    channel = track_id % 15
+    if channel >= PERCUSSION_CHANNEL:
+        channel += 1
+
+    return channel
+
+
+def _get_note_events(onsets, durations, pitches, velocities, channels=0):
+    '''
+    Returns the ticks, status bytes, pitches and velocities of the note on
+    and note off events playing the given notes, in the order they happen.
+
+    :param onsets: Onset of each note in ticks
+    :param durations: Duration of each note in ticks
+    :param pitches: MIDI note number of each note
+    :param velocities: Velocity of each note, or one velocity for them all
+    :param channels: MIDI channel (0 to 15) of each note, or one for them all
+    '''
+    onsets = numpy.asarray(onsets, dtype=numpy.int64)
+    number_notes = len(onsets)
+
+    # Notes need to last at least a tick to be turned off after they're on
+    durations = numpy.maximum(numpy.asarray(durations, dtype=numpy.int64), 1)
+    pitches = check_data_bytes(pitches, 'Pitches').astype(numpy.uint8)
+    velocities = check_data_bytes(velocities, 'Velocities').astype(numpy.uint8)
+    velocities = numpy.broadcast_to(velocities, (number_notes,))
+    channels = numpy.broadcast_to(numpy.asarray(channels, dtype=numpy.uint8),
+                                  (number_notes,))
+
+    ticks = numpy.concatenate((onsets + durations, onsets))
+    statuses = numpy.concatenate((NOTE_OFF | channels, NOTE_ON | channels))
+    event_pitches = numpy.concatenate((pitches, pitches))
+    event_velocities = numpy.concatenate((numpy.full(number_notes, NOTE_OFF_VELOCITY,
+                                                     dtype=numpy.uint8),
+                                          velocities))
+
+    order = _get_event_order(ticks, statuses)
+
+    return ticks[order], statuses[order], event_pitches[order], event_velocities[order]
+
+
+def _get_event_order(ticks, statuses):
+    '''
+    Returns the order events happen in. Note offs go first when they land on
+    the same tick as a note on, so a repeated note is released before it's
+    played again.
+
+    :param ticks: Tick of each event
+    :param statuses: Status byte of each event
+    '''
+    return numpy.lexsort((statuses >> 4, ticks))
+
+
+def _encode_events(ticks, statuses, pitches, velocities, previous_tick=0):
+    '''
+    Returns the bytes of the given (ordered) note events, each with its delta
+    time. Built with array operations, without looping over the events.
+
+    :param ticks: Tick of each event
+    :param statuses: Status byte of each event
+    :param pitches: MIDI note number of each event
+    :param velocities: Velocity of each event
+    :param previous_tick: Tick of the event before the first one
+    '''
+    deltas = numpy.diff(ticks, prepend=previous_tick)
+    if len(deltas) and (deltas.min() < 0 or deltas.max() > MAX_DELTA_TICKS):
+        raise AttributeError('Note times must be in order and at most ' +
+                             str(MAX_DELTA_TICKS) + ' ticks apart.')
+
+    # One row per event: four delta time bytes (most significant first),
+    # then the status byte and the two data bytes
+    events = numpy.empty((len(ticks), 7), dtype=numpy.uint8)
+    for byte_index in range(0, 4):
+        shift = 7 * (3 - byte_index)
+        events[:, byte_index] = (deltas >> shift) & 0x7F
+        if byte_index < 3:
+            events[:, byte_index] |= 0x80
+
+    events[:, 4] = statuses
+    events[:, 5] = pitches
+    events[:, 6] = velocities
+
+    # Only keep as many delta time bytes as each delta needs
+    delta_bytes = 1 + ((deltas >= 1 << 7).astype(numpy.int64) +
+                       (deltas >= 1 << 14) + (deltas >= 1 << 21))
+    keep = numpy.ones(events.shape, dtype=bool)
+    keep[:, 0:4] = numpy.arange(0, 4) >= (4 - delta_bytes)[:, numpy.newaxis]
+
+    return events[keep].tobytes()
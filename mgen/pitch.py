@@ -0,0 +1,109 @@
+'''
+There are only twelve notes. You have to treat them carefully.
+    - Oscar Peterson
+'''
+
+# Mingus modules
+import mingus.containers.note as note
+
+# (name, octave, velocity) -> FrozenNote
+_NOTE_CACHE = dict()
+
+
+class FrozenNote(note.Note):
+    '''
+    A mingus Note that can't be changed. Generated music only uses a handful
+    of different notes, so every FrozenNote is interned (see get_note) and
+    shared by every bar that plays it. Copies are regular mingus Notes, so
+    they can be changed.
+    '''
+
+    def __init__(self, name='C', octave=4, velocity=None):
+        '''
+        Constructor
+
+        :param name: Name of the note (ex: 'C#')
+        :param octave: Octave of the note
+        :param velocity: Velocity of the note, None to leave as default
+        '''
+        note.Note.__init__(self, name, octave)
+
+        if velocity is not None:
+            self.set_velocity(velocity)
+
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen', False):
+            raise AttributeError('Cannot change ' + repr(self) + ' because ' +
+                                 'generated notes are shared. Copy it first.')
+
+        note.Note.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        if self.__dict__.get('_frozen', False):
+            raise AttributeError('Cannot change ' + repr(self) + ' because ' +
+                                 'generated notes are shared. Copy it first.')
+
+        note.Note.__delattr__(self, name)
+
+    def __hash__(self):
+        # Equal notes (ex: B#-4 and C-5) must hash the same
+        return hash(int(self))
+
+    def thaw(self):
+        '''
+        Returns a regular mingus Note equal to this one, which can be changed.
+        '''
+        new_note = note.Note(self.name, self.octave)
+
+        for attribute in ('velocity', 'channel'):
+            if attribute in self.__dict__:
+                setattr(new_note, attribute, self.__dict__[attribute])
+
+        return new_note
+
+    def __copy__(self):
+        return self.thaw()
+
+    def __deepcopy__(self, memo):
+        return self.thaw()
+
+    def __reduce__(self):
+        # Unpickled notes are interned again
+        return (get_note, (self.name, self.octave, self.__dict__.get('velocity')))
+
+
+def get_note(name, octave=4, velocity=None):
+    '''
+    Returns the (interned) FrozenNote for the given name, octave and velocity.
+    Notes are shared by every generator in the process.
+
+    :param name: Name of the note (ex: 'C#')
+    :param octave: Octave of the note
+    :param velocity: Velocity of the note, None to leave as default
+    '''
+    cache_key = (name, octave, velocity)
+
+    frozen_note = _NOTE_CACHE.get(cache_key)
+    if frozen_note is None:
+        frozen_note = FrozenNote(name, octave, velocity)
+        _NOTE_CACHE[cache_key] = frozen_note
+
+    return frozen_note
+
+
+def intern_note(given_note):
+    '''
+    Returns the (interned) FrozenNote equal to the given note.
+
+    :param given_note: Note name (ex: 'C#' for C#4, or 'C#-5') or mingus Note
+    '''
+    if isinstance(given_note, FrozenNote):
+        return given_note
+
+    if not hasattr(given_note, 'name'):
+        given_note = note.Note(given_note)
+
+    return get_note(given_note.name, given_note.octave,
+                    given_note.__dict__.get('velocity'))
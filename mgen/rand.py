@@ -0,0 +1,63 @@
+'''
+Everything we see hides another thing, we always want to see what is hidden
+by what we see.
+    - Rene Magritte
+'''
+
+# Other Modules
+import numpy
+import random
+
+
+def make_rng(seed=None):
+    '''
+    Returns a random number generator for the given seed. Generators are
+    returned as is, so the result can be threaded through every choice.
+
+    :param seed: None for a randomly seeded generator, an integer seed or a
+                 random.Random instance
+    '''
+    if isinstance(seed, random.Random):
+        return seed
+
+    return random.Random(seed)
+
+
+def spawn_seeds(rng, number_streams):
+    '''
+    Returns a list of independent integer seeds derived from the given random
+    number generator. The seeds only depend on the state of the parent, so the
+    same parent state always spawns the same seeds.
+
+    :param rng: Parent random number generator (advanced by this call)
+    :param number_streams: Number of seeds to create
+    '''
+    # Each child seed is 128 fresh bits from the parent, which random.Random
+    # spreads over its whole state. (numpy's SeedSequence would do the same,
+    # but needs a numpy that no longer runs on Python 2.7)
+    return [rng.getrandbits(128) for _ in range(0, number_streams)]
+
+
+def spawn_rngs(rng, number_streams):
+    '''
+    Returns a list of independent child random number generators, suitable
+    for generating tracks or whole compositions in parallel.
+
+    :param rng: Parent random number generator (advanced by this call)
+    :param number_streams: Number of child generators to create
+    '''
+    return [random.Random(child_seed)
+            for child_seed in spawn_seeds(rng, number_streams)]
+
+
+def get_numpy_rng(rng=None):
+    '''
+    Returns a NumPy random state for vectorized draws. The global NumPy random
+    state is used if no generator is given, otherwise one is seeded from it.
+
+    :param rng: Random number generator, None for the global random state
+    '''
+    if rng is None:
+        return numpy.random
+
+    return numpy.random.RandomState(rng.getrandbits(32))
@@ -0,0 +1,158 @@
+'''
+I don't write music for sissy ears.
+    - Charles Ives
+'''
+
+# Other Modules
+import collections
+import multiprocessing.pool
+import os
+import subprocess
+import threading
+
+# Same version statement mingus puts at the top of the LilyPond files it writes
+LILYPOND_VERSION_STATEMENT = '\\version "2.10.33"\n'
+
+# How many LilyPond sources each lilypond process renders
+FILES_PER_CALL = 16
+
+# Seconds a single lilypond process may run before it's killed
+LILYPOND_TIMEOUT = 300
+
+# What happened to a single LilyPond source, index being its place in the
+# sources given. pdf_path is None when no pdf was made, in which case error
+# says why
+RenderResult = collections.namedtuple('RenderResult',
+                                      ['index', 'file_path', 'pdf_path', 'error'])
+
+
+def render_pdfs(ly_sources, lilypond_installation='lilypond',
+                files_per_call=FILES_PER_CALL, processes=None,
+                timeout=LILYPOND_TIMEOUT):
+    '''
+    Renders many LilyPond strings to pdfs. LilyPond takes seconds just to
+    start up, so sources are grouped files_per_call at a time into a single
+    lilypond process, and at most processes of them run at once. Yields a
+    RenderResult per source, in order, as soon as it (and every source
+    before it) is done.
+
+    :param ly_sources: (ly_string, file_path) for each pdf, where file_path
+                       is the absolute path of the pdf without .pdf at the end
+    :param lilypond_installation: Path of the lilypond executable
+    :param files_per_call: Most sources rendered by a single lilypond process
+    :param processes: Most lilypond processes at once, defaults to number of cores
+    :param timeout: Seconds a single lilypond process may run before it's killed
+    '''
+    # LilyPond writes every pdf to one output directory per process
+    sources_by_dir = collections.OrderedDict()
+    for index, (ly_string, file_path) in enumerate(ly_sources):
+        sources_by_dir.setdefault(os.path.dirname(file_path), []).append((index, ly_string,
+                                                                          file_path))
+
+    calls = []
+    for output_dir, dir_sources in sources_by_dir.items():
+        for first_source in range(0, len(dir_sources), files_per_call):
+            calls.append((lilypond_installation, output_dir,
+                          dir_sources[first_source:first_source + files_per_call],
+                          timeout))
+
+    if not calls:
+        return
+
+    pool = multiprocessing.pool.ThreadPool(min(processes or multiprocessing.cpu_count(),
+                                               len(calls)))
+    try:
+        # Sources in different directories are rendered by different calls,
+        # so hold on to results until every source before them is done
+        finished = dict()
+        next_index = 0
+
+        # Threads only wait on the lilypond processes doing the work
+        for call_results in pool.imap_unordered(_run_lilypond, calls, chunksize=1):
+            for result in call_results:
+                finished[result.index] = result
+
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def _run_lilypond(call):
+    '''
+    Renders a group of LilyPond sources sharing an output directory with a
+    single lilypond process. Returns a RenderResult per source.
+
+    :param call: (lilypond_installation, output_dir, sources, timeout), where
+                 sources are (index, ly_string, file_path)
+    '''
+    lilypond_installation, output_dir, sources, timeout = call
+
+    ly_paths = []
+    for _, ly_string, file_path in sources:
+        # Don't mistake a pdf from an earlier run for a new one
+        if os.path.isfile(file_path + '.pdf'):
+            os.remove(file_path + '.pdf')
+
+        with open(file_path + '.ly', 'w') as ly_file:
+            ly_file.write(LILYPOND_VERSION_STATEMENT + ly_string)
+        ly_paths.append(file_path + '.ly')
+
+    command = [os.path.expandvars(lilypond_installation), '-fpdf', '-o', output_dir] + ly_paths
+
+    error = None
+    try:
+        lilypond_process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                            stderr=subprocess.STDOUT)
+    except OSError as exception:
+        error = 'Could not run ' + lilypond_installation + ': ' + str(exception)
+    else:
+        # A timer rather than communicate(timeout=), which Python 2 doesn't have
+        timed_out = threading.Event()
+        timer = threading.Timer(timeout, _kill_lilypond, (lilypond_process, timed_out))
+        timer.start()
+        try:
+            output = lilypond_process.communicate()[0]
+        finally:
+            timer.cancel()
+
+        if timed_out.is_set():
+            error = ('LilyPond was stopped after ' + str(timeout) +
+                     ' seconds without finishing.')
+        elif lilypond_process.returncode != 0:
+            error = output.decode('utf-8', 'replace')
+
+    for ly_path in ly_paths:
+        if os.path.isfile(ly_path):
+            os.remove(ly_path)
+
+    results = []
+    for index, _, file_path in sources:
+        if os.path.isfile(file_path + '.pdf'):
+            results.append(RenderResult(index, file_path, file_path + '.pdf', None))
+        else:
+            results.append(RenderResult(index, file_path, None,
+                                        error or 'LilyPond did not make a pdf.'))
+
+    return results
+
+
+def _kill_lilypond(lilypond_process, timed_out):
+    '''
+    Kills a lilypond process that ran out of time, if it's still running.
+
+    :param lilypond_process: The running lilypond Popen
+    :param timed_out: Event set when the process is killed
+    '''
+    if lilypond_process.poll() is None:
+        timed_out.set()
+        try:
+            lilypond_process.kill()
+        except OSError:
+            # Finished just before it could be killed
+            pass
@@ -0,0 +1,164 @@
+'''
+Chance favors only the prepared mind.
+    - Louis Pasteur
+'''
+
+# Other Modules
+import bisect
+import random
+
+
+class AliasSampler(object):
+    '''
+    A discrete probability distribution compiled into a Walker/Vose alias
+    table. Random draws cost O(1) regardless of the number of items.
+    '''
+
+    def __init__(self, prob_list):
+        '''
+        Constructor
+
+        :param prob_list: List of tuples with items and associated
+                          probabilities (probabilities may be strings)
+        '''
+        self.items = [item for item, _ in prob_list]
+        self.weights = [float(prob) for _, prob in prob_list]
+
+        # Cumulative probabilities, used when a specific choice is requested
+        self.cumulative = []
+        total = 0.0
+        for weight in self.weights:
+            total += weight
+            self.cumulative.append(total)
+        self.total = total
+
+        self._probability_table, self._alias_table = \
+            AliasSampler._build_tables(self.weights, total)
+
+    def __len__(self):
+        return len(self.items)
+
+    def draw_index(self, rng=None):
+        '''
+        Returns the index of a randomly drawn item.
+
+        :param rng: Random number generator, defaults to the random module
+        '''
+        number_items = len(self._probability_table)
+        if number_items == 0:
+            raise AttributeError('Cannot draw from an empty distribution.')
+
+        if rng is None:
+            rng = random
+
+        column = rng.random() * number_items
+        index = int(column)
+
+        # Reuse the fractional part of the draw as the biased coin flip
+        if column - index < self._probability_table[index]:
+            return index
+
+        return self._alias_table[index]
+
+    def draw(self, rng=None):
+        '''
+        Returns a randomly drawn item.
+
+        :param rng: Random number generator, defaults to the random module
+        '''
+        return self.items[self.draw_index(rng)]
+
+    def select_index(self, choice):
+        '''
+        Returns the index of the item the given choice falls on when walking
+        the cumulative probabilities in order, renormalized so they add up
+        to 1.0.
+
+        :param choice: float between 0.0 and 1.0 to determine which item to
+                       choose. Closer to 1 will choose a later item
+        '''
+        if not self.items:
+            raise AttributeError('Cannot select from an empty distribution.')
+
+        # Weights of a subset (ex: the timings that fit) may not add up to 1.0
+        index = bisect.bisect_left(self.cumulative, choice * self.total)
+        return min(index, len(self.items) - 1)
+
+    def select(self, choice):
+        '''
+        Returns the item the given choice falls on when walking the cumulative
+        probabilities in order.
+
+        :param choice: float between 0.0 and 1.0 to determine which item to
+                       choose. Closer to 1 will choose a later item
+        '''
+        return self.items[self.select_index(choice)]
+
+    def pick(self, choice=None, rng=None):
+        '''
+        Returns a random item when choice is None, otherwise the item the given
+        choice falls on.
+
+        :param choice: Leave as default for random choice.
+                       float between 0.0 and 1.0 to determine which item to
+                       choose.
+        :param rng: Random number generator, defaults to the random module
+        '''
+        if choice is None:
+            return self.draw(rng)
+
+        return self.select(choice)
+
+    @staticmethod
+    def _build_tables(weights, total):
+        '''
+        Returns the probability and alias tables for the given weights using
+        Vose's method.
+
+        :param weights: List of non-negative weights
+        :param total: Sum of the weights
+        '''
+        number_items = len(weights)
+        probability_table = [1.0] * number_items
+        alias_table = list(range(0, number_items))
+
+        if number_items == 0 or total <= 0.0:
+            return probability_table, alias_table
+
+        scaled = [weight * number_items / total for weight in weights]
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+
+            probability_table[less] = scaled[less]
+            alias_table[less] = more
+
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # Anything left over is only off from 1.0 by rounding error
+        for index in small + large:
+            probability_table[index] = 1.0
+            alias_table[index] = index
+
+        return probability_table, alias_table
+
+
+def compile_prob_list(prob_list):
+    '''
+    Returns an AliasSampler for the given probabilities. Already compiled
+    samplers are returned as is.
+
+    :param prob_list: List of tuples with items and associated probabilities
+                      or an AliasSampler
+    '''
+    if isinstance(prob_list, AliasSampler):
+        return prob_list
+
+    return AliasSampler(prob_list)
@@ -3,6 +3,10 @@ Style is a reflection of your attitude and your personality.
     - Shawn Ashmore
 """
 
+# Project Modules
+from mgen import sampler
+from mgen import choice
+
 # Other Modules
 import json
 import operator
@@ -26,8 +30,11 @@ class Style(object):
 
         :param probabilities_file: Cfg file to get probabilities from
         """
+        self.probabilities_file = probabilities_file
         self.probabilities = dict()
+        self.samplers = dict()
         self.parse_probabilities_file(probabilities_file)
+        self.compile_samplers()
 
     def parse_probabilities_file(self, file_name):
         """
@@ -87,3 +94,30 @@ class Style(object):
                              ) + "This version of mgen requires a style " +
                             "configuration with version: " +
                             "{}\n".format(REQUIRED_STYLE_CFG_VERSION))
+
+    def compile_samplers(self):
+        """
+        Compiles every probability section into an AliasSampler so that random
+        draws don't have to walk the probability lists.
+        """
+        for section, section_items in self.probabilities.items():
+            # Metadata, not probabilities
+            if section.startswith("__"):
+                continue
+
+            self.samplers[section] = sampler.AliasSampler(section_items)
+
+        # Note timings also get parsed into mingus values once, up front
+        self.timing_table = choice.compile_timing_table(self.probabilities["timings"])
+
+        # Same for chord progressions, indexed by how many chords they have
+        self.progression_table = choice.compile_progression_table(self.probabilities["progressions"])
+
+    def warm_caches(self):
+        """
+        Resolves the chords of every progression in every key of the style up
+        front, so generating chords tracks is just a lookup afterwards. Worth
+        it when generating many compositions with the same style.
+        """
+        choice.warm_progression_chords(self.progression_table,
+                                       self.samplers["keys"].items)
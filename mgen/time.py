@@ -9,18 +9,97 @@ import mingus.containers.note as note
 import mingus.containers.bar as bar
 import mingus.core.value as value
 
-def get_notes_length(list_of_note_values):
+# Resolution of the integer time model (pulses per quarter note)
+TICKS_PER_QUARTER_NOTE = 960
+TICKS_PER_WHOLE_NOTE = 4 * TICKS_PER_QUARTER_NOTE
+
+def get_note_ticks(note_value):
     '''
-    Return the total musical length of a list of note lengths
+    Return the length of a note value in ticks
+
+    :param note_value: Note timing (ex: value.quarter)
+    '''
+    return int(round(TICKS_PER_WHOLE_NOTE / float(note_value)))
+
+def get_notes_ticks(list_of_note_values):
+    '''
+    Return the total length of a list of note lengths in ticks
 
     :param list_of_note_values: List of note timings
     '''
-    total_time = 0.0
+    total_ticks = 0
 
     for note in list_of_note_values:
-        total_time += 1.0 / note
+        total_ticks += get_note_ticks(note)
+
+    return total_ticks
+
+def get_bar_ticks(time_signature=meter.common_time):
+    '''
+    Return the length of a bar in ticks for the given time signature
+
+    :param time_signature: Time signature for the bar
+    '''
+    return time_signature[0] * get_note_ticks(time_signature[1])
+
+def ticks_to_time(ticks):
+    '''
+    Return the musical length (in whole notes) of a number of ticks
+
+    :param ticks: Length in ticks
+    '''
+    return ticks / float(TICKS_PER_WHOLE_NOTE)
 
-    return total_time
+def time_to_ticks(musical_time):
+    '''
+    Return the number of ticks in a musical length (in whole notes), rounded
+    to the nearest tick
+
+    :param musical_time: Length in whole notes (ex: 0.25 for a quarter note)
+    '''
+    return int(round(musical_time * TICKS_PER_WHOLE_NOTE))
+
+def ticks_to_value(ticks):
+    '''
+    Return the mingus note value (ex: value.quarter) lasting the given number
+    of ticks
+
+    :param ticks: Length in ticks
+    '''
+    if TICKS_PER_WHOLE_NOTE % ticks == 0:
+        return TICKS_PER_WHOLE_NOTE // ticks
+
+    return TICKS_PER_WHOLE_NOTE / float(ticks)
+
+def split_ticks(ticks):
+    '''
+    Return a list of tick lengths of standard note values (whole, half, ...)
+    that add up to the given number of ticks, longest first
+
+    :param ticks: Length in ticks
+    '''
+    lengths = []
+    note_value = value.whole
+    while ticks > 0 and note_value <= value.hundred_twenty_eighth:
+        note_ticks = get_note_ticks(note_value)
+        while ticks >= note_ticks:
+            lengths.append(note_ticks)
+            ticks -= note_ticks
+        note_value *= 2
+
+    # Whatever is too short for a standard value is kept as is
+    if ticks > 0:
+        lengths.append(ticks)
+
+    return lengths
+
+def get_notes_length(list_of_note_values):
+    '''
+    Return the total musical length of a list of note lengths
+
+    :param list_of_note_values: List of note timings
+    '''
+    return ticks_to_time(get_notes_ticks(list_of_note_values))
 
 def get_notes_in_timing(timing):
     '''
@@ -42,20 +121,21 @@ def get_time_remaining(melody_bar, time_signature=meter.common_time):
     :param melody_bar: The musical bar
     :param time_signature: Time signature for the bar
     '''
-    # Get information from time signature
-    beats_in_measure = time_signature[0]
-    what_gets_beat   = (1.0 / time_signature[1])
+    return ticks_to_time(get_ticks_remaining(melody_bar, time_signature))
 
-    # Beat it
-    total_time = beats_in_measure * what_gets_beat
+def get_ticks_remaining(melody_bar, time_signature=meter.common_time):
+    '''
+    Return the remaining ticks in the given bar for the given time signature.
 
-    time_in_measure = 0.0
+    :param melody_bar: The musical bar
+    :param time_signature: Time signature for the bar
+    '''
+    ticks_in_measure = 0
     for notes in melody_bar:
         if notes:
-            for note in notes:
-                time_in_measure += (1.0 / note)
+            ticks_in_measure += get_notes_ticks(notes)
 
-    return (total_time - time_in_measure)
+    return get_bar_ticks(time_signature) - ticks_in_measure
 
 def prepend_empty_bars_to_track(track, num_bars):
     '''
@@ -66,6 +146,7 @@ def prepend_empty_bars_to_track(track, num_bars):
     '''
     empty_bar = bar.Bar()
     empty_bar.place_rest(value.whole)
-    for _ in range(0, num_bars):
-        track.bars.insert(0, empty_bar)
+
+    # One insert at the front, rather than shifting every bar num_bars times
+    track.bars[0:0] = [empty_bar] * num_bars
     return track
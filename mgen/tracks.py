@@ -0,0 +1,198 @@
+'''
+Good artists copy, great artists steal.
+    - Pablo Picasso
+'''
+
+# Project Modules
+from mgen import time
+
+# Mingus modules
+import mingus.containers.bar as bar
+import mingus.containers.track as track
+
+# Other Modules
+import copy
+
+
+class CopyOnWriteTrack(track.Track):
+    '''
+    A mingus Track whose bars may be shared with other tracks. Copying or
+    repeating the track only copies references to its bars, and a bar is only
+    copied the first time this track changes it, so changes never leak into
+    other tracks.
+
+    Bars read through the bars list or track[index] are treated as read only.
+    Use get_writable_bar to change a bar in place.
+
+    A track can start later in the composition by setting start_bar, rather
+    than filling the bars before it with rests. Use get_padded_track for the
+    track with those rests in place.
+    '''
+
+    def __init__(self, instrument=None, **kwargs):
+        '''
+        Constructor
+
+        :param instrument: The mingus Instrument for the track
+        :param kwargs: Anything else the mingus Track accepts (ex: style)
+        '''
+        track.Track.__init__(self, instrument, **kwargs)
+
+        # Number of bars of rest before the track starts
+        self.start_bar = 0
+
+        # Bars this track made its own copy of, by id. Holding on to them
+        # keeps their ids from being reused by other bars.
+        self._writable_bars = dict()
+
+    @classmethod
+    def from_track(cls, other_track, times_to_repeat=0):
+        '''
+        Returns a CopyOnWriteTrack with the bars of the given track, repeated
+        the given number of times. Bars of another CopyOnWriteTrack are shared,
+        bars of any other track are copied once since that track could still
+        change them.
+
+        :param other_track: The mingus Track to copy
+        :param times_to_repeat: How many times to repeat the bars after the first
+        '''
+        if isinstance(other_track, CopyOnWriteTrack):
+            return other_track.copy(times_to_repeat)
+
+        # Keep everything else the track holds (instrument, style, ...)
+        new_track = cls.__new__(cls)
+        new_track.__setstate__(dict(other_track.__dict__))
+        new_track.bars = [copy.deepcopy(other_bar) for other_bar in other_track.bars]
+        new_track.bars *= times_to_repeat + 1
+        new_track.start_bar = getattr(other_track, 'start_bar', 0)
+
+        return new_track
+
+    def copy(self, times_to_repeat=0):
+        '''
+        Returns a copy of this track that shares its bars, with the bars
+        repeated the given number of times.
+
+        :param times_to_repeat: How many times to repeat the bars after the first
+        '''
+        # Both tracks refer to the same bars now, so neither may change them
+        self._writable_bars = dict()
+
+        new_track = copy.copy(self)
+        new_track._writable_bars = dict()
+        new_track.bars = self.bars * (times_to_repeat + 1)
+
+        return new_track
+
+    def get_writable_bar(self, index):
+        '''
+        Returns the bar at the given index, copying it first if it may be
+        shared with another track (or with itself, if repeated).
+
+        :param index: Index of the bar in the track
+        '''
+        current_bar = self.bars[index]
+
+        if id(current_bar) not in self._writable_bars:
+            current_bar = copy.deepcopy(current_bar)
+            self.bars[index] = current_bar
+            self._writable_bars[id(current_bar)] = current_bar
+
+        return current_bar
+
+    def add_notes(self, note, duration=None):
+        '''
+        Adds notes to the last bar, starting a new bar if it's full. Same as
+        the mingus Track, but the last bar is copied before it's changed.
+
+        :param note: Note, note name or NoteContainer to add
+        :param duration: Duration of the notes (ex: value.quarter)
+        '''
+        if len(self.bars) == 0:
+            self.add_bar(bar.Bar())
+
+        last_bar = self.bars[-1]
+        if last_bar.is_full():
+            self.add_bar(bar.Bar(last_bar.key, last_bar.meter))
+
+        return self.get_writable_bar(-1).place_notes(note, duration)
+
+    def transpose(self, interval, up=True):
+        for index in range(0, len(self.bars)):
+            self.get_writable_bar(index).transpose(interval, up)
+        return self
+
+    def augment(self):
+        for index in range(0, len(self.bars)):
+            self.get_writable_bar(index).augment()
+
+    def diminish(self):
+        for index in range(0, len(self.bars)):
+            self.get_writable_bar(index).diminish()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+
+        # Ids mean nothing once copied or unpickled
+        del state['_writable_bars']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._writable_bars = dict()
+
+
+def get_padded_track(given_track):
+    '''
+    Returns the track with a bar of rest for every bar before its start_bar,
+    for anything that expects every bar of the composition to be in the
+    track. The rest bars are all the same (read only) bar. The given track
+    is left as is, so it's safe to call when only reading the bars.
+
+    :param given_track: The mingus Track, possibly with a start_bar
+    '''
+    start_bar = getattr(given_track, 'start_bar', 0)
+    if start_bar == 0:
+        return given_track
+
+    # The padded track may not change the bars it shares with the given one
+    padded_track = copy.copy(given_track)
+    padded_track._writable_bars = dict()
+    padded_track.bars = [_get_empty_bar(given_track)] * start_bar + given_track.bars
+    padded_track.start_bar = 0
+
+    return padded_track
+
+
+def get_padded_composition(composition):
+    '''
+    Returns the composition with get_padded_track applied to every track.
+    The composition is returned as is if no track needs padding.
+
+    :param composition: The mingus Composition
+    '''
+    if not any(getattr(given_track, 'start_bar', 0) for given_track in composition.tracks):
+        return composition
+
+    padded_composition = copy.copy(composition)
+    padded_composition.tracks = [get_padded_track(given_track)
+                                 for given_track in composition.tracks]
+
+    return padded_composition
+
+
+def _get_empty_bar(given_track):
+    '''
+    Returns a bar of rest in the key and meter of the track's first bar.
+
+    :param given_track: The mingus Track
+    '''
+    if given_track.bars:
+        empty_bar = bar.Bar(given_track.bars[0].key, given_track.bars[0].meter)
+    else:
+        empty_bar = bar.Bar()
+
+    for rest_ticks in time.split_ticks(time.get_bar_ticks(empty_bar.meter)):
+        empty_bar.place_rest(time.ticks_to_value(rest_ticks))
+
+    return empty_bar
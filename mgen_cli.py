@@ -6,6 +6,7 @@ Created on Jan 21, 2016
 
 # Project Modules
 import mgen
+from mgen import batch
 import sys
 import argparse
 import traceback
@@ -37,17 +38,27 @@ def main():
     else:
         my_style = mgen.Style(mgen.DEFAULT_CFG_FILE)
 
+    # Generate many compositions in parallel instead of a single one
+    if args.batch:
+        _generate_batch(args)
+        print_footer()
+        return
+
     # Load MusicGenerator object is specified, otherwise create a new one
     if args.load_pickle:
         try:
-            my_generator = mgen.MusicGenerator.from_pickle(args.load_pickle)
+            if args.load_pickle.endswith('.' + mgen.create.BINARY_FILE_EXTENSION):
+                my_generator = mgen.MusicGenerator.from_binary(args.load_pickle)
+            else:
+                my_generator = mgen.MusicGenerator.from_pickle(args.load_pickle)
             # Force style if provided
             if args.style_file_path:
                 my_generator.style = my_style
         except IOError:
             print_error('Couldn\'t find ' + args.load_pickle)
     else:
-        my_generator = mgen.MusicGenerator(my_style, composition_title=args.composition_name)
+        my_generator = mgen.MusicGenerator(my_style, composition_title=args.composition_name,
+                                           seed=args.seed)
 
     # Force musical key if provided
     if args.key:
@@ -91,21 +102,49 @@ def main():
                                                  octave_adjust=-1)
             )
 
-    # File exports
-    if args.generate_pickle:
-        export_location = my_generator.export_pickle(args.generate_pickle)
-        print('Generated PKL file: ' + export_location)
-    if args.generate_pdf:
-        export_location = my_generator.export_pdf(args.generate_pdf)
-        print('Generated PDF file: ' + export_location)
-    if args.generate_midi:
-        export_location = my_generator.export_midi(args.generate_midi, args.beats_per_minute)
-        print('Generated MIDI file: ' + export_location)
+    # File exports, written at the same time
+    export_locations = my_generator.export(pickle_path=args.generate_pickle,
+                                           binary_path=args.generate_binary,
+                                           pdf_path=args.generate_pdf,
+                                           midi_path=args.generate_midi,
+                                           bpm=args.beats_per_minute)
+    if 'pkl' in export_locations:
+        print('Generated PKL file: ' + export_locations['pkl'])
+    if mgen.create.BINARY_FILE_EXTENSION in export_locations:
+        print('Generated MGEN file: ' +
+              export_locations[mgen.create.BINARY_FILE_EXTENSION])
+    if 'pdf' in export_locations:
+        print('Generated PDF file: ' + export_locations['pdf'])
+    if 'mid' in export_locations:
+        print('Generated MIDI file: ' + export_locations['mid'])
 
     print('\n' + str(my_generator))
     print_footer()
 
 
+def _generate_batch(args):
+    """
+    Generates a batch of compositions across worker processes and exports each
+    one as a MIDI file.
+
+    :param args: The parsed arguments passed into the script
+    """
+    output_dir = args.generate_midi or (os.path.dirname(os.path.abspath(__file__)) +
+                                        '/output/')
+
+    results = batch.generate_batch(args.batch, output_dir,
+                                   seed=args.seed,
+                                   style_file=args.style_file_path or mgen.DEFAULT_CFG_FILE,
+                                   melody_bars=args.melody_track,
+                                   chords_bars=args.chords_track,
+                                   bpm=args.beats_per_minute,
+                                   composition_title=args.composition_name,
+                                   processes=args.processes)
+
+    for result in results:
+        print('Generated MIDI file: ' + result.midi_path)
+
+
 def _get_parser(args):
     """
     Returns parsed and validated arguments that were passed into the script.
@@ -153,18 +192,39 @@ def _get_parser(args):
                         '(reimportable Python object) file',
                         nargs='?', const=os.path.dirname(os.path.abspath(__file__)) + '/output/', default=None)
 
+    parser.add_argument('-bin', '--generate_binary', metavar='MGEN_OUTPUT_PATH',
+                        help='Generates the composition as a compact, versioned ' +
+                        '.mgen binary file (reimportable, and faster than a .pkl)',
+                        nargs='?', const=os.path.dirname(os.path.abspath(__file__)) + '/output/', default=None)
+
     parser.add_argument('-st', '--style_file_path', metavar='STYLE_FILE_PATH',
                         help='Path to musical probabilities configuration file,' +
                         ' if not provided, will use default style.')
 
     parser.add_argument('-l', '--load_pickle', metavar='PKL_FILE_PATH',
                         help='Load a MusicGenerator previously saved as' +
-                        ' a .pkl file.')
+                        ' a .pkl or .mgen file.')
 
     parser.add_argument('-bpm', '--beats_per_minute',
                         help='Beats per minute for midi output.',
                         nargs='?', default=90, type=int)
 
+    parser.add_argument('-sd', '--seed', type=int,
+                        help='Seed for the random choices, to reproduce a ' +
+                        'previous generation.',
+                        default=None)
+
+    parser.add_argument('-b', '--batch', metavar='NUM_COMPOSITIONS', type=int,
+                        help='Generates this many compositions in parallel and ' +
+                        'exports each as a MIDI file (to MIDI_OUTPUT_PATH if ' +
+                        'provided). Uses the melody and chords track options.',
+                        default=None)
+
+    parser.add_argument('-p', '--processes', type=int,
+                        help='Number of worker processes for --batch. Defaults ' +
+                        'to the number of cores.',
+                        default=None)
+
     parser.add_argument('-s', '--silent', help='Silence printing information to command window',
                         action='store_true')
 
@@ -12,5 +12,6 @@ setup(name='mgen',
       include_package_data=True,
       install_requires=[
             "mock==3.0.5",
+            "numpy",
       ]
       )